@@ -79,13 +79,13 @@ ax=axarr[1,1]
 wfct.visualization.visualize_cut_plane(floris_cross_5,ax=ax)
 
 # Map out the power function
-def get_pow(cross_plane,x1_loc):
-    return wfct.cut_plane.calculate_power(cross_plane,x1_loc=x1_loc,x2_loc=90,R=D/2.,ws_array=floris_ws,cp_array=floris_cp)
+def get_pow(cross_plane,x1_locs):
+    return wfct.cut_plane.calculate_power_map(cross_plane,x1_locs=x1_locs,x2_locs=90,R=D/2.,ws_array=floris_ws,cp_array=floris_cp)
 
 # Now get the profiles in power
 y_points = np.linspace(sowfa_case.layout_y[0]-3*D,sowfa_case.layout_y[0]+3*D,100)
-sowfa_pow = np.array([get_pow(sowfa_cross_5,x) for x in y_points])
-floris_pow = np.array([get_pow(floris_cross_5,x) for x in y_points])
+sowfa_pow = get_pow(sowfa_cross_5,y_points)
+floris_pow = get_pow(floris_cross_5,y_points)
 # print(floris_pow)
 
 # Compare the profiles
@@ -39,13 +39,14 @@ Examples:
     'cosd', 'np', 'sind', 'tand', 'wrap_180', 'wrap_360']
 
     >>> dir(floris.simulation)
-    ['Farm', 'Floris', 'FlowField', 'InputReader', 'Turbine',
-    'TurbineMap', 'Wake', 'WakeCombination', 'WakeDeflection',
-    'WakeVelocity', '__builtins__', '__cached__', '__doc__',
-    '__file__', '__loader__', '__name__', '__package__', '__path__',
-    '__spec__', 'farm', 'floris', 'flow_field', 'input_reader',
-    'turbine', 'turbine_map', 'wake', 'wake_combination',
-    'wake_deflection', 'wake_velocity']
+    ['Farm', 'FarmLayout', 'FarmResult', 'Floris', 'FlowField', 'InputReader',
+    'Turbine', 'TurbineMap', 'TurbineType', 'Wake', 'WakeClusters',
+    'WakeCombination', 'WakeDeflection', 'WakeMatrix', 'WakeVelocity',
+    '__builtins__', '__cached__', '__doc__', '__file__', '__loader__',
+    '__name__', '__package__', '__path__', '__spec__', 'evaluate',
+    'evaluation', 'farm', 'farm_layout', 'floris', 'flow_field',
+    'input_reader', 'turbine', 'turbine_map', 'wake', 'wake_clusters',
+    'wake_combination', 'wake_deflection', 'wake_matrix', 'wake_velocity']
 
     >>> dir(floris.tools)
     ['__builtins__', '__cached__', '__doc__', '__file__', '__loader__',
@@ -25,22 +25,27 @@ Examples:
     >>> import floris.simulation
     
     >>> dir(floris.simulation)
-    ['Farm', 'Floris', 'FlowField', 'InputReader', 'Turbine',
-    'TurbineMap', 'Wake', 'WakeCombination', 'WakeDeflection',
-    'WakeVelocity', '__builtins__', '__cached__', '__doc__',
-    '__file__', '__loader__', '__name__', '__package__', '__path__',
-    '__spec__', 'farm', 'floris', 'flow_field', 'input_reader',
-    'turbine', 'turbine_map', 'wake', 'wake_combination',
-    'wake_deflection', 'wake_velocity']
+    ['Farm', 'FarmLayout', 'FarmResult', 'Floris', 'FlowField', 'InputReader',
+    'Turbine', 'TurbineMap', 'TurbineType', 'Wake', 'WakeClusters',
+    'WakeCombination', 'WakeDeflection', 'WakeMatrix', 'WakeVelocity',
+    '__builtins__', '__cached__', '__doc__', '__file__', '__loader__',
+    '__name__', '__package__', '__path__', '__spec__', 'evaluate',
+    'evaluation', 'farm', 'farm_layout', 'floris', 'flow_field',
+    'input_reader', 'turbine', 'turbine_map', 'wake', 'wake_clusters',
+    'wake_combination', 'wake_deflection', 'wake_matrix', 'wake_velocity']
 """
 
+from .evaluation import FarmResult, evaluate
 from .farm import Farm
+from .farm_layout import FarmLayout
 from .floris import Floris
 from .flow_field import FlowField
 from .input_reader import InputReader
 from .turbine_map import TurbineMap
-from .turbine import Turbine
+from .turbine import Turbine, TurbineType
+from .wake_clusters import WakeClusters
 from .wake_combination import WakeCombination
 from .wake_deflection import WakeDeflection
+from .wake_matrix import WakeMatrix
 from .wake_velocity import WakeVelocity
 from .wake import Wake
@@ -0,0 +1,122 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from .flow_field import FlowField
+from .turbine_map import TurbineMap
+import numpy as np
+
+
+class FarmResult():
+    """
+    FarmResult holds the outcome of a call to
+    :py:func:`floris.simulation.evaluation.evaluate`.
+
+    The per-turbine quantities are numpy arrays in the order of the
+    layout that was evaluated.
+
+    Args:
+        flow_field: The :py:class:`floris.simulation.flow_field.FlowField`
+            object that was solved for this result. It belongs to the
+            result and is not shared with any other evaluation.
+
+    Returns:
+        FarmResult: An instantiated FarmResult object.
+    """
+
+    def __init__(self, flow_field):
+        self.flow_field = flow_field
+        turbines = flow_field.turbine_map.turbines
+        self.layout = flow_field.turbine_map.layout
+        self.average_velocity = np.array(
+            [turbine.average_velocity for turbine in turbines])
+        self.power = np.array([turbine.power for turbine in turbines])
+        self.Cp = np.array([turbine.Cp for turbine in turbines])
+        self.Ct = np.array([turbine.Ct for turbine in turbines])
+        self.aI = np.array([turbine.aI for turbine in turbines])
+        self.turbulence_intensity = self.layout.turbulence_intensity.copy()
+        self.yaw_angles = self.layout.yaw_angles.copy()
+
+    @property
+    def farm_power(self):
+        """
+        Property that returns the total power of the wind farm.
+
+        Returns:
+            float: The sum of the turbine powers.
+        """
+        return np.sum(self.power)
+
+
+def evaluate(wake,
+             layout,
+             wind_speed,
+             wind_direction,
+             turbulence_intensity,
+             wind_shear,
+             wind_veer,
+             air_density,
+             yaw_angles=None,
+             solver="grid",
+             resolution=None):
+    """
+    Solves a wind farm without modifying any of its inputs.
+
+    The wake model, the turbine types and the given layout are only
+    read: the layout positions and state are copied into a new
+    :py:class:`floris.simulation.flow_field.FlowField` that belongs to
+    the returned result. One loaded wake model and set of turbine types
+    can therefore be evaluated concurrently from several threads, e.g.
+    with the layout of a :py:class:`floris.simulation.floris.Floris`
+    object, without copying the model.
+
+    Args:
+        wake: A :py:class:`floris.simulation.wake.Wake` object holding
+            the wake models.
+        layout: A :py:class:`floris.simulation.farm_layout.FarmLayout`
+            object with the turbine positions and types. Its per-turbine
+            yaw and tilt angles are used unless **yaw_angles** is given.
+        wind_speed: A float that is the wind speed at the reference
+            height (m/s).
+        wind_direction: A float that is the wind direction (deg).
+        turbulence_intensity: A float that is the ambient turbulence
+            intensity as a decimal fraction.
+        wind_shear: A float that is the wind shear exponent.
+        wind_veer: A float that is the amount of veer across the rotor.
+        air_density: A float that is the air density (kg/m^3).
+        yaw_angles: A list or array of the turbine yaw angles in degrees
+            (default is *None*, which uses the layout yaw angles).
+        solver: A string that selects the solver of
+            :py:meth:`floris.simulation.flow_field.FlowField.calculate_wake`
+            (default is "grid").
+        resolution: A :py:class:`floris.utilities.Vec3` object that is
+            the resolution of the flow field grid (default is *None*,
+            which uses the wake model resolution or the turbine points).
+
+    Returns:
+        FarmResult: The per-turbine results and the solved flow field.
+    """
+    layout = layout.subset(np.arange(layout.n_turbines))
+    if yaw_angles is not None:
+        layout.yaw_angles[:] = yaw_angles
+    flow_field = FlowField(
+        wind_speed,
+        wind_direction,
+        wind_shear,
+        wind_veer,
+        turbulence_intensity,
+        air_density,
+        wake,
+        TurbineMap.from_layout(layout)
+    )
+    if resolution is not None:
+        flow_field.reinitialize_flow_field(with_resolution=resolution)
+    flow_field.calculate_wake(solver=solver)
+    return FarmResult(flow_field)
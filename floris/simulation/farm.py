@@ -13,7 +13,6 @@ from ..utilities import Vec3
 from .wake_combination import WakeCombination
 from .flow_field import FlowField
 from .turbine_map import TurbineMap
-import copy
 import numpy as np
 
 
@@ -54,7 +53,8 @@ class Farm():
                 -   **layout_y**: A list that contains the 
                     y coordinates of the turbines.
 
-        turbine: The Turbine object used in Farm.
+        turbine: The Turbine object used in Farm. Its turbine type is 
+            shared by every position in the farm.
         wake: The Wake object used in Farm.
 
     Returns:
@@ -75,10 +75,8 @@ class Farm():
             wind_veer=properties["wind_veer"],
             turbulence_intensity=properties["turbulence_intensity"],
             air_density=properties["air_density"],
-            turbine_map=TurbineMap(
-                layout_x,
-                layout_y,
-                [copy.deepcopy(turbine) for ii in range(len(layout_x))]),
+            turbine_map=TurbineMap.from_layout(
+                turbine.layout.relocated(layout_x, layout_y)),
             wake=wake
         )
 
@@ -155,11 +153,7 @@ class Farm():
 
             >>> floris.farm.set_yaw_angles([20.0, 10.0, 0.0])
         """
-        if isinstance(yaw_angles, float) or isinstance(yaw_angles, int):
-            yaw_angles = [yaw_angles] * len(self.turbines)
-
-        for yaw_angle, turbine in zip(yaw_angles, self.turbines):
-            turbine.yaw_angle = yaw_angle
+        self.turbine_map.layout.yaw_angles[:] = yaw_angles
 
     # Getters & Setters
 
@@ -0,0 +1,291 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from ..utilities import cosd, sind
+import numpy as np
+import copy
+
+
+class FarmLayout():
+    """
+    FarmLayout is an array-backed store of the turbine layout in a wind
+    farm.
+
+    FarmLayout holds the turbine positions, the per-turbine control
+    settings and the per-turbine operating state as contiguous numpy
+    arrays so that whole-farm operations (rotation, sorting, bounds, yaw
+    assignment) are single vectorized calls rather than traversals over
+    Python objects. The data common to a turbine model is held once per
+    model in a :py:class:`floris.simulation.turbine.TurbineType` and
+    each position refers to it through **type_index**. The
+    :py:class:`floris.simulation.turbine_map.TurbineMap` is a view on
+    top of this store.
+
+    Args:
+        layout_x: A list or array of the x coordinates of the turbines.
+        layout_y: A list or array of the y coordinates of the turbines.
+        layout_z: A list or array of the z coordinates (hub heights)
+            of the turbines, or a single float used for all turbines.
+        turbine_types: A list of the
+            :py:class:`floris.simulation.turbine.TurbineType` objects
+            referenced by **type_index**.
+        type_index: A list or array of integers mapping each turbine
+            position to an entry in **turbine_types** (default is
+            *None*, in which case every position uses the first type).
+        yaw_angles: A list or array of the turbine yaw angles in
+            degrees (default is *None*, which sets all yaw angles to
+            zero).
+        tilt_angles: A list or array of the turbine tilt angles in
+            degrees (default is *None*, which sets all tilt angles to
+            zero).
+        turbulence_intensity: A list or array of the turbulence
+            intensity at each turbine, or a single float used for all
+            turbines (default is *None*, which sets all values to zero).
+        air_density: A list or array of the air density at each turbine
+            (kg/m^3), or a single float used for all turbines (default
+            is *None*, which sets an invalid value of -1 until
+            calculated).
+
+    Returns:
+        FarmLayout: An instantiated FarmLayout object.
+    """
+
+    def __init__(self,
+                 layout_x,
+                 layout_y,
+                 layout_z,
+                 turbine_types,
+                 type_index=None,
+                 yaw_angles=None,
+                 tilt_angles=None,
+                 turbulence_intensity=None,
+                 air_density=None):
+        self.x = np.array(layout_x, dtype=float)
+        self.y = np.array(layout_y, dtype=float)
+        if self.x.shape != self.y.shape:
+            raise ValueError(
+                "layout_x and layout_y must have the same length")
+        self.z = np.array(
+            np.broadcast_to(np.asarray(layout_z, dtype=float), self.x.shape))
+
+        self.turbine_types = list(turbine_types)
+        if type_index is None:
+            type_index = np.zeros(self.n_turbines, dtype=int)
+        self.type_index = np.array(type_index, dtype=int)
+
+        self.yaw_angles = self._initial_array(yaw_angles)
+        self.tilt_angles = self._initial_array(tilt_angles)
+        self.turbulence_intensity = self._initial_array(turbulence_intensity)
+        if air_density is None:
+            air_density = -1.0
+        self.air_density = self._initial_array(air_density)
+
+        # velocities at the rotor swept area points; each row is padded
+        # to the largest rotor grid among the turbine types
+        self.velocities = np.zeros(
+            (self.n_turbines, self._max_grid_points()))
+
+    def _initial_array(self, values):
+        if values is None:
+            return np.zeros(self.n_turbines)
+        return np.array(
+            np.broadcast_to(np.asarray(values, dtype=float), self.x.shape))
+
+    def _max_grid_points(self):
+        return max([len(turbine_type.grid)
+                    for turbine_type in self.turbine_types] + [0])
+
+    def _fit_velocities(self, turbine_type):
+        # widen the velocities array to the rotor points of a type
+        n_points = len(turbine_type.grid)
+        if n_points > self.velocities.shape[1]:
+            velocities = np.zeros((self.n_turbines, n_points))
+            velocities[:, :self.velocities.shape[1]] = self.velocities
+            self.velocities = velocities
+
+    def add_turbine_type(self, turbine_type):
+        """
+        Adds a turbine type to the layout, widening the velocities array
+        if the new type has more rotor points than the existing types.
+
+        Args:
+            turbine_type: A
+                :py:class:`floris.simulation.turbine.TurbineType` object.
+
+        Returns:
+            int: The index of the new type in **turbine_types**.
+        """
+        self.turbine_types.append(turbine_type)
+        self._fit_velocities(turbine_type)
+        return len(self.turbine_types) - 1
+
+    def set_turbine_type(self, index, turbine_type):
+        """
+        Assigns a turbine type to one position. The type takes the place
+        of the current type of the position if no other position uses
+        it, and is added otherwise; types that no position refers to
+        are then removed, so that repeated assignments do not grow
+        **turbine_types**.
+
+        Args:
+            index: An integer that is the position in the layout.
+            turbine_type: A
+                :py:class:`floris.simulation.turbine.TurbineType` object.
+        """
+        current = self.type_index[index]
+        if np.count_nonzero(self.type_index == current) == 1:
+            self.turbine_types[current] = turbine_type
+            self._fit_velocities(turbine_type)
+        else:
+            self.type_index[index] = self.add_turbine_type(turbine_type)
+
+        used = np.unique(self.type_index)
+        if len(used) < len(self.turbine_types):
+            self.turbine_types = [self.turbine_types[i] for i in used]
+            self.type_index[:] = np.searchsorted(used, self.type_index)
+
+    def type_attribute(self, name):
+        """
+        Gathers an attribute of the turbine types into a per-turbine
+        array.
+
+        Args:
+            name: A string that is the name of a
+                :py:class:`floris.simulation.turbine.TurbineType`
+                attribute, e.g. "rotor_diameter".
+
+        Returns:
+            numpy.ndarray: The value of the attribute at each turbine.
+        """
+        values = np.array([getattr(turbine_type, name)
+                           for turbine_type in self.turbine_types])
+        return values[self.type_index]
+
+    def relocated(self, layout_x, layout_y):
+        """
+        Returns a new FarmLayout at the given turbine positions.
+
+        If the number of positions is unchanged, each position keeps its
+        turbine type, hub height and per-turbine state. Otherwise every
+        position takes the type and state of the first turbine in this
+        layout. The turbine types are shared, not copied.
+
+        Args:
+            layout_x: A list or array of the x coordinates of the
+                turbines.
+            layout_y: A list or array of the y coordinates of the
+                turbines.
+
+        Returns:
+            FarmLayout: A FarmLayout at the new positions.
+        """
+        if len(layout_x) == self.n_turbines:
+            index = np.arange(self.n_turbines)
+        else:
+            index = np.zeros(len(layout_x), dtype=int)
+        return FarmLayout(
+            layout_x,
+            layout_y,
+            self.z[index],
+            self.turbine_types,
+            type_index=self.type_index[index],
+            yaw_angles=self.yaw_angles[index],
+            tilt_angles=self.tilt_angles[index],
+            turbulence_intensity=self.turbulence_intensity[index],
+            air_density=self.air_density[index]
+        )
+
+    def subset(self, index):
+        """
+        Returns a new FarmLayout with the turbines at the given indices.
+
+        Each selected position keeps its turbine type, hub height and 
+        per-turbine state, including the rotor point velocities. The 
+        turbine types are shared, not copied.
+
+        Args:
+            index: A list or array of turbine indices.
+
+        Returns:
+            FarmLayout: A FarmLayout of the selected turbines.
+        """
+        index = np.asarray(index, dtype=int)
+        layout = FarmLayout(
+            self.x[index],
+            self.y[index],
+            self.z[index],
+            self.turbine_types,
+            type_index=self.type_index[index],
+            yaw_angles=self.yaw_angles[index],
+            tilt_angles=self.tilt_angles[index],
+            turbulence_intensity=self.turbulence_intensity[index],
+            air_density=self.air_density[index]
+        )
+        layout.velocities[:] = self.velocities[index]
+        return layout
+
+    def rotated(self, angle, center_of_rotation):
+        """
+        Rotate the turbine positions by a specific angle.
+
+        This function returns a new FarmLayout whose x and y arrays are
+        rotated about the given center of rotation. The turbine types
+        and the per-turbine state arrays are shared with the original
+        layout, which is not modified, so that in-place updates of the
+        state, e.g. the turbine velocities of a solve, are seen through
+        both. The rotated layout is a snapshot for the duration of a
+        solve and must not outlive changes of the turbine types:
+        :py:meth:`add_turbine_type` and :py:meth:`set_turbine_type`
+        replace the type list and may replace the velocity array of the
+        original layout only, after which the layout has to be rotated
+        again.
+
+        Args:
+            angle: The angle, in degrees, of which to rotate the
+                turbines.
+            center_of_rotation: A :py:class:`floris.utilities.Vec3`
+                object that is the center of rotation.
+
+        Returns:
+            FarmLayout: A rotated FarmLayout.
+        """
+        xoffset = self.x - center_of_rotation.x1
+        yoffset = self.y - center_of_rotation.x2
+        rotated_layout = copy.copy(self)
+        rotated_layout.x = xoffset * cosd(angle) - yoffset * sind(angle) \
+            + center_of_rotation.x1
+        rotated_layout.y = yoffset * cosd(angle) + xoffset * sind(angle) \
+            + center_of_rotation.x2
+        return rotated_layout
+
+    def sorted_in_x(self):
+        """
+        Returns the turbine indices ordered from smallest x coordinate
+        to largest x coordinate. Turbines with equal x coordinates
+        keep their layout order.
+
+        Returns:
+            numpy.ndarray: An array of turbine indices.
+        """
+        return np.argsort(self.x, kind="stable")
+
+    @property
+    def n_turbines(self):
+        """
+        Property that returns the number of turbines in the layout.
+
+        Returns:
+            int: The number of turbines.
+        """
+        return self.x.size
+
+    def __len__(self):
+        return self.n_turbines
@@ -10,9 +10,14 @@
 # specific language governing permissions and limitations under the License.
 
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from ..utilities import Vec3
 from ..utilities import cosd, sind, tand
 from scipy.interpolate import griddata
+from .turbine_map import TurbineMap
+from .wake_clusters import WakeClusters
+from .wake_matrix import WakeMatrix
 
 
 class FlowField():
@@ -69,40 +74,87 @@ class FlowField():
         """
         Create grid points at each turbine
         """
-        xt = [coord.x1 for coord in self.turbine_map.coords]
+        layout = self.turbine_map.layout
+        if not self._square_rotor_grids():
+            # one column of rotor grid points per turbine
+            x, y, z, _ = self._discretize_rotor_points()
+            return x[:, :, None], y[:, :, None], z[:, :, None]
+
         rotor_points = int(
             np.sqrt(self.turbine_map.turbines[0].grid_point_count))
-        x_grid = np.zeros((len(xt), rotor_points, rotor_points))
-        y_grid = np.zeros((len(xt), rotor_points, rotor_points))
-        z_grid = np.zeros((len(xt), rotor_points, rotor_points))
-
-        for i, (coord, turbine) in enumerate(self.turbine_map.items):
-            xt = [coord.x1 for coord in self.turbine_map.coords]
-            yt = np.linspace(
-                coord.x2 - turbine.rotor_radius,
-                coord.x2 + turbine.rotor_radius,
-                rotor_points
-            )
-            zt = np.linspace(
-                coord.x3 - turbine.rotor_radius,
-                coord.x3 + turbine.rotor_radius,
-                rotor_points
-            )
-
-            for j in range(len(yt)):
-                for k in range(len(zt)):
-                    x_grid[i, j, k] = xt[i]
-                    y_grid[i, j, k] = yt[j]
-                    z_grid[i, j, k] = zt[k]
-
-                    xoffset = x_grid[i, j, k] - coord.x1
-                    yoffset = y_grid[i, j, k] - coord.x2
-                    x_grid[i, j, k] = xoffset * cosd(-1 * self.wind_direction) - \
-                        yoffset * sind(-1 * self.wind_direction) + coord.x1
-                    y_grid[i, j, k] = yoffset * cosd(-1 * self.wind_direction) + \
-                        xoffset * sind(-1 * self.wind_direction) + coord.x2
-
-        return x_grid, y_grid, z_grid
+        rotor_radius = layout.type_attribute("rotor_diameter") / 2.0
+
+        yt = np.linspace(layout.y - rotor_radius, layout.y + rotor_radius,
+                         rotor_points, axis=1)
+        zt = np.linspace(layout.z - rotor_radius, layout.z + rotor_radius,
+                         rotor_points, axis=1)
+
+        # rotate the rotor points about each turbine so that the rotor
+        # plane is normal to the wind direction
+        yoffset = (yt - layout.y[:, None])[:, :, None]
+        x_grid = -1 * yoffset * sind(-1 * self.wind_direction) \
+            + layout.x[:, None, None]
+        y_grid = yoffset * cosd(-1 * self.wind_direction) \
+            + layout.y[:, None, None]
+        z_grid = zt[:, None, :]
+
+        shape = (layout.n_turbines, rotor_points, rotor_points)
+        return np.broadcast_to(x_grid, shape).copy(), \
+            np.broadcast_to(y_grid, shape).copy(), \
+            np.broadcast_to(z_grid, shape).copy()
+
+    def _square_rotor_grids(self):
+        return all(turbine_type.rotor_grid == "square"
+                   for turbine_type in self.turbine_map.layout.turbine_types)
+
+    def _discretize_rotor_points(self):
+        """
+        Create the rotor grid points of each turbine, in the order of 
+        Turbine.grid, as (turbines x points) arrays and a mask of the 
+        entries that are rotor points
+        """
+        layout = self.turbine_map.layout
+        n_points = layout.velocities.shape[1]
+        n_grid = np.array([len(turbine_type.grid)
+                           for turbine_type in layout.turbine_types])
+        valid = np.arange(n_points)[None, :] < n_grid[layout.type_index, None]
+
+        if self._square_rotor_grids():
+            # the points of the square turbine domain inside each disk;
+            # the domain is ordered [turbine, horizontal, vertical]
+            x, y, z = self._discretize_turbine_domain()
+            n_turbines, rotor_points = x.shape[0], x.shape[1]
+            rotor_radius = layout.type_attribute("rotor_diameter") / 2.0
+            offsets = np.linspace(-rotor_radius, rotor_radius, rotor_points,
+                                  axis=1)
+            in_rotor = (np.hypot(offsets[:, None, :], offsets[:, :, None])
+                        < rotor_radius[:, None, None]).reshape(n_turbines, -1)
+            points = []
+            for values in (x, y, z):
+                packed = np.zeros(valid.shape)
+                packed[valid] = values.transpose(0, 2, 1).reshape(
+                    n_turbines, -1)[in_rotor]
+                points.append(packed)
+            return points[0], points[1], points[2], valid
+
+        # pad each turbine with its first point so that every entry is a
+        # point on its own rotor
+        grid_y = np.zeros(valid.shape)
+        grid_z = np.zeros(valid.shape)
+        for i, turbine_type in enumerate(layout.turbine_types):
+            rows = layout.type_index == i
+            count = len(turbine_type.grid)
+            grid_y[rows, :count] = turbine_type.grid_y
+            grid_z[rows, :count] = turbine_type.grid_z
+            grid_y[rows, count:] = turbine_type.grid_y[0]
+            grid_z[rows, count:] = turbine_type.grid_z[0]
+
+        # rotate the rotor points about each turbine so that the rotor
+        # plane is normal to the wind direction
+        x = -1 * grid_y * sind(-1 * self.wind_direction) + layout.x[:, None]
+        y = grid_y * cosd(-1 * self.wind_direction) + layout.y[:, None]
+        z = grid_z + layout.z[:, None]
+        return x, y, z, valid
 
     def _discretize_freestream_domain(self, xmin, xmax, ymin, ymax, zmin, zmax, resolution):
         """
@@ -137,6 +189,14 @@ class FlowField():
     def _compute_turbine_wake_deflection(self, x, y, turbine, coord, flow_field):
         return self.wake.deflection_function(x, y, turbine, coord, flow_field)
 
+    def _compute_turbine_wake(self, x, y, z, item):
+        # the deficits of one turbine, accounting for its wake deflection
+        coord, turbine = item
+        deflection = self._compute_turbine_wake_deflection(
+            x, y, turbine, coord, self)
+        return self._compute_turbine_velocity_deficit(
+            x, y, z, turbine, coord, deflection, self.wake, self)
+
     def _rotated_grid(self, angle, center_of_rotation):
         xoffset = self.x - center_of_rotation.x1
         yoffset = self.y - center_of_rotation.x2
@@ -151,11 +211,8 @@ class FlowField():
     def _rotated_dir(self, angle, center_of_rotation, rotated_map):
 
         # get new boundaries for the wind farm once rotated
-        x_coord = []
-        y_coord = []
-        for coord in rotated_map.coords:
-            x_coord.append(coord.x1)
-            y_coord.append(coord.x2)
+        x_coord = rotated_map.layout.x
+        y_coord = rotated_map.layout.y
 
         if str(self.wake.velocity_model) == 'curl':
             # re-setup the grid for the curl model
@@ -190,7 +247,33 @@ class FlowField():
         compute wake overlap based on the number of points that are not freestream velocity, i.e. affected by the wake
         """
         count = np.sum(freestream_velocities - wake_velocities <= 0.05)
-        return (turbine.grid_point_count - count) / turbine.grid_point_count
+        point_count = turbine.turbine_type.sample_point_count
+        return (point_count - count) / point_count
+
+    def _subset(self, index):
+        # a flow field with the same inflow and wake model holding only the
+        # given turbines, with domain bounds covering only those turbines
+        flow_field = FlowField.__new__(FlowField)
+        for name in ("wind_speed", "wind_direction", "wind_shear",
+                     "wind_veer", "turbulence_intensity", "air_density",
+                     "wake"):
+            setattr(flow_field, name, getattr(self, name))
+        flow_field.turbine_map = TurbineMap.from_layout(
+            self.turbine_map.layout.subset(index))
+        flow_field.max_diameter = np.max(
+            flow_field.turbine_map.layout.type_attribute("rotor_diameter"))
+
+        # the shear profile and the vertical extent of the domain are
+        # those of the whole farm, whatever the hub heights of the subset
+        flow_field.specified_wind_height = self.specified_wind_height
+        flow_field.set_bounds()
+        flow_field._zmin = self._zmin
+        flow_field._zmax = self._zmax
+
+        flow_field._compute_initialized_domain(
+            with_resolution=self.wake.velocity_model.model_grid_resolution)
+        flow_field.turbine_map.layout.velocities[:] = 0.0
+        return flow_field
 
     # Public methods
 
@@ -218,27 +301,25 @@ class FlowField():
 
         # For the curl model, bounds are hard coded
         if self.wake.velocity_model.model_string == 'curl':
-            coords = self.turbine_map.coords
-            x = [coord.x1 for coord in coords]
-            y = [coord.x2 for coord in coords]
+            x = self.turbine_map.layout.x
+            y = self.turbine_map.layout.y
             eps = 0.1
-            self._xmin = min(x) - 2 * self.max_diameter
-            self._xmax = max(x) + 10 * self.max_diameter
-            self._ymin = min(y) - 2 * self.max_diameter
-            self._ymax = max(y) + 2 * self.max_diameter
+            self._xmin = np.min(x) - 2 * self.max_diameter
+            self._xmax = np.max(x) + 10 * self.max_diameter
+            self._ymin = np.min(y) - 2 * self.max_diameter
+            self._ymax = np.max(y) + 2 * self.max_diameter
             self._zmin = 0 + eps
             self._zmax = 6 * self.specified_wind_height
 
         # Else, if none provided, use a shorter boundary for other models
         elif bounds_to_set is None:
-            coords = self.turbine_map.coords
-            x = [coord.x1 for coord in coords]
-            y = [coord.x2 for coord in coords]
+            x = self.turbine_map.layout.x
+            y = self.turbine_map.layout.y
             eps = 0.1
-            self._xmin = min(x) - 2 * self.max_diameter
-            self._xmax = max(x) + 10 * self.max_diameter
-            self._ymin = min(y) - 2 * self.max_diameter
-            self._ymax = max(y) + 2 * self.max_diameter
+            self._xmin = np.min(x) - 2 * self.max_diameter
+            self._xmax = np.max(x) + 10 * self.max_diameter
+            self._ymin = np.min(y) - 2 * self.max_diameter
+            self._ymax = np.max(y) + 2 * self.max_diameter
             self._zmin = 0 + eps
             self._zmax = 2 * self.specified_wind_height
 
@@ -311,20 +392,19 @@ class FlowField():
             self.wind_veer = wind_veer
         if turbulence_intensity is not None:
             self.turbulence_intensity = turbulence_intensity
-            for turbine in self.turbine_map.turbines:
-                turbine.turbulence_intensity = self.turbulence_intensity
+            self.turbine_map.layout.turbulence_intensity[:] = \
+                self.turbulence_intensity
         if air_density is not None:
             self.air_density = air_density
-            for turbine in self.turbine_map.turbines:
-                turbine.air_density = self.air_density
+            self.turbine_map.layout.air_density[:] = self.air_density
         if wake is not None:
             self.wake = wake
         if with_resolution is None:
             with_resolution = self.wake.velocity_model.model_grid_resolution
 
         # initialize derived attributes and constants
-        self.max_diameter = max(
-            [turbine.rotor_diameter for turbine in self.turbine_map.turbines])
+        self.max_diameter = np.max(
+            self.turbine_map.layout.type_attribute("rotor_diameter"))
         self.specified_wind_height = self.turbine_map.turbines[0].hub_height
 
         # Set the domain bounds
@@ -334,10 +414,10 @@ class FlowField():
         self._compute_initialized_domain(with_resolution=with_resolution)
 
         # reinitialize the turbines
-        for turbine in self.turbine_map.turbines:
-            turbine.reinitialize_turbine()
+        self.turbine_map.layout.velocities[:] = 0.0
 
-    def calculate_wake(self, no_wake=False):
+    def calculate_wake(self, no_wake=False, solver="grid", tolerance=0.0,
+                       max_workers=None):
         """
         Updates the flow field based on turbine activity.
 
@@ -350,11 +430,63 @@ class FlowField():
             no_wake: A bool that when *True* updates the turbine 
                 quantities without calculating the wake or adding the 
                 wake to the flow field.
+            solver: A string that selects how the wakes are evaluated 
+                (default is "grid"). The "grid" solver evaluates every 
+                wake over the flow field grid. The "matrix" solver 
+                evaluates the wakes only at the downstream rotor points 
+                with :py:class:`floris.simulation.wake_matrix.WakeMatrix` 
+                and the "rotor_average" solver combines wake deficits 
+                integrated over the downstream rotor disks. These two 
+                update the turbines but not the flow field velocities 
+                and are not available for the curl model. The "clusters" 
+                solver splits the farm into groups of turbines whose 
+                wakes do not interact and solves each group on its own 
+                grid in parallel with 
+                :py:class:`floris.simulation.wake_clusters.WakeClusters`, 
+                also leaving the flow field velocities uncomputed and 
+                not available for the curl model.
+            tolerance: A float that, when nonzero, lets the "matrix" and 
+                "rotor_average" solvers aggregate the wakes of distant 
+                groups of upstream turbines. It is the largest ratio of 
+                group size to distance that is aggregated (default is 
+                0.0, which evaluates every wake exactly).
+            max_workers: An integer that, when given, is the number of 
+                threads with which the "grid" solver evaluates the wakes 
+                of turbines that do not interact, or the number of 
+                processes used by the "clusters" solver (default is 
+                *None*, which evaluates the "grid" solver wakes one at a 
+                time and uses one process per processor for "clusters"). 
+                The turbines are grouped into levels with 
+                :py:meth:`floris.simulation.wake_clusters.WakeClusters.dependency_levels` 
+                and the wakes of each level are combined in downstream 
+                order, so the results do not depend on the number of 
+                threads. As in the sequential solve, the turbulence 
+                intensity of a turbine comes from the furthest 
+                downstream wake overlapping it. The results differ from 
+                the sequential solve only by the wake tails outside the 
+                interaction cones, and the curl model is not supported.
 
         Returns:
             *None* -- The flow field and turbine properties are updated 
             directly in the :py:class:`floris.simulation.floris` object.
         """
+        if solver in ("matrix", "rotor_average"):
+            self.wake_matrix = WakeMatrix(
+                self, rotor_average=(solver == "rotor_average"),
+                tolerance=tolerance)
+            self.wake_matrix.calculate_wake(no_wake=no_wake)
+            return
+        elif solver == "clusters":
+            WakeClusters(self).calculate_wake(
+                no_wake=no_wake, max_workers=max_workers)
+            return
+        elif solver != "grid":
+            raise ValueError("solver must be one of 'grid', 'matrix', "
+                             "'rotor_average' or 'clusters'")
+        elif max_workers is not None \
+                and self.wake.velocity_model.model_string == 'curl':
+            raise ValueError(
+                "the curl model wakes cannot be evaluated in parallel")
 
         # define the center of rotation with reference to 270 deg
         center_of_rotation = Vec3(0, 0, 0)
@@ -371,66 +503,97 @@ class FlowField():
         # sort the turbine map
         sorted_map = rotated_map.sorted_in_x_as_list()
 
+        # the downstream rank of each turbine, so that the turbulence
+        # intensity of a turbine is set by its furthest downstream
+        # overlapping wake whatever the order the wakes are combined in
+        rank = {id(turbine): i for i, (_, turbine) in enumerate(sorted_map)}
+        ti_source = {}
+
+        # group the turbines into levels that do not interact, or visit
+        # them one at a time
+        executor = None
+        if max_workers is None:
+            levels = [[turbine] for turbine in sorted_map]
+        else:
+            items = rotated_map.items
+            levels = [[items[i] for i in level] for level in
+                      WakeClusters(self).dependency_levels()]
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+
         # calculate the velocity deficit and wake deflection on the mesh
         u_wake = np.zeros(np.shape(self.u))
         v_wake = np.zeros(np.shape(self.u))
         w_wake = np.zeros(np.shape(self.u))
-        for coord, turbine in sorted_map:
-
-            # update the turbine based on the velocity at its hub
-            turbine.update_velocities(
-                u_wake, coord, self, rotated_x, rotated_y, rotated_z)
-
-            # get the wake deflecton field
-            deflection = self._compute_turbine_wake_deflection(
-                rotated_x, rotated_y, turbine, coord, self)
-
-            # get the velocity deficit accounting for the deflection
-            turb_u_wake, turb_v_wake, turb_w_wake = self._compute_turbine_velocity_deficit(
-                rotated_x, rotated_y, rotated_z, turbine, coord, deflection, self.wake, self)
-
-            # include turbulence model for the gaussian wake model from Porte-Agel
-            if self.wake.velocity_model.model_string == 'gauss':
-
-                # compute area overlap of wake on other turbines and update downstream turbine turbulence intensities
-                for coord_ti, turbine_ti in sorted_map:
-
-                    if coord_ti.x1 > coord.x1 and np.abs(coord.x2 - coord_ti.x2) < 2*turbine.rotor_diameter:
-                        # only assess the effects of the current wake
-
-                        freestream_velocities = turbine_ti.calculate_swept_area_velocities(
-                            self.wind_direction,
-                            self.u_initial,
-                            coord_ti,
-                            rotated_x,
-                            rotated_y,
-                            rotated_z)
-
-                        wake_velocities = turbine_ti.calculate_swept_area_velocities(
-                            self.wind_direction,
-                            self.u_initial - turb_u_wake,
-                            coord_ti,
-                            rotated_x,
-                            rotated_y,
-                            rotated_z)
-
-                        area_overlap = self._calculate_area_overlap(
-                            wake_velocities, freestream_velocities, turbine)
-                        if area_overlap > 0.0:
-                            turbine_ti.turbulence_intensity = turbine_ti.calculate_turbulence_intensity(
-                                self.turbulence_intensity,
-                                self.wake.velocity_model,
-                                coord_ti,
-                                coord,
-                                turbine
-                            )
-
-            # combine this turbine's wake into the full wake field
-            if not no_wake:
-                # TODO: why not use the wake combination scheme in every component?
-                u_wake = self.wake.combination_function(u_wake, turb_u_wake)
-                v_wake = (v_wake + turb_v_wake)
-                w_wake = (w_wake + turb_w_wake)
+        try:
+            for level in levels:
+
+                # update the turbines based on the velocity at their hubs
+                for coord, turbine in level:
+                    turbine.update_velocities(
+                        u_wake, coord, self, rotated_x, rotated_y, rotated_z)
+
+                # get the wake deflection and velocity deficit of each turbine,
+                # in parallel for the turbines of a level
+                if len(level) == 1:
+                    wakes = [self._compute_turbine_wake(
+                        rotated_x, rotated_y, rotated_z, level[0])]
+                else:
+                    wakes = list(executor.map(partial(
+                        self._compute_turbine_wake, rotated_x, rotated_y,
+                        rotated_z), level))
+
+                # combine the wakes in downstream order
+                for (coord, turbine), (turb_u_wake, turb_v_wake, turb_w_wake) \
+                        in zip(level, wakes):
+
+                    # include turbulence model for the gaussian wake model from Porte-Agel
+                    if self.wake.velocity_model.model_string == 'gauss':
+
+                        # compute area overlap of wake on other turbines and update downstream turbine turbulence intensities
+                        for coord_ti, turbine_ti in sorted_map:
+
+                            if coord_ti.x1 > coord.x1 and np.abs(coord.x2 - coord_ti.x2) < 2*turbine.rotor_diameter:
+                                # only assess the effects of the current wake
+
+                                freestream_velocities = turbine_ti.calculate_swept_area_velocities(
+                                    self.wind_direction,
+                                    self.u_initial,
+                                    coord_ti,
+                                    rotated_x,
+                                    rotated_y,
+                                    rotated_z)
+
+                                wake_velocities = turbine_ti.calculate_swept_area_velocities(
+                                    self.wind_direction,
+                                    self.u_initial - turb_u_wake,
+                                    coord_ti,
+                                    rotated_x,
+                                    rotated_y,
+                                    rotated_z)
+
+                                area_overlap = self._calculate_area_overlap(
+                                    wake_velocities, freestream_velocities, turbine)
+                                if area_overlap > 0.0 and ti_source.get(
+                                        id(turbine_ti), -1) < rank[id(turbine)]:
+                                    ti_source[id(turbine_ti)] = rank[id(turbine)]
+                                    turbine_ti.turbulence_intensity = turbine_ti.calculate_turbulence_intensity(
+                                        self.turbulence_intensity,
+                                        self.wake.velocity_model,
+                                        coord_ti,
+                                        coord,
+                                        turbine
+                                    )
+
+                    # combine this turbine's wake into the full wake field
+                    if not no_wake:
+                        # TODO: why not use the wake combination scheme in every component?
+                        u_wake = self.wake.combination_function(u_wake, turb_u_wake)
+                        v_wake = (v_wake + turb_v_wake)
+                        w_wake = (w_wake + turb_w_wake)
+        finally:
+            # the worker threads are released even if a wake fails
+            if executor is not None:
+                executor.shutdown()
 
         # apply the velocity deficit field to the freestream
         if not no_wake:
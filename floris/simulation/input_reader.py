@@ -47,6 +47,11 @@ class InputReader():
             "TSR": float
         }
 
+        self._turbine_optional_properties = {
+            "rotor_grid": str,
+            "rotor_grid_resolution": list
+        }
+
         self._wake_properties = {
             "velocity_model": str,
             "deflection_model": str,
@@ -81,7 +86,7 @@ class InputReader():
             data = json.load(jsonfile)
         return data
 
-    def _validateJSON(self, json_dict, type_map):
+    def _validateJSON(self, json_dict, type_map, optional_type_map=None):
         """
         Verifies that the expected fields exist in the json input file 
         and validates the type of the input data by casting the fields 
@@ -91,6 +96,9 @@ class InputReader():
             json_dict: Input dictionary with all elements of type str.
             type_map: Predefined type map dictionary for type checking 
                 inputs structured as {"property": type}.
+            optional_type_map: Predefined type map dictionary for type 
+                checking optional inputs, which are validated only if 
+                they are given (default is *None*).
 
         Returns:
             dict: Validated and correctly typed input property 
@@ -135,6 +143,18 @@ class InputReader():
 
             propDict[element] = value
 
+        for element in optional_type_map or {}:
+            if element not in properties:
+                continue
+
+            value, error = self._cast_to_type(
+                optional_type_map[element], properties[element])
+            if error is not None:
+                raise error("'{}' must be of type '{}'".format(
+                    element, optional_type_map[element]))
+
+            propDict[element] = value
+
         validated["properties"] = propDict
 
         return validated
@@ -166,7 +186,8 @@ class InputReader():
         Returns:
             Turbine: An instantiated Turbine object.
         """
-        propertyDict = self._validateJSON(json_dict, self._turbine_properties)
+        propertyDict = self._validateJSON(json_dict, self._turbine_properties,
+                                          self._turbine_optional_properties)
         propertyDict["properties"]["yaw_angle"] = propertyDict["properties"]["yaw_angle"]
         propertyDict["properties"]["tilt_angle"] = propertyDict["properties"]["tilt_angle"]
         return Turbine(propertyDict)
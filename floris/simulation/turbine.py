@@ -10,66 +10,62 @@
 # specific language governing permissions and limitations under the License.
 
 import numpy as np
+import copy
 from scipy.interpolate import interp1d
 from scipy.interpolate import griddata
 from ..utilities import cosd, sind, tand
+from .farm_layout import FarmLayout
 
 
-class Turbine():
+def polar_rotor_quadrature(n_radial, n_azimuthal):
     """
-    Turbine is a class containing objects pertaining to the individual 
-    turbines.
+    Returns the nodes and weights of a polar Gauss-Legendre quadrature 
+    over a rotor disk of unit radius.
 
-    Turbine is a model class representing a particular wind turbine. It 
-    is largely a container of data and parameters, but also contains 
-    methods to probe properties for output.
+    The rings are placed at the Gauss-Legendre nodes of the squared 
+    radius, which integrates the area element exactly, and the points 
+    on each ring are evenly spaced in azimuth. The weights sum to one, 
+    so a weighted sum of values at the nodes is their area average over 
+    the disk.
 
     Args:
-        instance_dictionary: A dictionary that is generated from the 
-            input_reader; it should have the following key-value pairs:
+        n_radial: An integer that is the number of rings.
+        n_azimuthal: An integer that is the number of points on each 
+            ring.
 
-            -   **description**: A string containing a description of 
-                the turbine.
-            -   **properties**: A dictionary containing the following 
-                key-value pairs:
+    Returns:
+        numpy.ndarray, numpy.ndarray, numpy.ndarray: The horizontal and 
+        vertical offsets of the nodes from the hub and the weight of 
+        each node.
+    """
+    nodes, ring_weights = np.polynomial.legendre.leggauss(n_radial)
+    radius = np.sqrt((nodes + 1.0) / 2.0)
+    theta = 2 * np.pi * (np.arange(n_azimuthal) + 0.5) / n_azimuthal
+    y = (radius[:, None] * np.cos(theta)[None, :]).ravel()
+    z = (radius[:, None] * np.sin(theta)[None, :]).ravel()
+    weights = np.repeat(ring_weights / 2.0 / n_azimuthal, n_azimuthal)
+    return y, z, weights
 
-                -   **rotor_diameter**: A float that is the rotor 
-                    diameter (m/s).
-                -   **hub_height**: A float that is the hub height (m).
-                -   **blade_count**: An integer that is the number of 
-                    blades.
-                -   **pP**: A float that is the cosine exponent 
-                    relating the yaw misalignment angle to power.
-                -   **pT**: A float that is the cosine exponent 
-                    relating the rotor tilt angle to power.
-                -   **generator_efficiency**: A float that is the 
-                    generator efficiency factor used to scale the power 
-                    production.
-                -   **power_thrust_table**: A dictionary containing the 
-                    following key-value pairs:
 
-                    -   **power**: A list of floats describing the 
-                        coefficient of power at different wind speeds.
-                    -   **thrust**: A list of floats describing the 
-                        coefficient of thrust at different wind speeds.
-                    -   **wind_speed**: A list of floats containing the 
-                        wind speeds for which the power and thrust 
-                        values are provided (m/s).
+class TurbineType():
+    """
+    TurbineType holds the data shared by every turbine of one model.
 
-                -   **yaw_angle**: A float that is the yaw angle of the 
-                    turbine relative to the wind direction (deg). A 
-                    positive value represents a counter-clockwise 
-                    rotation relative to the wind direction. 
-                -   **tilt_angle**: A float that is the tilt angle of 
-                    the turbine (deg). Positive values correspond to a 
-                    downward rotation of the rotor for an upstream 
-                    turbine. 
-                -   **TSR**: A float that is the tip-speed ratio of the 
-                    turbine. This parameter is used in the "curl" wake 
-                    model.
+    TurbineType is the flyweight behind
+    :py:class:`floris.simulation.turbine.Turbine`: the description, rotor
+    geometry, power and thrust tables, rotor swept area grid and the
+    power and thrust coefficient interpolants are built once per turbine
+    model and shared by every position in the farm that uses it. A
+    TurbineType is treated as immutable once built; a Turbine that
+    changes one of these attributes is given its own modified copy.
+
+    Args:
+        instance_dictionary: A dictionary that is generated from the 
+            input_reader; see :py:class:`floris.simulation.turbine.Turbine` 
+            for the expected key-value pairs.
 
     Returns:
-        Turbine: An instantiated Turbine object.
+        TurbineType: An instantiated TurbineType object.
     """
 
     def __init__(self, instance_dictionary):
@@ -83,23 +79,15 @@ class Turbine():
         self.pT = properties["pT"]
         self.generator_efficiency = properties["generator_efficiency"]
         self.power_thrust_table = properties["power_thrust_table"]
-        self.yaw_angle = properties["yaw_angle"]
-        self.tilt_angle = properties["tilt_angle"]
         self.tsr = properties["TSR"]
+        self.rotor_grid = properties.get("rotor_grid", "square")
+        self.rotor_grid_resolution = properties.get(
+            "rotor_grid_resolution", None)
 
         # constants
         self.grid_point_count = 5*5
-        if np.sqrt(self.grid_point_count) % 1 != 0.0:
-            raise ValueError(
-                "Turbine.grid_point_count must be the square of a number")
 
-        self.reinitialize_turbine()
-
-        # initialize derived attributes
-        self.grid = self._create_swept_area_grid()
-
-        # initialize to an invalid value until calculated
-        self.air_density = -1
+        self.reinitialize()
 
     # Private methods
 
@@ -133,30 +121,296 @@ class Turbine():
 
         return grid
 
-    def _fCp(self, at_wind_speed):
-        cp = self.power_thrust_table["power"]
+    def _create_polar_grid(self):
+        # polar Gauss-Legendre rings, weighted by the area they represent
+        n_radial, n_azimuthal = self.rotor_grid_resolution or (2, 4)
+        y, z, weights = polar_rotor_quadrature(n_radial, n_azimuthal)
+        grid = list(zip(self.rotor_radius * y, self.rotor_radius * z))
+        return grid, weights
+
+    def _create_rews_grid(self):
+        # the tools package imports the simulation package, so the REWS
+        # weighting is imported when it is needed
+        from ..tools.rews import determine_rews_weights
+
+        # points on the vertical centerline at the middle of equal-height
+        # strips, weighted by the area of the strip
+        n_heights = (self.rotor_grid_resolution or [5])[0]
+        offsets = self.rotor_radius \
+            * ((2 * np.arange(n_heights) + 1) / n_heights - 1)
+        weights = determine_rews_weights(
+            self.rotor_radius, self.hub_height, self.hub_height + offsets)
+        grid = [(0.0, offset) for offset in offsets]
+        return grid, np.array(weights)
+
+    # Public methods
+
+    def reinitialize(self):
+        """
+        This method rebuilds the derived attributes (the rotor swept 
+        area grid and its weights, and the power and thrust coefficient 
+        interpolants) from the turbine data.
+
+        The rotor grid is selected by **rotor_grid**:
+
+            -   **square**: the points of a square grid of 
+                **grid_point_count** points that lie inside the rotor 
+                disk, equally weighted.
+            -   **polar**: a polar Gauss-Legendre quadrature with 
+                **rotor_grid_resolution** = [rings, points per ring] 
+                (default [2, 4]).
+            -   **rews**: rotor-equivalent wind speed weighting of 
+                **rotor_grid_resolution** = [heights] points on the 
+                vertical centerline (default [5]), see 
+                :py:func:`floris.tools.rews.determine_rews_weights`.
+
+        Returns:
+            *None* -- The derived attributes are updated directly.
+        """
+        if self.rotor_grid == "square":
+            if np.sqrt(self.grid_point_count) % 1 != 0.0:
+                raise ValueError(
+                    "Turbine.grid_point_count must be the square of a number")
+            self.grid = self._create_swept_area_grid()
+            self.grid_weights = None
+        elif self.rotor_grid == "polar":
+            self.grid, self.grid_weights = self._create_polar_grid()
+        elif self.rotor_grid == "rews":
+            self.grid, self.grid_weights = self._create_rews_grid()
+        else:
+            raise ValueError(
+                "rotor_grid must be one of 'square', 'polar' or 'rews'")
+        self.grid_y = np.array([point[0] for point in self.grid])
+        self.grid_z = np.array([point[1] for point in self.grid])
+
         wind_speed = self.power_thrust_table["wind_speed"]
-        fCpInterp = interp1d(wind_speed, cp, fill_value='extrapolate')
-        if at_wind_speed < min(wind_speed):
-            return max(cp)
+        self._min_wind_speed = min(wind_speed)
+        self._max_cp = max(self.power_thrust_table["power"])
+        self._fCpInterp = interp1d(wind_speed,
+                                   self.power_thrust_table["power"],
+                                   fill_value='extrapolate')
+        self._fCtInterp = interp1d(wind_speed,
+                                   self.power_thrust_table["thrust"],
+                                   fill_value='extrapolate')
+
+    def fCp(self, at_wind_speed):
+        """
+        This method returns the power coefficient interpolated from the 
+        power table.
+
+        Args:
+            at_wind_speed: A float that is the wind speed (m/s).
+
+        Returns:
+            float: The power coefficient.
+        """
+        if at_wind_speed < self._min_wind_speed:
+            return self._max_cp
         else:
-            _cp = fCpInterp(at_wind_speed)
+            _cp = self._fCpInterp(at_wind_speed)
             if _cp.size > 1:
                 _cp = _cp[0]
             return float(_cp)
 
-    def _fCt(self, at_wind_speed):
-        ct = self.power_thrust_table["thrust"]
-        wind_speed = self.power_thrust_table["wind_speed"]
-        fCtInterp = interp1d(wind_speed, ct, fill_value='extrapolate')
-        if at_wind_speed < min(wind_speed):
+    def fCt(self, at_wind_speed):
+        """
+        This method returns the thrust coefficient interpolated from the 
+        thrust table.
+
+        Args:
+            at_wind_speed: A float that is the wind speed (m/s).
+
+        Returns:
+            float: The thrust coefficient.
+        """
+        if at_wind_speed < self._min_wind_speed:
             return 0.99
         else:
-            _ct = fCtInterp(at_wind_speed)
+            _ct = self._fCtInterp(at_wind_speed)
             if _ct.size > 1:
                 _ct = _ct[0]
             return float(_ct)
 
+    def rotor_average(self, values):
+        """
+        This method returns the area average of values at the rotor 
+        grid points, using the grid weights.
+
+        Args:
+            values: An array of floats with one value per rotor grid 
+                point.
+
+        Returns:
+            float: The rotor-averaged value.
+        """
+        if self.grid_weights is None:
+            return np.mean(values)
+        return np.sum(self.grid_weights * values)
+
+    @property
+    def sample_point_count(self):
+        """
+        This property returns the number of points the rotor area is 
+        sampled with when computing the wake overlap: every point of 
+        the square grid, including those outside the rotor disk, or the 
+        number of points of the other rotor grids.
+
+        Returns:
+            int: The number of sample points.
+        """
+        if self.rotor_grid == "square":
+            return self.grid_point_count
+        return len(self.grid)
+
+    @property
+    def rotor_radius(self):
+        """
+        This property returns the rotor radius of the turbine type (m).
+
+        Returns:
+            float: The rotor radius.
+        """
+        return self.rotor_diameter / 2.0
+
+
+def _turbine_type_property(name, description):
+    # a Turbine attribute that reads from the shared TurbineType and
+    # copies the type on write so that other turbines are not affected
+    def getter(self):
+        return getattr(self._turbine_type, name)
+
+    def setter(self, value):
+        self._set_type_attribute(name, value)
+
+    return property(getter, setter, doc=description)
+
+
+class Turbine():
+    """
+    Turbine is a class containing objects pertaining to the individual 
+    turbines.
+
+    Turbine is a model class representing a particular wind turbine. It 
+    is largely a container of data and parameters, but also contains 
+    methods to probe properties for output.
+
+    A Turbine is a lightweight view of one position in a 
+    :py:class:`floris.simulation.farm_layout.FarmLayout`. The data common 
+    to the turbine model is held in a shared 
+    :py:class:`floris.simulation.turbine.TurbineType` and the 
+    per-position state (yaw and tilt angles, rotor velocities, 
+    turbulence intensity and air density) is held in the layout arrays. 
+    Setting a turbine model attribute, such as ``rotor_diameter``, gives 
+    this turbine its own copy of the TurbineType; nested values such as 
+    ``power_thrust_table`` should be replaced rather than modified in 
+    place.
+
+    Args:
+        instance_dictionary: A dictionary that is generated from the 
+            input_reader; it should have the following key-value pairs:
+
+            -   **description**: A string containing a description of 
+                the turbine.
+            -   **properties**: A dictionary containing the following 
+                key-value pairs:
+
+                -   **rotor_diameter**: A float that is the rotor 
+                    diameter (m/s).
+                -   **hub_height**: A float that is the hub height (m).
+                -   **blade_count**: An integer that is the number of 
+                    blades.
+                -   **pP**: A float that is the cosine exponent 
+                    relating the yaw misalignment angle to power.
+                -   **pT**: A float that is the cosine exponent 
+                    relating the rotor tilt angle to power.
+                -   **generator_efficiency**: A float that is the 
+                    generator efficiency factor used to scale the power 
+                    production.
+                -   **power_thrust_table**: A dictionary containing the 
+                    following key-value pairs:
+
+                    -   **power**: A list of floats describing the 
+                        coefficient of power at different wind speeds.
+                    -   **thrust**: A list of floats describing the 
+                        coefficient of thrust at different wind speeds.
+                    -   **wind_speed**: A list of floats containing the 
+                        wind speeds for which the power and thrust 
+                        values are provided (m/s).
+
+                -   **yaw_angle**: A float that is the yaw angle of the 
+                    turbine relative to the wind direction (deg). A 
+                    positive value represents a counter-clockwise 
+                    rotation relative to the wind direction. 
+                -   **tilt_angle**: A float that is the tilt angle of 
+                    the turbine (deg). Positive values correspond to a 
+                    downward rotation of the rotor for an upstream 
+                    turbine. 
+                -   **TSR**: A float that is the tip-speed ratio of the 
+                    turbine. This parameter is used in the "curl" wake 
+                    model.
+                -   **rotor_grid**: An optional string that selects the 
+                    rotor grid, one of "square" (default), "polar" or 
+                    "rews"; see 
+                    :py:meth:`floris.simulation.turbine.TurbineType.reinitialize`.
+                -   **rotor_grid_resolution**: An optional list of 
+                    integers that sets the resolution of the "polar" or 
+                    "rews" rotor grids.
+
+    Returns:
+        Turbine: An instantiated Turbine object.
+    """
+
+    def __init__(self, instance_dictionary):
+
+        properties = instance_dictionary["properties"]
+        turbine_type = TurbineType(instance_dictionary)
+
+        # the per-position state is stored in a layout; a standalone
+        # turbine holds its own single-position layout until it is bound
+        # into a turbine map
+        self.bind_to_layout(
+            FarmLayout([0.0], [0.0], [turbine_type.hub_height],
+                       [turbine_type],
+                       yaw_angles=[properties["yaw_angle"]],
+                       tilt_angles=[properties["tilt_angle"]]),
+            0
+        )
+
+    @classmethod
+    def from_layout(cls, layout, index):
+        """
+        Creates a Turbine that is a view of one position in a layout, 
+        using the layout's turbine type for that position.
+
+        Args:
+            layout: A :py:class:`floris.simulation.farm_layout.FarmLayout` 
+                object.
+            index: An integer that is the position in the layout.
+
+        Returns:
+            Turbine: A Turbine bound to the layout.
+        """
+        turbine = cls.__new__(cls)
+        turbine.bind_to_layout(layout, index)
+        return turbine
+
+    # Private methods
+
+    def _set_type_attribute(self, name, value):
+        turbine_type = copy.copy(self._turbine_type)
+        setattr(turbine_type, name, value)
+        turbine_type.reinitialize()
+        self._layout.set_turbine_type(self._index, turbine_type)
+        self._turbine_type = turbine_type
+        if name == "hub_height":
+            self._layout.z[self._index] = value
+
+    def _fCp(self, at_wind_speed):
+        return self._turbine_type.fCp(at_wind_speed)
+
+    def _fCt(self, at_wind_speed):
+        return self._turbine_type.fCt(at_wind_speed)
+
     # Public methods
 
     def calculate_swept_area_velocities(self, wind_direction, local_wind_speed, coord, x, y, z):
@@ -188,8 +442,8 @@ class Turbine():
         y_grid = y
         z_grid = z
 
-        yPts = np.array([point[0] for point in self.grid])
-        zPts = np.array([point[1] for point in self.grid])
+        yPts = self._turbine_type.grid_y
+        zPts = self._turbine_type.grid_z
 
         # interpolate from the flow field to get the flow field at the grid points
         dist = [np.sqrt((coord.x1 - x_grid)**2 + (coord.x2 + yPts[i] - y_grid) **
@@ -293,7 +547,27 @@ class Turbine():
             *None* -- The velocities are updated directly in the 
             :py:class:`floris.simulation.turbine` object.
         """
-        self.velocities = [0] * self.grid_point_count
+        self.velocities = 0.0
+
+    def bind_to_layout(self, layout, index):
+        """
+        This method points the turbine's per-position state (yaw and
+        tilt angles, rotor velocities, turbulence intensity and air
+        density) and its turbine type to an entry in a
+        :py:class:`floris.simulation.farm_layout.FarmLayout`.
+
+        Args:
+            layout: A :py:class:`floris.simulation.farm_layout.FarmLayout`
+                object that stores the state of this turbine.
+            index: An integer that is the position of this turbine in
+                the layout arrays.
+
+        Returns:
+            *None* -- The turbine is updated directly.
+        """
+        self._layout = layout
+        self._index = index
+        self._turbine_type = layout.turbine_types[layout.type_index[index]]
 
     def set_yaw_angle(self, yaw_angle):
         """
@@ -311,10 +585,131 @@ class Turbine():
 
             >>> floris.farm.turbines[0].set_yaw_angle(20.0)
         """
-        self._yaw_angle = yaw_angle
+        self.yaw_angle = yaw_angle
 
     # Getters & Setters
 
+    description = _turbine_type_property(
+        "description", "A string containing a description of the turbine.")
+    rotor_diameter = _turbine_type_property(
+        "rotor_diameter", "A float that is the rotor diameter (m).")
+    hub_height = _turbine_type_property(
+        "hub_height", "A float that is the hub height (m).")
+    blade_count = _turbine_type_property(
+        "blade_count", "An integer that is the number of blades.")
+    pP = _turbine_type_property(
+        "pP", "A float that is the cosine exponent relating the yaw "
+        "misalignment angle to power.")
+    pT = _turbine_type_property(
+        "pT", "A float that is the cosine exponent relating the rotor tilt "
+        "angle to power.")
+    generator_efficiency = _turbine_type_property(
+        "generator_efficiency", "A float that is the generator efficiency "
+        "factor used to scale the power production.")
+    power_thrust_table = _turbine_type_property(
+        "power_thrust_table", "A dictionary containing the power, thrust "
+        "and wind_speed tables.")
+    tsr = _turbine_type_property(
+        "tsr", "A float that is the tip-speed ratio of the turbine.")
+    grid_point_count = _turbine_type_property(
+        "grid_point_count", "An integer that is the number of points in "
+        "the square grid spanning the rotor.")
+    rotor_grid = _turbine_type_property(
+        "rotor_grid", "A string that selects the rotor grid: 'square', "
+        "'polar' or 'rews'.")
+    rotor_grid_resolution = _turbine_type_property(
+        "rotor_grid_resolution", "A list of integers that sets the "
+        "resolution of the 'polar' or 'rews' rotor grids.")
+
+    @property
+    def turbine_type(self):
+        """
+        This property returns the shared turbine type of the turbine.
+
+        Returns:
+            TurbineType: The :py:class:`floris.simulation.turbine.TurbineType` 
+            object holding the turbine model data.
+        """
+        return self._turbine_type
+
+    @property
+    def layout(self):
+        """
+        This property returns the layout that stores the turbine's 
+        per-position state.
+
+        Returns:
+            FarmLayout: The :py:class:`floris.simulation.farm_layout.FarmLayout` 
+            object this turbine is bound to.
+        """
+        return self._layout
+
+    @property
+    def grid(self):
+        """
+        This property returns the rotor swept area grid of the turbine, 
+        a list of (y, z) offsets from the hub.
+
+        Returns:
+            [(float, float)]: The rotor grid points (m).
+        """
+        return self._turbine_type.grid
+
+    @property
+    def velocities(self):
+        """
+        This property gets or sets the wind speeds at the rotor swept 
+        area grid points (m/s).
+
+        Args:
+            value: An array of floats, or a single float, that is the 
+                new wind speed at each rotor grid point (m/s).
+
+        Returns:
+            numpy.ndarray: The wind speed at each rotor grid point.
+        """
+        return self._layout.velocities[self._index, :len(self.grid)]
+
+    @velocities.setter
+    def velocities(self, value):
+        self._layout.velocities[self._index, :len(self.grid)] = value
+
+    @property
+    def turbulence_intensity(self):
+        """
+        This property gets or sets the turbulence intensity at the 
+        turbine (expressed as a decimal fraction).
+
+        Args:
+            value: A float that is the new turbulence intensity.
+
+        Returns:
+            float: The current turbulence intensity.
+        """
+        return self._layout.turbulence_intensity[self._index]
+
+    @turbulence_intensity.setter
+    def turbulence_intensity(self, value):
+        self._layout.turbulence_intensity[self._index] = value
+
+    @property
+    def air_density(self):
+        """
+        This property gets or sets the air density at the turbine 
+        (kg/m^3).
+
+        Args:
+            value: A float that is the new air density.
+
+        Returns:
+            float: The current air density.
+        """
+        return self._layout.air_density[self._index]
+
+    @air_density.setter
+    def air_density(self, value):
+        self._layout.air_density[self._index] = value
+
     @property
     def rotor_radius(self):
         """
@@ -356,11 +751,11 @@ class Turbine():
             >>> for i, turbine in enumerate(floris.farm.turbines):
             ...     yaw_angles.append(turbine.yaw_angle())
         """
-        return self._yaw_angle
+        return self._layout.yaw_angles[self._index]
 
     @yaw_angle.setter
     def yaw_angle(self, value):
-        self._yaw_angle = value
+        self._layout.yaw_angles[self._index] = value
 
     @property
     def tilt_angle(self):
@@ -378,17 +773,18 @@ class Turbine():
 
             >>> tilt_angle = floris.farm.turbines[0].tilt_angle()
         """
-        return self._tilt_angle
+        return self._layout.tilt_angles[self._index]
 
     @tilt_angle.setter
     def tilt_angle(self, value):
-        self._tilt_angle = value
+        self._layout.tilt_angles[self._index] = value
 
     @property
     def average_velocity(self):
         """
         This property calculates and returns the cube root of the 
-        mean cubed velocity in the turbine's rotor swept area (m/s).
+        mean cubed velocity in the turbine's rotor swept area (m/s), 
+        weighted by the rotor grid weights.
 
         Returns:
             numpy.float64: The average velocity across a rotor.
@@ -398,7 +794,7 @@ class Turbine():
 
             >>> avg_vel = floris.farm.turbines[0].average_velocity()
         """
-        return np.cbrt(np.mean(self.velocities**3))
+        return np.cbrt(self._turbine_type.rotor_average(self.velocities**3))
 
     @property
     def Cp(self):
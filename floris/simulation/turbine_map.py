@@ -10,51 +10,100 @@
 # specific language governing permissions and limitations under the License.
 
 from ..utilities import Vec3
+from .farm_layout import FarmLayout
 from .turbine import Turbine
-import numpy as np
-import copy
 
 
 class TurbineMap():
     """
     TurbineMap contains instances of Turbine for the wind farm.
 
-    TurbineMap is container object which maps a Turbine instance to a 
-    :py:class:`floris.utilities.Vec3` object. This class also provides 
-    some helper methods for sorting and manipulating the turbine layout.
+    TurbineMap is a view which maps each Turbine instance to its 
+    :py:class:`floris.utilities.Vec3` coordinate. The positions, the 
+    turbine types and the per-turbine state are stored in an 
+    array-backed :py:class:`floris.simulation.farm_layout.FarmLayout`, 
+    available through the ``layout`` property for whole-farm array 
+    operations. 
+    This class also provides some helper methods for sorting and 
+    manipulating the turbine layout.
 
     Args:
-        turbine_map_dict: A dictionary mapping of 
-            :py:class:`floris.simulation.turbine.Turbine` to 
-            :py:class:`floris.utilities.Vec3`; it should have the 
-            following form:
-
-            {
-
-                Vec3(): Turbine(),
-
-                Vec3(): Turbine(),
-
-                ...,
-
-                Vec3(): Turbine()
-
-            }
+        layout_x: A list or array of the x coordinates of the turbines.
+        layout_y: A list or array of the y coordinates of the turbines.
+        turbines: A list of :py:class:`floris.simulation.turbine.Turbine` 
+            objects, one for each position in the layout. The turbines 
+            are bound to the layout arrays of this map and keep their 
+            current state; turbines that share a turbine type keep 
+            sharing it.
 
     Returns:
         TurbineMap: An instantiated TurbineMap object.
     """
 
     def __init__(self, layout_x, layout_y, turbines):
+        turbines = list(turbines)
+        if len(turbines) != len(layout_x):
+            raise ValueError(
+                "turbines must have one turbine for each position")
+
+        # collect the distinct turbine types, keeping shared types shared
+        turbine_types = []
+        type_lookup = {}
+        type_index = []
+        for turbine in turbines:
+            key = id(turbine.turbine_type)
+            if key not in type_lookup:
+                type_lookup[key] = len(turbine_types)
+                turbine_types.append(turbine.turbine_type)
+            type_index.append(type_lookup[key])
+
+        layout = FarmLayout(
+            layout_x,
+            layout_y,
+            [turbine.hub_height for turbine in turbines],
+            turbine_types,
+            type_index=type_index,
+            yaw_angles=[turbine.yaw_angle for turbine in turbines],
+            tilt_angles=[turbine.tilt_angle for turbine in turbines],
+            turbulence_intensity=[
+                turbine.turbulence_intensity for turbine in turbines],
+            air_density=[turbine.air_density for turbine in turbines]
+        )
+        for i, turbine in enumerate(turbines):
+            layout.velocities[i, :len(turbine.grid)] = turbine.velocities
+        for i, turbine in enumerate(turbines):
+            turbine.bind_to_layout(layout, i)
+        self._set_layout(layout, turbines)
+
+    @classmethod
+    def from_layout(cls, layout):
         """
-        all are lists
+        Creates a TurbineMap on an existing layout with a new Turbine 
+        view for each position. No turbine data is copied; positions 
+        that share a turbine type share it in the map.
+
+        Args:
+            layout: A :py:class:`floris.simulation.farm_layout.FarmLayout` 
+                object.
+
+        Returns:
+            TurbineMap: A TurbineMap backed by the layout.
         """
-        turbine_dict = {}
-        hub_height = turbines[0].hub_height
-        coordinates = list(zip(layout_x, layout_y))
-        for i, c in enumerate(coordinates):
-            turbine_dict[Vec3(c[0], c[1], hub_height)] = turbines[i]
-        self._turbine_map_dict = turbine_dict
+        turbines = [Turbine.from_layout(layout, i)
+                    for i in range(layout.n_turbines)]
+        return cls._view(layout, turbines)
+
+    @classmethod
+    def _view(cls, layout, turbines):
+        # build a view on an existing layout without rebinding the turbines
+        turbine_map = cls.__new__(cls)
+        turbine_map._set_layout(layout, turbines)
+        return turbine_map
+
+    def _set_layout(self, layout, turbines):
+        self._layout = layout
+        self._turbines = turbines
+        self._coords = None
 
     def rotated(self, angle, center_of_rotation):
         """
@@ -62,8 +111,13 @@ class TurbineMap():
 
         Rotate the turbine coordinates by a given angle about a given 
         center of rotation. This function returns a new TurbineMap 
-        object whose turbines are rotated. The original TurbineMap is 
-        not modified.
+        object whose turbines are rotated. The original TurbineMap and 
+        its coordinates are not modified; the rotated map shares the 
+        Turbine objects and their yaw and tilt angles with the 
+        original. Like the rotated 
+        :py:meth:`floris.simulation.farm_layout.FarmLayout.rotated` 
+        layout it holds, it is a snapshot that must not outlive 
+        changes of the turbine types.
 
         Args:
             angle: The angle, in degrees, of which to rotate the 
@@ -74,13 +128,8 @@ class TurbineMap():
         Returns:
             TurbineMap: A rotated TurbineMap.
         """
-        layout_x = np.zeros(len(self.coords))
-        layout_y = np.zeros(len(self.coords))
-        for i, coord in enumerate(self.coords):
-            coord.rotate_on_x3(angle, center_of_rotation)
-            layout_x[i] = coord.x1prime
-            layout_y[i] = coord.x2prime
-        return TurbineMap(layout_x, layout_y, self.turbines)
+        return TurbineMap._view(
+            self._layout.rotated(angle, center_of_rotation), self._turbines)
 
     def sorted_in_x_as_list(self):
         """
@@ -91,8 +140,21 @@ class TurbineMap():
             [Vec3, Turbine]: A sorted list of turbine coordinates and 
             turbines.
         """
-        coords = sorted(self._turbine_map_dict, key=lambda coord: coord.x1)
-        return [(c, self._turbine_map_dict[c]) for c in coords]
+        coords = self.coords
+        return [(coords[i], self._turbines[i])
+                for i in self._layout.sorted_in_x()]
+
+    @property
+    def layout(self):
+        """
+        Property that returns the array-backed layout of the wind farm.
+
+        Returns:
+            FarmLayout: The :py:class:`floris.simulation.farm_layout.FarmLayout` 
+            object holding the turbine positions, yaw angles and tilt 
+            angles.
+        """
+        return self._layout
 
     @property
     def turbines(self):
@@ -102,7 +164,7 @@ class TurbineMap():
         Returns:
             [Turbine]: A list of Turbine objects.
         """
-        return [turbine for _, turbine in self.items]
+        return self._turbines
 
     @property
     def coords(self):
@@ -113,16 +175,21 @@ class TurbineMap():
         Returns:
             [Vec3]: A list of turbine coordinates.
         """
-        return [coord for coord, _ in self.items]
+        if self._coords is None:
+            self._coords = [
+                Vec3(x1, x2, x3) for x1, x2, x3 in
+                zip(self._layout.x, self._layout.y, self._layout.z)
+            ]
+        return self._coords
 
     @property
     def items(self):
         """
-        Property that returns a list with dictionary pairs of 
-        coordinates and Turbine objects.
+        Property that returns a list with pairs of coordinates and 
+        Turbine objects.
 
         Returns:
-            dict_items: List of dictionary key and value pairs of 
-            coordinates and Turbine objects.
+            [(Vec3, Turbine)]: List of coordinate and Turbine object 
+            pairs.
         """
-        return self._turbine_map_dict.items()
+        return list(zip(self.coords, self._turbines))
@@ -0,0 +1,215 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from ..utilities import Vec3
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from scipy.sparse import csgraph
+import numpy as np
+
+
+def _solve_cluster(flow_field, no_wake, solver):
+    # solves one cluster, possibly in a worker process, and returns its
+    # per-turbine results
+    flow_field.calculate_wake(no_wake=no_wake, solver=solver)
+    layout = flow_field.turbine_map.layout
+    return layout.velocities, layout.turbulence_intensity
+
+
+class WakeClusters():
+    """
+    WakeClusters splits the wind farm into groups of turbines whose
+    wakes do not interact at the current wind direction and solves each
+    group separately.
+
+    In the wind-aligned frame, the wake of each turbine is bounded by a
+    cone whose half width is **margin** rotor diameters at the turbine
+    and grows by **spread** per unit of downstream distance. A
+    downstream turbine whose rotor reaches into the cone interacts with
+    the upstream turbine, and the clusters are the connected groups of
+    interacting turbines, e.g. parallel rows aligned with the wind or
+    separate sub-farms in one input. Each cluster is solved on its own
+    flow field, with domain bounds covering only the cluster, across a
+    pool of worker processes. The turbine velocities and turbulence
+    intensities are then merged back into the farm; the flow field
+    velocities of the farm are not computed. The same interactions
+    order the turbines into the dependency levels used by the threaded
+    grid solver, see :py:meth:`dependency_levels`.
+
+    The default cone contains the jensen and multizone wakes and the
+    gauss wake down to a small fraction of its peak deficit. It should
+    be widened for strongly yawed turbines, whose wakes are deflected
+    out of it. Only the analytic wake models (jensen, multizone and
+    gauss) are supported, since the curl model results depend on the
+    extent and resolution of its grid.
+
+    Args:
+        flow_field: A :py:class:`floris.simulation.flow_field.FlowField`
+            object holding the turbine map, wake model and inflow
+            conditions.
+        spread: A float that is the growth of the wake cone half width
+            per unit of downstream distance (default is 0.1).
+        margin: A float that is the half width of the wake cone at the
+            turbine, in rotor diameters (default is 2.0, the distance
+            within which the gauss model adds wake turbulence).
+
+    Returns:
+        WakeClusters: An instantiated WakeClusters object.
+    """
+
+    def __init__(self, flow_field, spread=0.1, margin=2.0):
+        if flow_field.wake.velocity_model.model_string == 'curl':
+            raise ValueError(
+                "WakeClusters does not support the curl wake model")
+        self.flow_field = flow_field
+        self.spread = spread
+        self.margin = margin
+        self.clusters = None
+
+    def _interacting_pairs(self, layout, block_size):
+        # the (upstream, downstream) turbine pairs whose rotor reaches into
+        # the wake cone, in the rotated layout
+        x, y = layout.x, layout.y
+        diameters = layout.type_attribute("rotor_diameter")
+        n_turbines = layout.n_turbines
+
+        rows, cols = [], []
+        for start in range(0, n_turbines, block_size):
+            upstream = np.arange(start, min(start + block_size, n_turbines))
+            dx = x[None, :] - x[upstream, None]
+            dy = np.abs(y[None, :] - y[upstream, None])
+            half_width = self.margin * diameters[upstream, None] \
+                + self.spread * dx + diameters[None, :] / 2.0
+            source, receiver = np.nonzero((dx >= 0.0) & (dy < half_width))
+            rows.append(upstream[source])
+            cols.append(receiver)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def _rotated_layout(self):
+        flow_field = self.flow_field
+        return flow_field.turbine_map.layout.rotated(
+            flow_field.wind_direction, Vec3(0, 0, 0))
+
+    def find_clusters(self, block_size=256):
+        """
+        Finds the groups of turbines whose wakes do not interact at the
+        current wind direction.
+
+        Args:
+            block_size: An integer that is the number of upstream
+                turbines tested against the farm at once, bounding the
+                memory used (default is 256).
+
+        Returns:
+            [numpy.ndarray]: A list with an array of turbine indices for
+            each cluster, ordered by the first turbine in each cluster.
+        """
+        layout = self._rotated_layout()
+        n_turbines = layout.n_turbines
+        rows, cols = self._interacting_pairs(layout, block_size)
+        graph = sparse.coo_matrix(
+            (np.ones(rows.size), (rows, cols)), shape=(n_turbines, n_turbines))
+        n_clusters, labels = csgraph.connected_components(
+            graph, directed=False)
+
+        order = np.argsort(labels, kind="stable")
+        bounds = np.cumsum(np.bincount(labels, minlength=n_clusters))[:-1]
+        return np.split(order, bounds)
+
+    def dependency_levels(self, block_size=256):
+        """
+        Groups the turbines into levels whose wakes can be evaluated 
+        together.
+
+        A turbine is placed one level after the last of the upstream 
+        turbines, earlier in downstream order, whose wake cone reaches 
+        its rotor. The turbines of a level do not interact with each 
+        other, so once the wakes of the previous levels are combined 
+        their wakes can be evaluated in any order.
+
+        Args:
+            block_size: An integer that is the number of upstream
+                turbines tested against the farm at once, bounding the
+                memory used (default is 256).
+
+        Returns:
+            [numpy.ndarray]: A list with an array of turbine indices for
+            each level, each in downstream order.
+        """
+        layout = self._rotated_layout()
+        n_turbines = layout.n_turbines
+        order = layout.sorted_in_x()
+        position = np.empty(n_turbines, dtype=int)
+        position[order] = np.arange(n_turbines)
+
+        rows, cols = self._interacting_pairs(layout, block_size)
+        upstream = position[rows] < position[cols]
+        predecessors = sparse.csr_matrix(
+            (np.ones(np.count_nonzero(upstream)),
+             (cols[upstream], rows[upstream])),
+            shape=(n_turbines, n_turbines))
+
+        level = np.zeros(n_turbines, dtype=int)
+        for i in order:
+            turbines = predecessors.indices[
+                predecessors.indptr[i]:predecessors.indptr[i + 1]]
+            if turbines.size > 0:
+                level[i] = np.max(level[turbines]) + 1
+
+        by_level = order[np.argsort(level[order], kind="stable")]
+        bounds = np.cumsum(np.bincount(level))[:-1]
+        return np.split(by_level, bounds)
+
+    def calculate_wake(self, no_wake=False, solver="grid", max_workers=None):
+        """
+        Updates the turbine velocities and turbulence intensities by
+        solving each cluster of interacting turbines separately.
+
+        Args:
+            no_wake: A bool that when *True* updates the turbine
+                quantities without combining the wakes into the turbine
+                inflows.
+            solver: A string that is the solver used for each cluster, 
+                one of "grid", "matrix" or "rotor_average" (default is 
+                "grid"). See 
+                :py:meth:`floris.simulation.flow_field.FlowField.calculate_wake`.
+            max_workers: An integer that is the number of worker 
+                processes (default is *None*, which uses the number of 
+                processors). With one worker, or a single cluster, the 
+                clusters are solved in the current process.
+
+        Returns:
+            *None* -- The turbine properties are updated directly and
+            the clusters are stored in **clusters**.
+        """
+        if solver not in ("grid", "matrix", "rotor_average"):
+            raise ValueError(
+                "solver must be one of 'grid', 'matrix' or 'rotor_average'")
+        flow_field = self.flow_field
+        self.clusters = self.find_clusters()
+        cluster_fields = [flow_field._subset(cluster)
+                          for cluster in self.clusters]
+        n_clusters = len(cluster_fields)
+
+        if max_workers == 1 or n_clusters == 1:
+            results = [_solve_cluster(cluster_field, no_wake, solver)
+                       for cluster_field in cluster_fields]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(
+                    _solve_cluster, cluster_fields, [no_wake] * n_clusters,
+                    [solver] * n_clusters))
+
+        layout = flow_field.turbine_map.layout
+        for cluster, (velocities, turbulence_intensity) in zip(
+                self.clusters, results):
+            layout.velocities[cluster] = velocities
+            layout.turbulence_intensity[cluster] = turbulence_intensity
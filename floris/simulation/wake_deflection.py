@@ -13,6 +13,22 @@ import numpy as np
 from ..utilities import cosd, sind, tand
 
 
+def _grouped_max(keys, values):
+    # the maximum of the values sharing each key, at every point; the
+    # points are sorted by key once and each run of equal keys is
+    # reduced with np.maximum.reduceat
+    flat_keys = keys.ravel()
+    order = np.argsort(flat_keys, kind="stable")
+    sorted_keys = flat_keys[order]
+    starts = np.flatnonzero(
+        np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    group_max = np.maximum.reduceat(values.ravel()[order], starts)
+    grouped = np.empty(flat_keys.size)
+    grouped[order] = np.repeat(
+        group_max, np.diff(np.append(starts, flat_keys.size)))
+    return grouped.reshape(values.shape)
+
+
 class WakeDeflection():
     """
     Base WakeDeflection object class. Subclasses are:
@@ -100,12 +116,8 @@ class Jimenez(WakeDeflection):
         # corrected yaw displacement with lateral offset
         deflection = yYaw_init + self.ad + self.bd * x_locations
 
-        x = np.unique(x_locations)
-        for i in range(len(x)):
-            tmp = np.max(deflection[x_locations == x[i]])
-            deflection[x_locations == x[i]] = tmp
-
-        return deflection
+        # take the maximum deflection at each x station
+        return _grouped_max(x_locations, deflection)
 
 
 class Gauss(WakeDeflection):
@@ -0,0 +1,412 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from ..utilities import Vec3
+from ..utilities import cosd, sind
+from .farm_layout import FarmLayout
+from .turbine import Turbine, polar_rotor_quadrature
+from scipy import sparse
+import numpy as np
+import copy
+
+
+class WakeMatrix():
+    """
+    WakeMatrix computes the turbine inflows from turbine-to-turbine wake
+    deficits.
+
+    Rather than evaluating every turbine wake over the full flow field
+    grid, WakeMatrix evaluates the wake of each turbine only at the
+    rotor points of the turbines downstream of it. The deficits form a
+    sparse matrix, in downstream order, with one row per wake-producing
+    turbine and one column per rotor point of each turbine. The turbine
+    inflows are combined from the columns of this matrix with the wake
+    combination model, giving the same turbine velocities, turbulence
+    intensities and powers as
+    :py:meth:`floris.simulation.flow_field.FlowField.calculate_wake`.
+    The flow field velocities are not computed.
+
+    With **rotor_average** enabled, each wake is instead integrated over
+    the downstream rotor disks with a polar Gauss-Legendre quadrature
+    (see :py:func:`floris.simulation.turbine.polar_rotor_quadrature`)
+    and the rotor-averaged deficits are combined into a single inflow
+    velocity per turbine. This converges much faster with the number of
+    points than sampling the rotor grid and is intended for power and
+    AEP calculations with the smooth gauss model.
+
+    With a nonzero **tolerance**, the wakes of distant groups of
+    upstream turbines are aggregated in the manner of the Barnes-Hut
+    method. The turbines are organized in a quadtree in the wind-aligned
+    frame, and a tree node whose size is smaller than **tolerance**
+    times its distance to a downstream turbine is replaced, for that
+    turbine, by a single source at the node centroid operating at the
+    mean state of its members. Its deficit is scaled by the number of
+    members, n, for the fls combination model and by sqrt(n) for
+    sosfs. Nearby pairs, and for the gauss model every pair close
+    enough to update the turbulence intensity, are still evaluated
+    exactly. The error decreases with **tolerance** and a value of zero
+    gives the exact result.
+
+    Only the analytic wake models (jensen, multizone and gauss) are
+    supported.
+
+    Args:
+        flow_field: A :py:class:`floris.simulation.flow_field.FlowField`
+            object holding the turbine map, wake model and inflow
+            conditions.
+        rotor_average: A bool that when *True* combines rotor-averaged
+            deficits instead of deficits at the rotor grid points
+            (default is *False*).
+        n_radial: An integer that is the number of quadrature rings
+            used when **rotor_average** is *True* (default is 4).
+        n_azimuthal: An integer that is the number of quadrature
+            points on each ring used when **rotor_average** is *True*
+            (default is 8).
+        tolerance: A float that is the largest ratio of the size of a 
+            group of upstream turbines to its distance from a 
+            downstream turbine for which the group wake is aggregated 
+            (default is 0.0, which evaluates every pair exactly).
+
+    Returns:
+        WakeMatrix: An instantiated WakeMatrix object.
+    """
+
+    def __init__(self, flow_field, rotor_average=False, n_radial=4,
+                 n_azimuthal=8, tolerance=0.0):
+        if flow_field.wake.velocity_model.model_string == 'curl':
+            raise ValueError(
+                "WakeMatrix does not support the curl wake model")
+        if tolerance > 0.0 and \
+                flow_field.wake.combination_model.model_string \
+                not in ('fls', 'sosfs'):
+            raise ValueError(
+                "wake aggregation requires the fls or sosfs combination "
+                "model")
+        self.flow_field = flow_field
+        self.rotor_average = rotor_average
+        self.n_radial = n_radial
+        self.n_azimuthal = n_azimuthal
+        self.tolerance = tolerance
+        self.order = None
+        self.deficits = None
+        self.aggregated = 0
+
+    def _rotor_points(self, center_of_rotation):
+        # the rotor points of the turbine domain, rotated in the same way
+        # as FlowField._rotated_grid
+        flow_field = self.flow_field
+        angle = flow_field.wind_direction
+        x, y, z, valid = flow_field._discretize_rotor_points()
+        xoffset = x - center_of_rotation.x1
+        yoffset = y - center_of_rotation.x2
+        x = xoffset * cosd(angle) - yoffset * sind(angle) \
+            + center_of_rotation.x1
+        y = xoffset * sind(angle) + yoffset * cosd(angle) \
+            + center_of_rotation.x2
+        return x, y, z, valid
+
+    def _quadrature_points(self, rotated_map):
+        # quadrature nodes on each rotor disk in the rotated frame, where
+        # the rotor plane is normal to the x axis
+        layout = rotated_map.layout
+        y_unit, z_unit, weights = polar_rotor_quadrature(
+            self.n_radial, self.n_azimuthal)
+        rotor_radius = layout.type_attribute("rotor_diameter")[:, None] / 2.0
+        y = layout.y[:, None] + rotor_radius * y_unit
+        z = layout.z[:, None] + rotor_radius * z_unit
+        x = np.broadcast_to(layout.x[:, None], y.shape).copy()
+        return x, y, z, np.ones(y.shape, dtype=bool), weights
+
+    def _area_overlap(self, wake_velocities, freestream_velocities, turbine,
+                      weights):
+        if weights is None:
+            return self.flow_field._calculate_area_overlap(
+                wake_velocities, freestream_velocities, turbine)
+        # fraction of the rotor area with a deficit above the threshold
+        # used by FlowField._calculate_area_overlap
+        return np.sum(weights[freestream_velocities - wake_velocities > 0.05])
+
+    def _update_turbulence_intensity(self, turbine, coord, receivers,
+                                     rotated_map, u_initial, turb_u_wake,
+                                     valid, weights):
+        # same overlap test and Crespo model as FlowField.calculate_wake
+        # and Turbine.calculate_turbulence_intensity; the last upstream
+        # turbine to overlap a rotor sets its value
+        flow_field = self.flow_field
+        layout = rotated_map.layout
+        nearby = np.nonzero(
+            (layout.x[receivers] > coord.x1)
+            & (np.abs(coord.x2 - layout.y[receivers])
+               < 2*turbine.rotor_diameter))[0]
+        overlapping = []
+        for k in nearby:
+            freestream_velocities = u_initial[k][valid[k]]
+            wake_velocities = freestream_velocities - turb_u_wake[k][valid[k]]
+            area_overlap = self._area_overlap(
+                wake_velocities, freestream_velocities, turbine, weights)
+            if area_overlap > 0.0:
+                overlapping.append(receivers[k])
+        if not overlapping:
+            return
+
+        overlapping = np.array(overlapping)
+        velocity_model = flow_field.wake.velocity_model
+        ti_initial = flow_field.turbulence_intensity
+        ti_calculation = velocity_model.ti_constant \
+            * turbine.aI**velocity_model.ti_ai \
+            * ti_initial**velocity_model.ti_initial \
+            * ((layout.x[overlapping] - coord.x1)
+               / layout.type_attribute("rotor_diameter")[overlapping]) \
+            ** velocity_model.ti_downstream
+        layout.turbulence_intensity[overlapping] = np.sqrt(
+            ti_calculation**2 + ti_initial**2)
+
+    def _interactions(self, rotated_map, position):
+        # split the upstream turbines of each receiver into exactly
+        # evaluated sources and aggregated quadtree nodes, traversing the
+        # tree once for all receivers
+        layout = rotated_map.layout
+        x, y = layout.x, layout.y
+        diameters = layout.type_attribute("rotor_diameter")
+        ti_band = self.flow_field.wake.velocity_model.model_string == 'gauss'
+
+        exact = [[] for _ in range(layout.n_turbines)]
+        groups = []
+        root = _SourceNode(np.arange(layout.n_turbines), x, y, position)
+        stack = [(root, np.arange(layout.n_turbines))]
+        while stack:
+            node, candidates = stack.pop()
+            candidates = candidates[position[candidates] > node.first]
+            if candidates.size == 0:
+                continue
+            if not node.children:
+                for j in node.members:
+                    exact[j].append(
+                        candidates[position[candidates] > position[j]])
+                continue
+            distance = np.hypot(x[candidates] - node.x_centroid,
+                                y[candidates] - node.y_centroid)
+            far = (x[candidates] > node.x_max) \
+                & (node.size < self.tolerance * distance)
+            if ti_band:
+                margin = 2 * np.max(diameters[node.members])
+                far &= (y[candidates] <= node.y_min - margin) \
+                    | (y[candidates] >= node.y_max + margin)
+            if np.any(far):
+                groups.append((node, candidates[far]))
+            for child in node.children:
+                stack.append((child, candidates[~far]))
+
+        exact_receivers = []
+        for receivers in exact:
+            receivers = np.concatenate(receivers) if receivers \
+                else np.zeros(0, dtype=int)
+            exact_receivers.append(receivers[np.argsort(position[receivers])])
+        return exact_receivers, groups
+
+    def _aggregate_source(self, node, rotated_map):
+        # a single turbine at the node centroid with the mean state of the
+        # node members; mixed turbine types take the type of the first
+        # member
+        layout = rotated_map.layout
+        members = node.members
+        turbine_type = layout.turbine_types[layout.type_index[members[0]]]
+        source_layout = FarmLayout(
+            [node.x_centroid],
+            [node.y_centroid],
+            [np.mean(layout.z[members])],
+            [turbine_type],
+            yaw_angles=[np.mean(layout.yaw_angles[members])],
+            tilt_angles=[np.mean(layout.tilt_angles[members])],
+            turbulence_intensity=[
+                np.mean(layout.turbulence_intensity[members])],
+            air_density=[np.mean(layout.air_density[members])]
+        )
+        n_points = source_layout.velocities.shape[1]
+        source_layout.velocities[0] = np.mean(
+            layout.velocities[members, :n_points], axis=0)
+        coord = Vec3(source_layout.x[0], source_layout.y[0],
+                     source_layout.z[0])
+        return Turbine.from_layout(source_layout, 0), coord
+
+    def _wake_at_receivers(self, turbine, coord, receivers, x, y, z, valid,
+                           u_initial):
+        # the wake deficit of one turbine at the rotor points of the
+        # receivers; the wake models read the inflow at the evaluation
+        # points from the flow field
+        flow_field = self.flow_field
+        wake = flow_field.wake
+        in_rotor = valid[receivers]
+        points_flow_field = copy.copy(flow_field)
+        points_flow_field.u_initial = u_initial[receivers][in_rotor]
+
+        x_points = x[receivers][in_rotor]
+        y_points = y[receivers][in_rotor]
+        z_points = z[receivers][in_rotor]
+        deflection = wake.deflection_function(
+            x_points, y_points, turbine, coord, points_flow_field)
+        turb_u_wake = np.zeros(in_rotor.shape)
+        turb_u_wake[in_rotor] = wake.velocity_function(
+            x_points, y_points, z_points, turbine, coord, deflection,
+            wake, points_flow_field)[0]
+        return turb_u_wake
+
+    def calculate_wake(self, no_wake=False):
+        """
+        Updates the turbine velocities and turbulence intensities from
+        the turbine-to-turbine wake deficits.
+
+        The turbines are visited in downstream order. The inflow of each
+        turbine is combined from the deficits of the turbines upstream
+        of it, after which its own wake is evaluated at the rotor points
+        of the turbines downstream of it and stored as a row of
+        **deficits**. With **rotor_average** enabled, **deficits** is an 
+        N x N matrix of rotor-averaged deficits and every rotor point of 
+        a turbine is given the rotor-averaged inflow velocity. With a 
+        nonzero **tolerance**, **deficits** holds only the exactly 
+        evaluated pairs and the number of aggregated group wakes is 
+        stored in **aggregated**.
+
+        Args:
+            no_wake: A bool that when *True* updates the turbine
+                quantities without combining the wakes into the turbine
+                inflows.
+
+        Returns:
+            *None* -- The turbine properties are updated directly and
+            the deficit matrix is stored in **deficits**.
+        """
+        flow_field = self.flow_field
+        wake = flow_field.wake
+        center_of_rotation = Vec3(0, 0, 0)
+
+        rotated_map = flow_field.turbine_map.rotated(
+            flow_field.wind_direction, center_of_rotation)
+        coords = rotated_map.coords
+        turbines = rotated_map.turbines
+        if self.rotor_average:
+            x, y, z, valid, weights = self._quadrature_points(rotated_map)
+        else:
+            x, y, z, valid = self._rotor_points(center_of_rotation)
+            weights = None
+        u_initial = flow_field.wind_speed * \
+            (z / flow_field.specified_wind_height)**flow_field.wind_shear
+
+        # the inflow is tracked at the rotor points, or as a single
+        # rotor-averaged value per turbine
+        if weights is None:
+            inflow, inflow_valid = u_initial, valid
+        else:
+            inflow = np.dot(u_initial, weights)[:, None]
+            inflow_valid = np.ones(inflow.shape, dtype=bool)
+        n_turbines, n_points = inflow.shape
+        u_wake = np.zeros((n_turbines, n_points))
+        data, rows, cols = [], [], []
+        self.order = rotated_map.layout.sorted_in_x()
+        self.aggregated = 0
+
+        # an aggregated group wake is evaluated once its last member has
+        # been updated
+        exact_receivers = None
+        groups_by_last = {}
+        if self.tolerance > 0.0:
+            position = np.empty(n_turbines, dtype=int)
+            position[self.order] = np.arange(n_turbines)
+            exact_receivers, groups = self._interactions(
+                rotated_map, position)
+            for node, receivers in groups:
+                groups_by_last.setdefault(node.last, []).append(
+                    (node, receivers))
+        linear_combination = wake.combination_model.model_string == 'fls'
+
+        for position_j, j in enumerate(self.order):
+            coord, turbine = coords[j], turbines[j]
+
+            # update the turbine based on the velocity at its rotor points
+            turbine.velocities = (inflow[j] - u_wake[j])[inflow_valid[j]]
+
+            if exact_receivers is None:
+                receivers = self.order[position_j + 1:]
+            else:
+                receivers = exact_receivers[j]
+            if receivers.size > 0:
+                turb_u_wake = self._wake_at_receivers(
+                    turbine, coord, receivers, x, y, z, valid, u_initial)
+
+                if wake.velocity_model.model_string == 'gauss':
+                    self._update_turbulence_intensity(
+                        turbine, coord, receivers, rotated_map,
+                        u_initial[receivers], turb_u_wake,
+                        valid[receivers], weights)
+
+                if weights is not None:
+                    turb_u_wake = np.dot(turb_u_wake, weights)[:, None]
+
+                receiver_index, point_index = np.nonzero(turb_u_wake)
+                data.append(turb_u_wake[receiver_index, point_index])
+                rows.append(np.full(receiver_index.size, j))
+                cols.append(receivers[receiver_index] * n_points
+                            + point_index)
+
+                if not no_wake:
+                    u_wake[receivers] = wake.combination_function(
+                        u_wake[receivers], turb_u_wake)
+
+            for node, receivers in groups_by_last.get(position_j, []):
+                source, source_coord = self._aggregate_source(
+                    node, rotated_map)
+                # the members' deficits add linearly or in quadrature
+                n_members = node.members.size
+                scale = n_members if linear_combination \
+                    else np.sqrt(n_members)
+                turb_u_wake = scale * self._wake_at_receivers(
+                    source, source_coord, receivers, x, y, z, valid,
+                    u_initial)
+                if weights is not None:
+                    turb_u_wake = np.dot(turb_u_wake, weights)[:, None]
+                self.aggregated += 1
+                if not no_wake:
+                    u_wake[receivers] = wake.combination_function(
+                        u_wake[receivers], turb_u_wake)
+
+        if data:
+            data, rows, cols = (np.concatenate(data), np.concatenate(rows),
+                                np.concatenate(cols))
+        self.deficits = sparse.csr_matrix(
+            (data, (rows, cols)), shape=(n_turbines, n_turbines * n_points))
+
+
+class _SourceNode():
+    # a quadtree node over the turbine positions in the wind-aligned
+    # frame; nodes with a single member, or with coincident members,
+    # are leaves
+    def __init__(self, members, x, y, position):
+        self.members = members
+        x_members, y_members = x[members], y[members]
+        self.x_max = np.max(x_members)
+        self.y_min, self.y_max = np.min(y_members), np.max(y_members)
+        x_min = np.min(x_members)
+        self.size = max(self.x_max - x_min, self.y_max - self.y_min)
+        self.x_centroid = np.mean(x_members)
+        self.y_centroid = np.mean(y_members)
+        self.first = np.min(position[members])
+        self.last = np.max(position[members])
+
+        self.children = []
+        if members.size > 1 and self.size > 0.0:
+            x_mid = (x_min + self.x_max) / 2.0
+            y_mid = (self.y_min + self.y_max) / 2.0
+            east, north = x_members > x_mid, y_members > y_mid
+            for quadrant in (~east & ~north, ~east & north, east & ~north,
+                             east & north):
+                if np.any(quadrant):
+                    self.children.append(
+                        _SourceNode(members[quadrant], x, y, position))
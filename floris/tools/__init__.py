@@ -29,7 +29,8 @@ Examples:
     '__name__', '__package__', '__path__', '__spec__', 'cut_plane',
     'energy_ratio', 'floris_utilities', 'flow_data',
     'layout_functions', 'optimization', 'plotting', 'power_rose',
-    'rews', 'sowfa_utilities', 'visualization', 'wind_rose']
+    'result_cache', 'rews', 'sowfa_library', 'sowfa_utilities', 'sweep',
+    'time_series', 'visualization', 'wind_rose']
 """
 
 from . import cut_plane
@@ -40,7 +41,11 @@ from . import layout_functions
 from . import optimization
 from . import plotting
 from . import power_rose
+from . import result_cache
 from . import rews
+from . import sowfa_library
 from . import sowfa_utilities
+from . import sweep
+from . import time_series
 from . import visualization
 from . import wind_rose
@@ -11,7 +11,8 @@
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator, RectBivariateSpline
+from scipy.spatial import Delaunay
 
 
 class _CutPlane():
@@ -38,49 +39,72 @@ class _CutPlane():
         x2_array = getattr(flow_data, self.x2_name)
         x3_array = getattr(flow_data, self.x3_name)
 
-        search_values = np.array(sorted(np.unique(x3_array)))
+        axis_names = ['x', 'y', 'z']
+        if flow_data.axes is not None:
+            search_values = flow_data.axes[axis_names.index(self.x3_name)]
+        else:
+            search_values = np.array(sorted(np.unique(x3_array)))
         nearest_idx = (np.abs(search_values - x3_value)).argmin()
         nearest_value = search_values[nearest_idx]
         print('Nearest value in %s to %.2f is %.2f' %
               (self.x3_name, x3_value, nearest_value))
 
-        # Select down the data
-        x3_select_mask = x3_array == nearest_value
-
-        # Store the un-interpolated input arrays at this slice
-        self.x1_in = x1_array[x3_select_mask]
-        self.x2_in = x2_array[x3_select_mask]
-        self.u_in = flow_data.u[x3_select_mask]
-        self.v_in = flow_data.v[x3_select_mask]
-        self.w_in = flow_data.w[x3_select_mask]
-
-        # Initially, x1_lin, x2_lin are unique values of input
-        self.x1_lin = np.unique(self.x1_in)
-        self.x2_lin = np.unique(self.x2_in)
+        if flow_data.axes is not None:
+            # Index the slice out of the grid, keeping the order of the
+            # points with x1 varying fastest; this includes FlowData read
+            # from vtk files, such as SOWFA output
+            source = [axis_names.index(name)
+                      for name in (self.x1_name, self.x2_name, self.x3_name)]
+
+            def select(name):
+                values = np.moveaxis(flow_data.grid_values(name), source,
+                                     [0, 1, 2])
+                return values[:, :, nearest_idx].flatten(order='F')
+
+            self.x1_in = select(self.x1_name)
+            self.x2_in = select(self.x2_name)
+            self.u_in = select('u')
+            self.v_in = select('v')
+            self.w_in = select('w')
+            self._in_shape = (len(flow_data.axes[source[0]]),
+                              len(flow_data.axes[source[1]]))
+            self.x1_lin = self.x1_in[:self._in_shape[0]]
+            self.x2_lin = self.x2_in[::self._in_shape[0]]
+        else:
+            # Select down the data
+            x3_select_mask = x3_array == nearest_value
+
+            # Store the un-interpolated input arrays at this slice
+            self.x1_in = x1_array[x3_select_mask]
+            self.x2_in = x2_array[x3_select_mask]
+            self.u_in = flow_data.u[x3_select_mask]
+            self.v_in = flow_data.v[x3_select_mask]
+            self.w_in = flow_data.w[x3_select_mask]
+            self._in_shape = None
+
+            # Initially, x1_lin, x2_lin are unique values of input
+            self.x1_lin = np.unique(self.x1_in)
+            self.x2_lin = np.unique(self.x2_in)
 
         # Save the resolution as the number of unique points in x1 and x2
-        self.resolution = (len(np.unique(self.x1_lin)),
-                           len(np.unique(self.x2_lin)))
+        self.resolution = (len(self.x1_lin), len(self.x2_lin))
 
         # Make initial meshing
+        self._cached_inputs = None
         self._remesh()
 
     def _remesh(self):
 
         # Mesh and interpolate u, v and w
         self.x1_mesh, self.x2_mesh = np.meshgrid(self.x1_lin, self.x2_lin)
-        self.u_mesh = griddata(
-            np.column_stack([self.x1_in, self.x2_in]),
-            self.u_in, (self.x1_mesh.flatten(), self.x2_mesh.flatten()),
-            method='cubic')
-        self.v_mesh = griddata(
-            np.column_stack([self.x1_in, self.x2_in]),
-            self.v_in, (self.x1_mesh.flatten(), self.x2_mesh.flatten()),
-            method='cubic')
-        self.w_mesh = griddata(
-            np.column_stack([self.x1_in, self.x2_in]),
-            self.w_in, (self.x1_mesh.flatten(), self.x2_mesh.flatten()),
-            method='cubic')
+        if self._in_shape is not None:
+            self._remesh_structured()
+        else:
+            mesh = self._interpolator()(self.x1_mesh.flatten(),
+                                        self.x2_mesh.flatten())
+            self.u_mesh = mesh[:, 0]
+            self.v_mesh = mesh[:, 1]
+            self.w_mesh = mesh[:, 2]
 
         # Save flat vectors
         self.x1_flat = self.x1_mesh.flatten()
@@ -89,6 +113,52 @@ class _CutPlane():
         # Save u-cubed
         self.u_cubed = self.u_mesh**3
 
+    def _interpolator(self):
+        # One triangulation of the scattered input points serves u, v and
+        # w, and every remesh until the inputs are replaced
+        inputs = (self.x1_in, self.x2_in, self.u_in, self.v_in, self.w_in)
+        if self._cached_inputs is None or any(
+                a is not b for a, b in zip(self._cached_inputs, inputs)):
+            triangulation = Delaunay(np.column_stack([self.x1_in,
+                                                      self.x2_in]))
+            self._cached_interpolator = CloughTocher2DInterpolator(
+                triangulation,
+                np.column_stack([self.u_in, self.v_in, self.w_in]))
+            self._cached_inputs = inputs
+        return self._cached_interpolator
+
+    def _remesh_structured(self):
+        # The input points are a grid, listed with x1 varying fastest
+        n1, n2 = self._in_shape
+        x1_in = self.x1_in[:n1]
+        x2_in = self.x2_in[::n1]
+        if np.array_equal(self.x1_lin, x1_in) and \
+                np.array_equal(self.x2_lin, x2_in):
+            # The mesh is the input grid
+            self.u_mesh = self.u_in.copy()
+            self.v_mesh = self.v_in.copy()
+            self.w_mesh = self.w_in.copy()
+            return
+
+        # Otherwise interpolate with cubic splines along each axis,
+        # leaving the points outside of the input grid undefined, as the
+        # scattered path does outside the convex hull of its points
+        order1 = np.argsort(x1_in)
+        order2 = np.argsort(x2_in)
+        x1_flat = self.x1_mesh.flatten()
+        x2_flat = self.x2_mesh.flatten()
+        outside = (x1_flat < x1_in[order1[0]]) | (x1_flat > x1_in[order1[-1]]) \
+            | (x2_flat < x2_in[order2[0]]) | (x2_flat > x2_in[order2[-1]])
+        for name in ('u', 'v', 'w'):
+            values = getattr(self, name + '_in').reshape((n1, n2), order='F')
+            spline = RectBivariateSpline(x1_in[order1], x2_in[order2],
+                                         values[order1][:, order2],
+                                         kx=min(3, n1 - 1),
+                                         ky=min(3, n2 - 1))
+            mesh = spline.ev(x1_flat, x2_flat)
+            mesh[outside] = np.nan
+            setattr(self, name + '_mesh', mesh)
+
 
 # Define horizontal subclass
 class HorPlane(_CutPlane):
@@ -330,3 +400,93 @@ def calculate_power(cross_plane,
 
     #     # Return power array
     #     return x1_locs, 0.5 * air_density * (np.pi * rotor_radius**2) * cp_array * v_array**3
+
+
+def calculate_wind_speed_map(cross_plane, x1_locs, x2_locs, R):
+    """
+    Calculate the effective wind speed within range of many points at
+    once, as :py:func:`calculate_wind_speed` does for one point.
+
+    Args:
+        cross_plane (:py:class:`floris.tools.cut_plane.CrossPlane`):
+            plane of data.
+        x1_locs (np.array): x1-coordinates of the points of interest.
+        x2_locs (np.array): x2-coordinates of the points of interest,
+            broadcast against **x1_locs**.
+        R (float): radius from the points of interest to consider.
+
+    Returns:
+        np.array: effective wind speeds in the broadcast shape of the
+        coordinates.
+    """
+    x1_locs, x2_locs = np.broadcast_arrays(np.asarray(x1_locs, dtype=float),
+                                           np.asarray(x2_locs, dtype=float))
+    shape = x1_locs.shape
+    x1_locs = x1_locs.flatten()
+    x2_locs = x2_locs.flatten()
+
+    # The mesh is the product of the x1 and x2 lines, so the points
+    # within R of each center lie in a window of the sorted lines
+    order1 = np.argsort(cross_plane.x1_lin, kind='stable')
+    order2 = np.argsort(cross_plane.x2_lin, kind='stable')
+    x1_lin = cross_plane.x1_lin[order1]
+    x2_lin = cross_plane.x2_lin[order2]
+    u_cubed = cross_plane.u_cubed.reshape(len(x2_lin), len(x1_lin))
+    u_cubed = u_cubed[order2][:, order1]
+    start1 = np.searchsorted(x1_lin, x1_locs - R, side='left')
+    stop1 = np.searchsorted(x1_lin, x1_locs + R, side='right')
+    start2 = np.searchsorted(x2_lin, x2_locs - R, side='left')
+    stop2 = np.searchsorted(x2_lin, x2_locs + R, side='right')
+    width1 = max(int(np.max(stop1 - start1, initial=0)), 1)
+    width2 = max(int(np.max(stop2 - start2, initial=0)), 1)
+
+    # Evaluate the windows of blocks of centers at once
+    wind_speed = np.empty(len(x1_locs))
+    block_size = max(1, 2**22 // (width1 * width2))
+    for block in range(0, len(x1_locs), block_size):
+        b = slice(block, block + block_size)
+        i = start1[b, None] + np.arange(width1)
+        j = start2[b, None] + np.arange(width2)
+        valid = (i < stop1[b, None])[:, None, :] & \
+            (j < stop2[b, None])[:, :, None]
+        i = np.minimum(i, len(x1_lin) - 1)
+        j = np.minimum(j, len(x2_lin) - 1)
+        distance = np.sqrt((x1_lin[i][:, None, :] - x1_locs[b, None, None])**2
+                           + (x2_lin[j][:, :, None] - x2_locs[b, None, None])**2)
+        inside = valid & (distance < R)
+        values = np.where(inside, u_cubed[j[:, :, None], i[:, None, :]], 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            wind_speed[b] = np.cbrt(np.sum(values, axis=(1, 2)) /
+                                    np.sum(inside, axis=(1, 2)))
+    return wind_speed.reshape(shape)
+
+
+def calculate_power_map(cross_plane,
+                        x1_locs,
+                        x2_locs,
+                        R,
+                        ws_array,
+                        cp_array,
+                        air_density=1.225):
+    """
+    Calculate the maximum power available to rotors centered at many
+    points of a cross plane at once, as :py:func:`calculate_power`
+    does for one rotor.
+
+    Args:
+        cross_plane (:py:class:`floris.tools.cut_plane.CrossPlane`):
+            plane of data.
+        x1_locs (np.array): x1-coordinates of the rotor centers.
+        x2_locs (np.array): x2-coordinates of the rotor centers,
+            broadcast against **x1_locs**.
+        R (float): Radius of wind turbine rotor.
+        ws_array (np.array): reference wind speed for cp curve.
+        cp_array (np.array): cp curve at reference wind speeds.
+        air_density (float, optional): air density. Defaults to 1.225.
+
+    Returns:
+        np.array: powers in the broadcast shape of the coordinates.
+    """
+    ws = calculate_wind_speed_map(cross_plane, x1_locs, x2_locs, R)
+    cp_value = np.interp(ws, ws_array, cp_array)
+    return 0.5 * air_density * (np.pi * R**2) * cp_value * ws**3
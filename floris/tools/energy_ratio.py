@@ -9,10 +9,15 @@
 # CONDITIONS OF ANY KIND, either express or implied. See the License for the
 # specific language governing permissions and limitations under the License.
 
+from concurrent.futures import ProcessPoolExecutor
+from ..utilities import bin_slices
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+# largest number of resampled points drawn at once by the bootstrap
+_BOOTSTRAP_POINTS = 2**22
+
 
 def _convert_to_numpy_array(series):
     if hasattr(series, 'values'):
@@ -140,6 +145,122 @@ def energy_ratio(ref_pow_base, test_pow_base, ws_base,
     return ratio_base, ratio_con, ratio_diff, p_change, counts_base, counts_con, counts_diff, counts_pchange
 
 
+def _energy_ratios_from_sums(counts_base, ref_sum_base, test_sum_base,
+                             counts_con, ref_sum_con, test_sum_con):
+    # The balanced energy ratios of (samples x wind speeds) counts and
+    # power sums, using the wind speeds present on both sides
+    total_counts = counts_base + counts_con
+    both = (counts_base > 0) & (counts_con > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights_base = np.where(both, counts_con / total_counts, 0.)
+        weights_con = np.where(both, counts_base / total_counts, 0.)
+        ratio_base = np.sum(test_sum_base * weights_base, axis=1) \
+            / np.sum(ref_sum_base * weights_base, axis=1)
+        ratio_con = np.sum(test_sum_con * weights_con, axis=1) \
+            / np.sum(ref_sum_con * weights_con, axis=1)
+        ratio_diff = ratio_con - ratio_base
+        p_change = 100. * ratio_diff / ratio_base
+    no_overlap = ~np.any(both, axis=1)
+    for ratio in (ratio_base, ratio_con, ratio_diff, p_change):
+        ratio[no_overlap] = np.nan
+    return ratio_base, ratio_con, ratio_diff, p_change
+
+
+def _resampled_sums(rng, n_samples, codes, n_codes, ref_pow, test_pow):
+    # The counts and power sums per wind speed code of n_samples
+    # resamples with replacement
+    n = len(codes)
+    ind_bs = rng.integers(n, size=(n_samples, n))
+    keys = (np.arange(n_samples)[:, None] * n_codes + codes[ind_bs]).ravel()
+    shape = (n_samples, n_codes)
+    counts = np.bincount(keys, minlength=n_samples * n_codes).reshape(shape)
+    ref_sum = np.bincount(keys, weights=ref_pow[ind_bs].ravel(),
+                          minlength=n_samples * n_codes).reshape(shape)
+    test_sum = np.bincount(keys, weights=test_pow[ind_bs].ravel(),
+                           minlength=n_samples * n_codes).reshape(shape)
+    return counts, ref_sum, test_sum
+
+
+def bootstrap_energy_ratio(ref_pow_base, test_pow_base, ws_base,
+                           ref_pow_con, test_pow_con, ws_con,
+                           n_boostrap, seed=None):
+    """
+    Compute the balanced energy ratio of bootstrap resamples
+
+    Each resample draws the baseline and controlled points with
+    replacement and computes the balanced energy ratio of
+    :py:func:`energy_ratio`. The resamples are drawn as index matrices
+    in batches, and their weighted sums per wind speed are accumulated
+    with one bincount per batch.
+
+    Args:
+        ref_pow_base (np.array): Array of baseline reference turbine 
+            power.
+        test_pow_base (np.array): Array of baseline test turbine power.
+        ws_base (np.array): Array of integer wind speeds for basline.
+        ref_pow_con (np.array): Array of controlled reference turbine 
+            power.
+        test_pow_con (np.array): Array of controlled test turbine power.
+        ws_con (np.array): Array of integer wind speeds in control.
+        n_boostrap (int): Number of bootstrap resamples.
+        seed (optional): Seed of the random resampling, anything
+            accepted by np.random.default_rng.  Defaults to None.
+
+    Returns:
+        tuple: tuple containing:
+
+            -   **ratio_base** (*np.array*): Baseline energy ratio of
+                each resample.
+            -   **ratio_con** (*np.array*): Controlled enery ratio of
+                each resample.
+            -   **ratio_diff** (*np.array*): Difference in energy ratios
+                of each resample.
+            -   **p_change** (*np.array*): Percent change in energy
+                ratios of each resample.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Number the wind speeds of both sides
+    ws_unique, codes = np.unique(np.concatenate([ws_base, ws_con]),
+                                 return_inverse=True)
+    codes_base = codes[:len(ws_base)]
+    codes_con = codes[len(ws_base):]
+
+    batch_size = max(1, _BOOTSTRAP_POINTS // max(len(ws_base), len(ws_con)))
+    ratios = [np.empty(n_boostrap) for _ in range(4)]
+    for start in range(0, n_boostrap, batch_size):
+        n_samples = min(batch_size, n_boostrap - start)
+        sums_base = _resampled_sums(rng, n_samples, codes_base,
+                                    len(ws_unique), ref_pow_base,
+                                    test_pow_base)
+        sums_con = _resampled_sums(rng, n_samples, codes_con,
+                                   len(ws_unique), ref_pow_con, test_pow_con)
+        for ratio, batch in zip(ratios,
+                                _energy_ratios_from_sums(*sums_base,
+                                                         *sums_con)):
+            ratio[start:start + n_samples] = batch
+    return tuple(ratios)
+
+
+def _balanced_energy_ratio_bin(ref_pow_base, test_pow_base, ws_base,
+                               ref_pow_con, test_pow_con, ws_con,
+                               n_boostrap, percentiles, seed):
+    # The energy ratio of one wind direction bin and the confidence
+    # bounds of its first four values
+    estimates = energy_ratio(ref_pow_base, test_pow_base, ws_base,
+                             ref_pow_con, test_pow_con, ws_con)
+    bootstrap = bootstrap_energy_ratio(ref_pow_base, test_pow_base, ws_base,
+                                       ref_pow_con, test_pow_con, ws_con,
+                                       n_boostrap, seed=seed)
+    bounds = [
+        _calculate_lower_and_upper_bound(bootstrap_array, percentiles,
+                                         central_estimate=estimate,
+                                         method='simple_percentile')
+        for bootstrap_array, estimate in zip(bootstrap, estimates)
+    ]
+    return estimates, bounds
+
+
 def calculate_balanced_energy_ratio(reference_power_baseline,
                                     test_power_baseline,
                                     wind_speed_array_baseline,
@@ -152,6 +273,8 @@ def calculate_balanced_energy_ratio(reference_power_baseline,
                                     confidence=95,
                                     n_boostrap=None,
                                     wind_direction_bin_p_overlap=None,
+                                    seed=None,
+                                    max_workers=1,
                                     ):
     """
     Calculate a balanced energy ratio for each wind direction bin.
@@ -189,10 +312,19 @@ def calculate_balanced_energy_ratio(reference_power_baseline,
         confidence (int, optional): Confidence level to use.  Defaults 
             to 95.
         n_boostrap (int, optional): Number of bootstaps, if none, 
-            _calculate_bootstrap_iterations is called.  Defaults to 
-            None.
+            _calculate_bootstrap_iterations is called on the first wind 
+            direction bin with data and its result used for every bin.  
+            Defaults to None.
         wind_direction_bin_p_overlap (np.array, optional): Percentage 
             overlap between wind direction bin. Defaults to None.
+        seed (int, optional): Seed of the bootstrap resampling, from
+            which each wind direction bin draws an independent stream,
+            so that the results do not depend on **max_workers**.
+            Defaults to None, which draws the seed from the global numpy
+            random state.
+        max_workers (int, optional): Number of worker processes
+            computing the wind direction bins.  Defaults to 1, which
+            computes them in the current process.
 
     Returns:
         tuple: tuple containing:
@@ -261,21 +393,41 @@ def calculate_balanced_energy_ratio(reference_power_baseline,
     upper_p_change_array = np.zeros(len(wind_direction_bins)) * np.nan
     counts_p_change_array = np.zeros(len(wind_direction_bins)) * np.nan
 
-    for i, wind_direction_bin in enumerate(wind_direction_bins):
-
-        wind_dir_mask_baseline = (wind_direction_array_baseline >= wind_direction_bin - wind_direction_bin_radius) \
-            & (wind_direction_array_baseline < wind_direction_bin + wind_direction_bin_radius)
-
-        wind_dir_mask_controlled = (wind_direction_array_controlled >= wind_direction_bin - wind_direction_bin_radius) \
-            & (wind_direction_array_controlled < wind_direction_bin + wind_direction_bin_radius)
-
-        reference_power_baseline_wd = reference_power_baseline[wind_dir_mask_baseline]
-        test_power_baseline_wd = test_power_baseline[wind_dir_mask_baseline]
-        wind_speed_array_baseline_wd = wind_speed_array_baseline[wind_dir_mask_baseline]
-
-        reference_power_controlled_wd = reference_power_controlled[wind_dir_mask_controlled]
-        test_power_controlled_wd = test_power_controlled[wind_dir_mask_controlled]
-        wind_speed_array_controlled_wd = wind_speed_array_controlled[wind_dir_mask_controlled]
+    # Independent random streams per wind direction bin
+    if seed is None:
+        seed = np.random.randint(2**31)
+    seeds = np.random.SeedSequence(seed).spawn(len(wind_direction_bins))
+    percentiles = _get_confidence_bounds(confidence)
+
+    # Sort each side once by wind direction, so that every wind direction
+    # bin is a contiguous slice
+    order_baseline, slices_baseline = bin_slices(
+        wind_direction_array_baseline, wind_direction_bins,
+        wind_direction_bin_radius)
+    reference_power_baseline = reference_power_baseline[order_baseline]
+    test_power_baseline = test_power_baseline[order_baseline]
+    wind_speed_array_baseline = wind_speed_array_baseline[order_baseline]
+
+    order_controlled, slices_controlled = bin_slices(
+        wind_direction_array_controlled, wind_direction_bins,
+        wind_direction_bin_radius)
+    reference_power_controlled = reference_power_controlled[order_controlled]
+    test_power_controlled = test_power_controlled[order_controlled]
+    wind_speed_array_controlled = wind_speed_array_controlled[
+        order_controlled]
+
+    bins = []
+    tasks = []
+    for i, (wind_dir_slice_baseline, wind_dir_slice_controlled) in enumerate(
+            zip(slices_baseline, slices_controlled)):
+
+        reference_power_baseline_wd = reference_power_baseline[wind_dir_slice_baseline]
+        test_power_baseline_wd = test_power_baseline[wind_dir_slice_baseline]
+        wind_speed_array_baseline_wd = wind_speed_array_baseline[wind_dir_slice_baseline]
+
+        reference_power_controlled_wd = reference_power_controlled[wind_dir_slice_controlled]
+        test_power_controlled_wd = test_power_controlled[wind_dir_slice_controlled]
+        wind_speed_array_controlled_wd = wind_speed_array_controlled[wind_dir_slice_controlled]
 
         if (len(reference_power_baseline_wd) == 0) or (len(reference_power_controlled_wd) == 0):
             continue
@@ -285,50 +437,30 @@ def calculate_balanced_energy_ratio(reference_power_baseline,
         wind_speed_array_controlled_wd = wind_speed_array_controlled_wd.astype(
             int)
 
-        # compute the energy ratio
-        ratio_array_base[i], ratio_array_con[i], diff_array[i], p_change_array[i], counts_ratio_array_base[i], counts_ratio_array_con[i], counts_diff_array[i], counts_p_change_array[i] = energy_ratio(reference_power_baseline_wd, test_power_baseline_wd, wind_speed_array_baseline_wd,
-                                                                                                                                                                                                        reference_power_controlled_wd, test_power_controlled_wd, wind_speed_array_controlled_wd)
-
-        # Get the bounds through boot strapping
-        # determine the number of bootstrap iterations if not given
+        # determine the number of bootstrap iterations if not given, from
+        # the first wind direction bin with data
         if n_boostrap is None:
             n_boostrap = _calculate_bootstrap_iterations(
                 len(reference_power_baseline_wd))
 
-        ratio_base_bs = np.zeros(n_boostrap)
-        ratio_con_bs = np.zeros(n_boostrap)
-        diff_bs = np.zeros(n_boostrap)
-        p_change_bs = np.zeros(n_boostrap)
-        for i_bs in range(n_boostrap):
-
-            # random resampling w/ replacement
-            ind_bs = np.random.randint(
-                len(reference_power_baseline_wd), size=len(reference_power_baseline_wd))
-            reference_power_binned_baseline = reference_power_baseline_wd[ind_bs]
-            test_power_binned_baseline = test_power_baseline_wd[ind_bs]
-            wind_speed_binned_baseline = wind_speed_array_baseline_wd[ind_bs]
-
-            ind_bs = np.random.randint(
-                len(reference_power_controlled_wd), size=len(reference_power_controlled_wd))
-            reference_power_binned_controlled = reference_power_controlled_wd[ind_bs]
-            test_power_binned_controlled = test_power_controlled_wd[ind_bs]
-            wind_speed_binned_controlled = wind_speed_array_controlled_wd[ind_bs]
-
-            # compute the energy ratio
-            ratio_base_bs[i_bs], ratio_con_bs[i_bs], diff_bs[i_bs], p_change_bs[i_bs], _, _, _, _ = energy_ratio(reference_power_binned_baseline, test_power_binned_baseline, wind_speed_binned_baseline,
-                                                                                                                 reference_power_binned_controlled, test_power_binned_controlled, wind_speed_binned_controlled)
-
-        # Get the confidence bounds
-        percentiles = _get_confidence_bounds(confidence)
-
-        lower_ratio_array_base[i], upper_ratio_array_base[i] = _calculate_lower_and_upper_bound(
-            ratio_base_bs, percentiles, central_estimate=ratio_array_base[i], method='simple_percentile')
-        lower_ratio_array_con[i], upper_ratio_array_con[i] = _calculate_lower_and_upper_bound(
-            ratio_con_bs, percentiles, central_estimate=ratio_array_con[i], method='simple_percentile')
-        lower_diff_array[i], upper_diff_array[i] = _calculate_lower_and_upper_bound(
-            diff_bs, percentiles, central_estimate=diff_array[i], method='simple_percentile')
-        lower_p_change_array[i], upper_p_change_array[i] = _calculate_lower_and_upper_bound(
-            p_change_bs, percentiles, central_estimate=p_change_array[i], method='simple_percentile')
+        bins.append(i)
+        tasks.append((reference_power_baseline_wd, test_power_baseline_wd,
+                      wind_speed_array_baseline_wd,
+                      reference_power_controlled_wd, test_power_controlled_wd,
+                      wind_speed_array_controlled_wd, n_boostrap, percentiles,
+                      seeds[i]))
+
+    # compute the energy ratio and get the bounds through boot strapping
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_balanced_energy_ratio_bin(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(_balanced_energy_ratio_bin, *zip(*tasks)))
+
+    for i, (estimates, bounds) in zip(bins, results):
+        ratio_array_base[i], ratio_array_con[i], diff_array[i], p_change_array[i], counts_ratio_array_base[i], counts_ratio_array_con[i], counts_diff_array[i], counts_p_change_array[i] = estimates
+        (lower_ratio_array_base[i], upper_ratio_array_base[i]), (lower_ratio_array_con[i], upper_ratio_array_con[i]), (lower_diff_array[i], upper_diff_array[i]), (lower_p_change_array[i], upper_p_change_array[i]) = bounds
 
     return ratio_array_base, lower_ratio_array_base, upper_ratio_array_base, counts_ratio_array_base, ratio_array_con, lower_ratio_array_con, upper_ratio_array_con, counts_ratio_array_con, diff_array, lower_diff_array, upper_diff_array, counts_diff_array, p_change_array, lower_p_change_array, upper_p_change_array, counts_p_change_array
 
@@ -12,7 +12,11 @@
 import numpy as np
 from floris.simulation import Floris
 from floris.simulation import TurbineMap
+from floris.simulation import evaluate
 from .flow_data import FlowData
+from . import sweep as floris_sweep
+from . import time_series as floris_time_series
+from .result_cache import ResultCache, hash_input_file, hash_state, model_state
 from ..utilities import Vec3
 import copy
 
@@ -20,25 +24,213 @@ import copy
 class FlorisInterface():
     """
     The interface between a FLORIS instance and the wfc tools
+
+    Args:
+        input_file (str): Path to the FLORIS json input file.
+        cache (ResultCache or str, optional): A
+            :py:class:`floris.tools.result_cache.ResultCache` object, or
+            the path of its database file, that calculate_wake consults
+            before solving. Defaults to None, which solves every call.
     """
 
-    def __init__(self, input_file):
+    def __init__(self, input_file, cache=None):
         self.input_file = input_file
         self.floris = Floris(input_file=input_file)
-
-    def calculate_wake(self, yaw_angles=None):
+        if cache is not None and not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        self.cache = cache
+        if cache is not None:
+            self._input_hash = hash_input_file(input_file)
+
+    def calculate_wake(self, yaw_angles=None, solver="grid", tolerance=0.0,
+                       max_workers=None):
         """
         Wrapper to the floris flow field calculate_wake method
 
         Args:
             yaw_angles (np.array, optional): Turbine yaw angles.
                 Defaults to None.
+            solver (str, optional): "grid" to evaluate the wakes over
+                the flow field grid, "matrix" to evaluate them only
+                at the turbine rotor points, "rotor_average" to
+                integrate them over the turbine rotors or "clusters" to
+                solve groups of non-interacting turbines separately in
+                parallel. The last three are faster for large farms but
+                leave the flow field velocities uncomputed. Defaults to
+                "grid".
+            tolerance (float, optional): Largest ratio of size to
+                distance of a group of upstream turbines whose wakes
+                the "matrix" and "rotor_average" solvers aggregate.
+                Defaults to 0.0, which evaluates every wake exactly.
+            max_workers (int, optional): Number of threads evaluating
+                the wakes of non-interacting turbines with the "grid"
+                solver, or of processes with the "clusters" solver.
+                Defaults to None, which evaluates the "grid" solver
+                wakes one at a time.
+
+        When the interface has a result cache, the turbine velocities
+        and turbulence intensities of inputs solved before are restored
+        from it instead, and the turbine power, Cp and Ct follow from
+        them. The flow field velocities are not restored: after a cache
+        hit they are stale, holding the values of the last solve, which
+        may have been at other inputs. Each cached solve starts from
+        the inflow turbulence intensity at every turbine.
         """
 
         if yaw_angles is not None:
             self.floris.farm.set_yaw_angles(yaw_angles)
 
-        self.floris.farm.flow_field.calculate_wake()
+        if self.cache is None:
+            self.floris.farm.flow_field.calculate_wake(
+                solver=solver, tolerance=tolerance, max_workers=max_workers)
+            return
+
+        # a solve overwrites the turbine turbulence intensities, so a
+        # cached solve starts from the inflow value held in the key
+        layout = self.floris.farm.flow_field.turbine_map.layout
+        layout.turbulence_intensity[:] = \
+            self.floris.farm.flow_field.turbulence_intensity
+
+        # the number of workers does not change the results
+        key = hash_state({
+            "input": self._input_hash,
+            "model": model_state(self.floris),
+            "solver": solver,
+            "tolerance": tolerance
+        })
+        results = self.cache.get(key)
+        if results is not None:
+            layout.velocities[:] = results["velocities"]
+            layout.turbulence_intensity[:] = results["turbulence_intensity"]
+            return
+
+        self.floris.farm.flow_field.calculate_wake(
+            solver=solver, tolerance=tolerance, max_workers=max_workers)
+        self.cache.put(key, {
+            "velocities": layout.velocities,
+            "turbulence_intensity": layout.turbulence_intensity
+        })
+
+    def evaluate(self, yaw_angles=None, solver="grid", resolution=None):
+        """
+        Solves the current farm layout and inflow without modifying the
+        floris instance, with
+        :py:func:`floris.simulation.evaluation.evaluate`. Several
+        threads may call this on one FlorisInterface.
+
+        Args:
+            yaw_angles (np.array, optional): Turbine yaw angles.
+                Defaults to None, which uses the current yaw angles.
+            solver (str, optional): Solver passed to calculate_wake.
+                Defaults to "grid".
+            resolution (Vec3, optional): Resolution of the flow field
+                grid. Defaults to None.
+
+        Returns:
+            :py:class:`floris.simulation.evaluation.FarmResult`: The
+            turbine results and the solved flow field.
+        """
+        flow_field = self.floris.farm.flow_field
+        return evaluate(
+            flow_field.wake,
+            flow_field.turbine_map.layout,
+            flow_field.wind_speed,
+            flow_field.wind_direction + 270,
+            flow_field.turbulence_intensity,
+            flow_field.wind_shear,
+            flow_field.wind_veer,
+            flow_field.air_density,
+            yaw_angles=yaw_angles,
+            solver=solver,
+            resolution=resolution
+        )
+
+    def sweep(self, conditions, max_workers=None, chunk_size=None,
+              solver="grid"):
+        """
+        Calculates the turbine powers for a set of conditions on a pool
+        of worker processes, each loading the model once from the input
+        file. The workers share the result cache of the interface, if it
+        has one. See :py:func:`floris.tools.sweep.sweep`.
+
+        Args:
+            conditions (pd.DataFrame): One row per condition, with
+                columns 'ws' and 'wd' and optional columns 'ti',
+                'shear', 'veer' and 'yaw_0' to 'yaw_<N-1>'. Missing
+                columns take the current values.
+            max_workers (int, optional): Number of worker processes.
+                Defaults to None, which uses one per processor.
+            chunk_size (int, optional): Number of rows sent to a worker
+                at once. Defaults to None.
+            solver (str, optional): Solver passed to calculate_wake.
+                Defaults to "grid".
+
+        Returns:
+            pd.DataFrame: The turbine powers with the index of
+            **conditions** and one column per turbine.
+        """
+        return floris_sweep.sweep(
+            self, conditions, max_workers=max_workers,
+            chunk_size=chunk_size, solver=solver)
+
+    def sweep_stream(self, conditions, chunk_size=1000, max_workers=None,
+                     max_pending=None, solver="grid", output=None):
+        """
+        Generator that calculates the turbine powers for a stream of
+        conditions in bounded chunks, optionally appending them to a
+        file. See :py:func:`floris.tools.sweep.sweep_stream`.
+
+        Args:
+            conditions (iterable): Data frames or single conditions with
+                the columns of :py:meth:`sweep`.
+            chunk_size (int, optional): Largest number of conditions
+                solved and yielded at once. Defaults to 1000.
+            max_workers (int, optional): Number of worker processes.
+                Defaults to None, which uses one per processor.
+            max_pending (int, optional): Largest number of chunks in
+                flight. Defaults to None, which allows two per worker.
+            solver (str, optional): Solver passed to calculate_wake.
+                Defaults to "grid".
+            output (str, optional): Path of a '.csv' or '.parquet' file
+                to append the results to. Defaults to None.
+
+        Yields:
+            pd.DataFrame: The turbine powers of each chunk, in the order
+            of the stream.
+        """
+        return floris_sweep.sweep_stream(
+            self, conditions, chunk_size=chunk_size, max_workers=max_workers,
+            max_pending=max_pending, solver=solver, output=output)
+
+    def simulate_time_series(self, conditions, resolution=None,
+                             interpolate=(), max_workers=1, chunk_size=None,
+                             solver="grid"):
+        """
+        Calculates the turbine powers of a time series of conditions,
+        solving each quantized state once. See
+        :py:func:`floris.tools.time_series.simulate_time_series`.
+
+        Args:
+            conditions (pd.DataFrame): One row per time step, with the
+                columns of :py:meth:`sweep`.
+            resolution (dict, optional): Quantization step of each
+                column. Defaults to None.
+            interpolate (iterable, optional): Names of the columns to
+                interpolate between grid states. Defaults to ().
+            max_workers (int, optional): Number of worker processes.
+                Defaults to 1.
+            chunk_size (int, optional): Number of states sent to a
+                worker at once. Defaults to None.
+            solver (str, optional): Solver passed to calculate_wake.
+                Defaults to "grid".
+
+        Returns:
+            pd.DataFrame: The turbine powers with the index of
+            **conditions** and one column per turbine.
+        """
+        return floris_time_series.simulate_time_series(
+            self, conditions, resolution=resolution, interpolate=interpolate,
+            max_workers=max_workers, chunk_size=chunk_size, solver=solver)
 
     def reinitialize_flow_field(self,
                                 wind_speed=None,
@@ -69,16 +261,18 @@ class FlorisInterface():
                 Defaults to None.
             wake (str, optional): wake model type. Defaults to None.
             layout_array (np.array, optional): array of x- and
-                y-locations of wind turbines. Defaults to None.
+                y-locations of wind turbines. If the number of turbines
+                changes, every turbine takes the type and settings of
+                the first turbine. Defaults to None.
             with_resolution (float, optional): resolution of output
                 flow_field. Defaults to None.
         """
 
         # Build turbine map (convenience layer for user)
         if layout_array is not None:
-            turbine_map = TurbineMap(
-                layout_array[0], layout_array[1],
-                self.floris.farm.flow_field.turbine_map.turbines)
+            turbine_map = TurbineMap.from_layout(
+                self.floris.farm.flow_field.turbine_map.layout.relocated(
+                    layout_array[0], layout_array[1]))
         else:
             turbine_map = None
 
@@ -125,16 +319,14 @@ class FlorisInterface():
         flow_field = copy.deepcopy(self.floris.farm.flow_field)
 
         # If x and y bounds are not provided, use rules of thumb
+        layout = self.floris.farm.flow_field.turbine_map.layout
+        max_diameter = self.floris.farm.flow_field.max_diameter
         if x_bounds is None:
-            coords = self.floris.farm.flow_field.turbine_map.coords
-            max_diameter = self.floris.farm.flow_field.max_diameter
-            x = [coord.x1 for coord in coords]
-            x_bounds = (min(x) - 2 * max_diameter, max(x) + 10 * max_diameter)
+            x_bounds = (np.min(layout.x) - 2 * max_diameter,
+                        np.max(layout.x) + 10 * max_diameter)
         if y_bounds is None:
-            coords = self.floris.farm.flow_field.turbine_map.coords
-            max_diameter = self.floris.farm.flow_field.max_diameter
-            y = [coord.x2 for coord in coords]
-            y_bounds = (min(y) - 2 * max_diameter, max(y) + 2 * max_diameter)
+            y_bounds = (np.min(layout.y) - 2 * max_diameter,
+                        np.max(layout.y) + 2 * max_diameter)
 
         # Z_bounds is always hub-height
         hub_height = self.floris.farm.flow_field.turbine_map.turbines[
@@ -152,32 +344,8 @@ class FlorisInterface():
         # Calculate the wakes
         flow_field.calculate_wake()
 
-        order = "f"
-        x = flow_field.x.flatten(order=order)
-        y = flow_field.y.flatten(order=order)
-        z = flow_field.z.flatten(order=order)
-
-        u = flow_field.u.flatten(order=order)
-        v = flow_field.v.flatten(order=order)
-        w = flow_field.w.flatten(order=order)
-
-        # Determine spacing, dimensions and origin
-        unique_x = np.sort(np.unique(x))
-        unique_y = np.sort(np.unique(y))
-        unique_z = np.sort(np.unique(z))
-        spacing = Vec3(unique_x[1] - unique_x[0], unique_y[1] - unique_y[0],
-                       unique_z[1] - unique_z[0])
-        dimensions = Vec3(len(unique_x), len(unique_y), len(unique_z))
-        origin = Vec3(0.0, 0.0, 0.0)
-        return FlowData(x,
-                        y,
-                        z,
-                        u,
-                        v,
-                        w,
-                        spacing=spacing,
-                        dimensions=dimensions,
-                        origin=origin)
+        return FlowData.from_grid(flow_field.x, flow_field.y, flow_field.z,
+                                  flow_field.u, flow_field.v, flow_field.w)
 
     def get_flow_data(self, resolution=None, grid_spacing=10):
         """
@@ -207,48 +375,24 @@ class FlorisInterface():
                 print('Assuming model resolution')
                 resolution = self.floris.farm.flow_field.wake.velocity_model.model_grid_resolution
 
-        # Get a copy for the flow field so don't change underlying grid points
-        flow_field = copy.deepcopy(self.floris.farm.flow_field)
-
-        if flow_field.wake.velocity_model.requires_resolution and \
-            flow_field.wake.velocity_model.model_grid_resolution != resolution:
+        velocity_model = self.floris.farm.flow_field.wake.velocity_model
+        if velocity_model.requires_resolution and \
+            velocity_model.model_grid_resolution != resolution:
             print(
                 "WARNING: The current wake velocity model contains a required grid resolution;"
             )
             print(
                 "    The Resolution given to FlorisInterface.get_flow_field is ignored."
             )
-            resolution = flow_field.wake.velocity_model.model_grid_resolution
-        flow_field.reinitialize_flow_field(with_resolution=resolution)
+            resolution = velocity_model.model_grid_resolution
         print(resolution)
-        flow_field.calculate_wake()
 
-        order = "f"
-        x = flow_field.x.flatten(order=order)
-        y = flow_field.y.flatten(order=order)
-        z = flow_field.z.flatten(order=order)
-
-        u = flow_field.u.flatten(order=order)
-        v = flow_field.v.flatten(order=order)
-        w = flow_field.w.flatten(order=order)
-
-        # Determine spacing, dimensions and origin
-        unique_x = np.sort(np.unique(x))
-        unique_y = np.sort(np.unique(y))
-        unique_z = np.sort(np.unique(z))
-        spacing = Vec3(unique_x[1] - unique_x[0], unique_y[1] - unique_y[0],
-                       unique_z[1] - unique_z[0])
-        dimensions = Vec3(len(unique_x), len(unique_y), len(unique_z))
-        origin = Vec3(0.0, 0.0, 0.0)
-        return FlowData(x,
-                        y,
-                        z,
-                        u,
-                        v,
-                        w,
-                        spacing=spacing,
-                        dimensions=dimensions,
-                        origin=origin)
+        # Solve on a separate flow field so don't change underlying grid
+        # points
+        flow_field = self.evaluate(resolution=resolution).flow_field
+
+        return FlowData.from_grid(flow_field.x, flow_field.y, flow_field.z,
+                                  flow_field.u, flow_field.v, flow_field.w)
 
     def get_yaw_angles(self):
         """
@@ -257,10 +401,7 @@ class FlorisInterface():
         Returns:
             yaw_angles (np.array): wind turbine yaw angles.
         """
-        yaw_angles = [
-            turbine.yaw_angle
-            for turbine in self.floris.farm.turbine_map.turbines
-        ]
+        yaw_angles = list(self.floris.farm.turbine_map.layout.yaw_angles)
         return yaw_angles
 
     def get_farm_power(self):
@@ -314,10 +455,7 @@ class FlorisInterface():
         Returns:
             layout_x (np.array): Wind turbine x-coordinate (east-west).
         """
-        coords = self.floris.farm.flow_field.turbine_map.coords
-        layout_x = np.zeros(len(coords))
-        for i, coord in enumerate(coords):
-            layout_x[i] = coord.x1prime
+        layout_x = self.floris.farm.flow_field.turbine_map.layout.x.copy()
         return layout_x
 
     @property
@@ -328,8 +466,5 @@ class FlorisInterface():
         Returns:
             layout_y (np.array): Wind turbine y-coordinate (east-west).
         """
-        coords = self.floris.farm.flow_field.turbine_map.coords
-        layout_y = np.zeros(len(coords))
-        for i, coord in enumerate(coords):
-            layout_y[i] = coord.x2prime
+        layout_y = self.floris.farm.flow_field.turbine_map.layout.y.copy()
         return layout_y
\ No newline at end of file
@@ -9,9 +9,31 @@
 # CONDITIONS OF ANY KIND, either express or implied. See the License for the
 # specific language governing permissions and limitations under the License.
 
+import json
 import os
+import re
 import numpy as np
-from ..utilities import Vec3, Output
+import pandas as pd
+from ..utilities import Vec3
+
+# the coordinate and velocity arrays of a FlowData object
+_FIELDS = ('x', 'y', 'z', 'u', 'v', 'w')
+
+# number of points written at a time by the exporters
+_CHUNK_POINTS = 2**18
+
+
+def _write_cache(cache_file, values):
+    # Writes a cache file atomically, so that concurrent readers never
+    # map a partial file; caching is skipped where it cannot be written
+    temporary = '%s.%d.tmp' % (cache_file, os.getpid())
+    try:
+        with open(temporary, 'wb') as f:
+            np.save(f, values)
+        os.replace(temporary, cache_file)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
 
 
 class FlowData():
@@ -29,11 +51,17 @@ class FlowData():
                  w,
                  spacing=None,
                  dimensions=None,
-                 origin=None):
+                 origin=None,
+                 axes=None):
         """
         Initialize FlowData object with coordinates, velocity fields,
         and meta data.
 
+        The data may be a cloud of scattered points or a rectilinear
+        grid. For a grid, **axes** holds the sorted x, y and z
+        coordinates of its lines and the flat arrays list the points
+        with x varying fastest, see :py:meth:`from_grid`.
+
         Args:
             x (np.array): Cartesian coordinate data.
             y (np.array): Cartesian coordinate data.
@@ -47,6 +75,8 @@ class FlowData():
                 (e.g. x1, x2, x3). Defaults to None.
             origin (iterable, optional): Coordinates of origin.
                 Defaults to None.
+            axes (tuple, optional): The x, y and z axis vectors of a
+                rectilinear grid. Defaults to None, for scattered data.
         """
 
         self.x = x
@@ -60,32 +90,431 @@ class FlowData():
         self.spacing = spacing
         self.dimensions = dimensions
         self.origin = origin
+        self.axes = axes
 
         # Technically resolution is a restating of above, but it is useful to have
-        self.resolution = Vec3(len(np.unique(x)), len(np.unique(y)),
-                               len(np.unique(z)))
+        if axes is not None:
+            self.resolution = Vec3(*[len(axis) for axis in axes])
+        else:
+            self.resolution = Vec3(len(np.unique(x)), len(np.unique(y)),
+                                   len(np.unique(z)))
+
+    @classmethod
+    def from_grid(cls, x, y, z, u, v, w, origin=None):
+        """
+        Build a FlowData object from 3D arrays indexed by (x, y, z), such
+        as the grid of a :py:class:`floris.simulation.flow_field.FlowField`.
+        The data keep their axis vectors if the coordinates form a
+        rectilinear grid, e.g. unless the grid was rotated.
+
+        Args:
+            x (np.array): Cartesian coordinate data.
+            y (np.array): Cartesian coordinate data.
+            z (np.array): Cartesian coordinate data.
+            u (np.array): x-component of velocity.
+            v (np.array): y-component of velocity.
+            w (np.array): z-component of velocity.
+            origin (Vec3, optional): Coordinates of origin.
+                Defaults to None, which is (0, 0, 0).
+
+        Returns:
+            (:py:class:`floris.tools.flow_data.FlowData`):
+            FlowData object with x varying fastest in the flat arrays.
+        """
+        if origin is None:
+            origin = Vec3(0.0, 0.0, 0.0)
+        axes = (x[:, 0, 0], y[0, :, 0], z[0, 0, :])
+        rectilinear = (np.all(x == axes[0][:, None, None])
+                       and np.all(y == axes[1][None, :, None])
+                       and np.all(z == axes[2][None, None, :])
+                       and all(np.all(np.diff(axis) > 0) for axis in axes))
+        if not rectilinear:
+            axes = [np.sort(np.unique(coord)) for coord in (x, y, z)]
+        spacing = Vec3(*[axis[1] - axis[0] if len(axis) > 1 else 0.0
+                         for axis in axes])
+        dimensions = Vec3(*[len(axis) for axis in axes])
+
+        order = "f"
+        return cls(x.flatten(order=order),
+                   y.flatten(order=order),
+                   z.flatten(order=order),
+                   u.flatten(order=order),
+                   v.flatten(order=order),
+                   w.flatten(order=order),
+                   spacing=spacing,
+                   dimensions=dimensions,
+                   origin=origin,
+                   axes=tuple(axes) if rectilinear else None)
+
+    @property
+    def shape(self):
+        """
+        Shape of the grid of a structured FlowData object.
+
+        Returns:
+            tuple: The number of points along x, y and z, or None for
+            scattered data.
+        """
+        if self.axes is None:
+            return None
+        return tuple(len(axis) for axis in self.axes)
+
+    def grid_values(self, name):
+        """
+        View of a coordinate or velocity component of a structured
+        FlowData object as a 3D array indexed by (x, y, z).
+
+        Args:
+            name (str): One of 'x', 'y', 'z', 'u', 'v' or 'w'.
+
+        Returns:
+            np.array: A view on the flat data.
+        """
+        if self.axes is None:
+            raise ValueError("FlowData holds scattered points, not a grid")
+        return getattr(self, name).reshape(self.shape, order="F")
+
+    def _vtk_geometry(self):
+        # Dimensions, spacing and origin of the structured points; the
+        # origin of the file is the position of the first point
+        if self.dimensions is None or self.spacing is None:
+            raise ValueError("FlowData has no grid dimensions and spacing")
+        origin = self.origin if self.origin is not None else Vec3(0, 0, 0)
+        dimensions = [int(round(n)) for n in (self.dimensions.x1,
+                                               self.dimensions.x2,
+                                               self.dimensions.x3)]
+        spacing = Vec3(self.spacing.x1, self.spacing.x2, self.spacing.x3)
+        origin = Vec3(origin.x1 + self.x[0], origin.x2 + self.y[0],
+                      origin.x3 + self.z[0])
+        return dimensions, spacing, origin
 
-    def save_as_vtk(self, filename):
+    def _velocity_chunks(self, dtype):
+        # The velocity vectors of blocks of points, interleaved
+        for start in range(0, len(self.u), _CHUNK_POINTS):
+            stop = start + _CHUNK_POINTS
+            yield np.column_stack([self.u[start:stop], self.v[start:stop],
+                                   self.w[start:stop]]).astype(dtype)
+
+    def save_as_vtk(self, filename, binary=False):
         """
-        Save FlowData Object to vtk
+        Save FlowData Object to a legacy vtk file of structured points
+
+        The points are written in blocks straight from the arrays. The
+        ORIGIN of the file is the position of the first point.
 
         Args:
             filename (str): Write-to path for vtk file
+            binary (bool, optional): Write the velocities as big-endian
+                binary floats instead of text. Defaults to False.
+        """
+        dimensions, spacing, origin = self._vtk_geometry()
+        n_points = dimensions[0] * dimensions[1] * dimensions[2]
+        header = [
+            '# vtk DataFile Version 3.0',
+            'array.mean0D',
+            'BINARY' if binary else 'ASCII',
+            'DATASET STRUCTURED_POINTS',
+            'DIMENSIONS {} {} {}'.format(*dimensions),
+            'ORIGIN {!r} {!r} {!r}'.format(origin.x1, origin.x2, origin.x3),
+            'SPACING {!r} {!r} {!r}'.format(spacing.x1, spacing.x2,
+                                            spacing.x3),
+            'POINT_DATA {}'.format(n_points),
+            'FIELD attributes 1',
+            'UAvg 3 {} float'.format(n_points),
+        ]
+        with open(filename, 'wb') as vtk_file:
+            vtk_file.write(('\n'.join(header) + '\n').encode('ascii'))
+            for chunk in self._velocity_chunks('>f4' if binary else float):
+                if binary:
+                    vtk_file.write(chunk.tobytes())
+                else:
+                    # one formatting operation per block of points
+                    text = '%8.3f %8.3f %8.3f\n' * len(chunk)
+                    vtk_file.write((text % tuple(chunk.ravel())).encode())
+            if binary:
+                vtk_file.write(b'\n')
+
+    def save_as_vti(self, filename):
+        """
+        Save FlowData Object to a VTK XML image data file, with the
+        velocities appended as raw little-endian binary floats
+
+        Args:
+            filename (str): Write-to path for vti file
+        """
+        dimensions, spacing, origin = self._vtk_geometry()
+        n_points = dimensions[0] * dimensions[1] * dimensions[2]
+        extent = ' '.join('0 {}'.format(n - 1) for n in dimensions)
+        header = [
+            '<?xml version="1.0"?>',
+            '<VTKFile type="ImageData" version="1.0" '
+            'byte_order="LittleEndian" header_type="UInt64">',
+            '  <ImageData WholeExtent="{}" Origin="{!r} {!r} {!r}" '
+            'Spacing="{!r} {!r} {!r}">'.format(
+                extent, origin.x1, origin.x2, origin.x3, spacing.x1,
+                spacing.x2, spacing.x3),
+            '    <Piece Extent="{}">'.format(extent),
+            '      <PointData Vectors="UAvg">',
+            '        <DataArray type="Float32" Name="UAvg" '
+            'NumberOfComponents="3" format="appended" offset="0"/>',
+            '      </PointData>',
+            '    </Piece>',
+            '  </ImageData>',
+            '  <AppendedData encoding="raw">',
+        ]
+        with open(filename, 'wb') as vti_file:
+            vti_file.write(('\n'.join(header) + '\n   _').encode('ascii'))
+            vti_file.write(np.uint64(3 * 4 * n_points).astype('<u8').tobytes())
+            for chunk in self._velocity_chunks('<f4'):
+                vti_file.write(chunk.tobytes())
+            vti_file.write(b'\n  </AppendedData>\n</VTKFile>\n')
+
+    def _metadata(self):
+        metadata = {}
+        for name in ('spacing', 'dimensions', 'origin'):
+            value = getattr(self, name)
+            if value is not None:
+                metadata[name] = [value.x1, value.x2, value.x3]
+        if self.axes is not None:
+            metadata['axes'] = [axis.tolist() for axis in self.axes]
+        return metadata
+
+    def save_as_npz(self, filename):
+        """
+        Save FlowData Object to a NumPy .npz archive, keeping the
+        coordinates and velocities at full precision
+
+        Args:
+            filename (str): Write-to path for npz file
+        """
+        np.savez(filename,
+                 metadata=np.array(json.dumps(self._metadata())),
+                 **{name: getattr(self, name) for name in _FIELDS})
+
+    def save_as_npy(self, directory):
         """
-        n_points = self.dimensions.x1 * self.dimensions.x2 * self.dimensions.x3
-        vtk_file = Output(filename)
-        vtk_file.write_line('# vtk DataFile Version 3.0')
-        vtk_file.write_line('array.mean0D')
-        vtk_file.write_line('ASCII')
-        vtk_file.write_line('DATASET STRUCTURED_POINTS')
-        vtk_file.write_line('DIMENSIONS {}'.format(self.dimensions))
-        vtk_file.write_line('ORIGIN {}'.format(self.origin))
-        vtk_file.write_line('SPACING {}'.format(self.spacing))
-        vtk_file.write_line('POINT_DATA {}'.format(n_points))
-        vtk_file.write_line('FIELD attributes 1')
-        vtk_file.write_line('UAvg 3 {} float'.format(n_points))
-        for u, v, w in zip(self.u, self.v, self.w):
-            vtk_file.write_line('{}'.format(Vec3(u, v, w)))
+        Save FlowData Object to a directory of NumPy .npy files, one per
+        coordinate and velocity component, that can be read back as
+        memory maps. The arrays are copied in blocks.
+
+        Args:
+            directory (str): Write-to directory, created if missing
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'metadata.json'), 'w') as f:
+            json.dump(self._metadata(), f)
+        for name in _FIELDS:
+            values = getattr(self, name)
+            array = np.lib.format.open_memmap(
+                os.path.join(directory, name + '.npy'), mode='w+',
+                dtype=values.dtype, shape=values.shape)
+            for start in range(0, len(values), _CHUNK_POINTS):
+                array[start:start + _CHUNK_POINTS] = \
+                    values[start:start + _CHUNK_POINTS]
+            array.flush()
+            del array
+
+    @classmethod
+    def _from_structured_points(cls, dimensions, spacing, origin, velocities):
+        # The points of a structured points file, relative to its origin,
+        # with x varying fastest; velocities holds the u, v and w rows
+        nx, ny, nz = dimensions
+        axes = tuple(np.arange(n) * d for n, d in
+                     zip(dimensions, (spacing.x1, spacing.x2, spacing.x3)))
+        x = np.tile(axes[0], ny * nz)
+        y = np.tile(np.repeat(axes[1], nx), nz)
+        z = np.repeat(axes[2], nx * ny)
+        return cls(x, y, z, velocities[0], velocities[1], velocities[2],
+                   spacing=spacing, dimensions=Vec3(nx, ny, nz),
+                   origin=origin, axes=axes)
+
+    @staticmethod
+    def _read_vtk_header(vtk_file):
+        # Reads the header of a legacy vtk file up to its values
+        vtk_file.readline()
+        vtk_file.readline()
+        binary = vtk_file.readline().strip().upper() == b'BINARY'
+        while True:
+            line = vtk_file.readline()
+            if not line:
+                raise ValueError('no FIELD data in %s' % vtk_file.name)
+            words = line.decode('ascii').split()
+            if not words:
+                continue
+            if words[0] == 'DIMENSIONS':
+                dimensions = [int(float(n)) for n in words[1:4]]
+            elif words[0] == 'ORIGIN':
+                origin = Vec3(*[float(n) for n in words[1:4]])
+            elif words[0] == 'SPACING':
+                spacing = Vec3(*[float(n) for n in words[1:4]])
+            elif words[0] == 'FIELD':
+                # the line of the velocity array precedes its values
+                vtk_file.readline()
+                return binary, dimensions, spacing, origin
+
+    @staticmethod
+    def _read_vtk_values(vtk_file, binary, n_points):
+        # Reads the velocity vectors of a legacy vtk file into u, v and w
+        # rows
+        if binary:
+            velocities = np.fromfile(vtk_file, dtype='>f4',
+                                     count=3 * n_points)
+        else:
+            # tab separated text, as written by SOWFA, parses fastest
+            start = vtk_file.tell()
+            separator = '\t' if b'\t' in vtk_file.readline() else r'\s+'
+            vtk_file.seek(start)
+            velocities = pd.read_csv(vtk_file, sep=separator, header=None,
+                                     dtype=float).values
+        return np.ascontiguousarray(velocities.reshape((-1, 3)).T,
+                                    dtype=float)
+
+    @classmethod
+    def read_vtk_geometry(cls, filename):
+        """
+        Read the grid of a legacy vtk file of structured points from its
+        header, without reading its values.
+
+        Args:
+            filename (str): Read-from path of the vtk file
+
+        Returns:
+            (:py:class:`floris.utilities.Vec3`, :py:class:`floris.utilities.Vec3`,
+            :py:class:`floris.utilities.Vec3`): The dimensions, spacing
+            and origin of the grid.
+        """
+        with open(filename, 'rb') as vtk_file:
+            _, dimensions, spacing, origin = cls._read_vtk_header(vtk_file)
+        return Vec3(*dimensions), spacing, origin
+
+    @classmethod
+    def read_vtk(cls, filename, cache=False, mmap_mode='c'):
+        """
+        Read a FlowData Object from a legacy vtk file of structured
+        points, written as text or binary, e.g. by :py:meth:`save_as_vtk`
+        or SOWFA. The coordinates start at zero and the ORIGIN of the
+        file becomes the origin of the FlowData.
+
+        Args:
+            filename (str): Read-from path of the vtk file
+            cache (bool, optional): Keep the parsed velocities in a
+                '.npy' file next to the vtk file, and map that file
+                instead of parsing the values while it is newer than
+                the vtk file. Defaults to False.
+            mmap_mode (str, optional): Memory map mode of the cached
+                velocities. Defaults to 'c', copy-on-write, whose arrays
+                are writable like parsed ones while changes stay in
+                memory; 'r' maps them read-only.
+
+        Returns:
+            (:py:class:`floris.tools.flow_data.FlowData`): FlowData object
+        """
+        cache_file = filename + '.npy'
+        with open(filename, 'rb') as vtk_file:
+            binary, dimensions, spacing, origin = \
+                cls._read_vtk_header(vtk_file)
+            n_points = dimensions[0] * dimensions[1] * dimensions[2]
+            velocities = None
+            if cache and os.path.exists(cache_file) and \
+                    os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+                velocities = np.load(cache_file, mmap_mode=mmap_mode)
+                if velocities.shape != (3, n_points):
+                    velocities = None
+            if velocities is None:
+                velocities = cls._read_vtk_values(vtk_file, binary, n_points)
+                if cache:
+                    _write_cache(cache_file, velocities)
+        return cls._from_structured_points(dimensions, spacing, origin,
+                                           velocities)
+
+    @classmethod
+    def read_vti(cls, filename):
+        """
+        Read a FlowData Object from a VTK XML image data file written by
+        :py:meth:`save_as_vti`.
+
+        Args:
+            filename (str): Read-from path of the vti file
+
+        Returns:
+            (:py:class:`floris.tools.flow_data.FlowData`): FlowData object
+        """
+        with open(filename, 'rb') as vti_file:
+            header = b''
+            while b'<AppendedData' not in header:
+                line = vti_file.readline()
+                if not line:
+                    raise ValueError('no appended data in %s' % filename)
+                header += line
+            # the raw data follow the underscore
+            while vti_file.read(1) != b'_':
+                pass
+            header = header.decode('ascii')
+
+            def attribute(name):
+                return re.search(name + r'="([^"]*)"', header).group(1)
+
+            extent = [int(n) for n in attribute('WholeExtent').split()]
+            dimensions = [extent[1] - extent[0] + 1, extent[3] - extent[2] + 1,
+                          extent[5] - extent[4] + 1]
+            origin = Vec3(*[float(n) for n in attribute('Origin').split()])
+            spacing = Vec3(*[float(n) for n in attribute('Spacing').split()])
+            n_bytes = int(np.fromfile(vti_file, dtype='<u8', count=1)[0])
+            velocities = np.fromfile(vti_file, dtype='<f4',
+                                     count=n_bytes // 4)
+        velocities = np.ascontiguousarray(velocities.reshape((-1, 3)).T,
+                                          dtype=float)
+        return cls._from_structured_points(dimensions, spacing, origin,
+                                           velocities)
+
+    @classmethod
+    def _from_arrays(cls, arrays, metadata):
+        vectors = {name: Vec3(*metadata[name])
+                   for name in ('spacing', 'dimensions', 'origin')
+                   if name in metadata}
+        axes = None
+        if 'axes' in metadata:
+            axes = tuple(np.array(axis) for axis in metadata['axes'])
+        return cls(*[arrays[name] for name in _FIELDS], axes=axes, **vectors)
+
+    @classmethod
+    def read_npz(cls, filename):
+        """
+        Read a FlowData Object from a NumPy .npz archive written by
+        :py:meth:`save_as_npz`.
+
+        Args:
+            filename (str): Read-from path of the npz file
+
+        Returns:
+            (:py:class:`floris.tools.flow_data.FlowData`): FlowData object
+        """
+        with np.load(filename) as data:
+            metadata = json.loads(str(data['metadata']))
+            arrays = {name: data[name] for name in _FIELDS}
+        return cls._from_arrays(arrays, metadata)
+
+    @classmethod
+    def read_npy(cls, directory, mmap_mode='r'):
+        """
+        Read a FlowData Object from a directory written by
+        :py:meth:`save_as_npy`.
+
+        Args:
+            directory (str): Read-from directory
+            mmap_mode (str, optional): Memory map mode of the arrays,
+                see :py:func:`numpy.load`. Defaults to 'r', which maps
+                the files read-only instead of loading them.
+
+        Returns:
+            (:py:class:`floris.tools.flow_data.FlowData`): FlowData object
+        """
+        with open(os.path.join(directory, 'metadata.json')) as f:
+            metadata = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, name + '.npy'),
+                                mmap_mode=mmap_mode)
+                  for name in _FIELDS}
+        return cls._from_arrays(arrays, metadata)
 
     @staticmethod
     def crop(ff, x_bnds, y_bnds, z_bnds):
@@ -102,24 +531,61 @@ class FlowData():
         Returns:
             (:py:class:`floris.tools.flow_data.FlowData`):
             cropped FlowData object.
+
+        Raises:
+            ValueError: If no point lies strictly inside the bounds.
         """
+        empty = 'no point of the FlowData lies inside the crop bounds'
+        origin = ff.origin if ff.origin is not None else Vec3(0, 0, 0)
+
+        if ff.axes is not None:
+            # the points inside the bounds are a block of the grid
+            index = []
+            for axis, bnds in zip(ff.axes, (x_bnds, y_bnds, z_bnds)):
+                inside = np.flatnonzero((axis > bnds[0]) & (axis < bnds[1]))
+                if inside.size == 0:
+                    raise ValueError(empty)
+                index.append(slice(inside[0], inside[-1] + 1))
+            index = tuple(index)
+            axes = [axis[i] for axis, i in zip(ff.axes, index)]
+            minimum = [axis[0] for axis in axes]
+            x, y, z, u, v, w = [
+                ff.grid_values(name)[index].flatten(order="F")
+                for name in ("x", "y", "z", "u", "v", "w")
+            ]
+            return FlowData(
+                x - minimum[0],
+                y - minimum[1],
+                z - minimum[2],
+                u,
+                v,
+                w,
+                spacing=ff.spacing,  # doesn't change
+                dimensions=Vec3(*[len(axis) for axis in axes]),
+                origin=Vec3(origin.x1 + minimum[0],
+                            origin.x2 + minimum[1],
+                            origin.x3 + minimum[2]),
+                axes=tuple(axis - m for axis, m in zip(axes, minimum)))
 
         map_values = (ff.x > x_bnds[0]) & (ff.x < x_bnds[1]) & (
             ff.y > y_bnds[0]) & (ff.y < y_bnds[1]) & (ff.z > z_bnds[0]) & (
                 ff.z < z_bnds[1])
+        if not np.any(map_values):
+            raise ValueError(empty)
 
         x = ff.x[map_values]
         y = ff.y[map_values]
         z = ff.z[map_values]
 
         #  Work out new dimensions
-        dimensions = (len(np.unique(x)), len(np.unique(y)), len(np.unique(z)))
+        dimensions = Vec3(len(np.unique(x)), len(np.unique(y)),
+                          len(np.unique(z)))
 
         # Work out origin
-        origin = (
-            ff.origin.x1 + np.min(x),
-            ff.origin.x2 + np.min(y),
-            ff.origin.x3 + np.min(z),
+        origin = Vec3(
+            origin.x1 + np.min(x),
+            origin.x2 + np.min(y),
+            origin.x3 + np.min(z),
         )
 
         return FlowData(
@@ -9,6 +9,7 @@
 # CONDITIONS OF ANY KIND, either express or implied. See the License for the
 # specific language governing permissions and limitations under the License.
 
+from ..utilities import bin_slices
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -128,30 +129,33 @@ def data_plot(x,
         vals_80_down = np.zeros_like(x_bins) * np.nan
         # p_down_vals = np.zeros_like(x_bins) * np.nan
 
-        for x_idx, x_cent in enumerate(x_bins):
+        # sort the data once, so that each bin is a contiguous slice
+        order, slices = bin_slices(df['x'].values, x_bins, x_radius,
+                                   include_upper=True)
+        y_sorted = df['y'].values[order]
 
-            df_sub = df[(df.x >= x_cent - x_radius)
-                        & (df.x <= x_cent + x_radius)]
+        for x_idx, x_slice in enumerate(slices):
+
+            y_sub = y_sorted[x_slice]
 
             #TODO this conditional statement contains a lot of stuff to be cleaned up. Why all the commented content?
-            if df_sub.shape[0] > min_vals:
+            if len(y_sub) > min_vals:
 
                 # Get statistics via bootstrapping
                 n_bs = 40
                 boot_frac = 1.0
-                med_array = np.zeros(n_bs)
-                for i_bs in range(n_bs):
-                    # Random subset the df
-                    df_rand = df_sub.sample(frac=boot_frac, replace=True)
-                    # med_array[i_bs] = np.median(df_rand.y)
-                    med_array[i_bs] = np.mean(df_rand.y)
+                # Random subsets of the bin
+                n_rand = int(round(boot_frac * len(y_sub)))
+                ind_bs = np.random.randint(len(y_sub), size=(n_bs, n_rand))
+                # med_array = np.median(y_sub[ind_bs], axis=1)
+                med_array = np.mean(y_sub[ind_bs], axis=1)
 
                 # median_vals[x_idx] = np.nanmedian(df_sub.y)
-                median_vals[x_idx] = np.mean(df_sub.y)
+                median_vals[x_idx] = np.mean(y_sub)
                 vals_80_down[x_idx], vals_80_up[x_idx] = np.percentile(
-                    df_sub.y, [50 + 0.5 * 80., 50 - 0.5 * 80.])
+                    y_sub, [50 + 0.5 * 80., 50 - 0.5 * 80.])
                 # mean_vals[x_idx] = np.median(ratio_array)
-                count_vals[x_idx] = df_sub.shape[0]
+                count_vals[x_idx] = len(y_sub)
                 # ci_vals[x_idx] = scipy.stats.sem(ratio_array, ddof=1) * 1.96 # df_sub.y.apply(lambda x: scipy.stats.sem(x, ddof=1) * 1.96)
                 # p_up_vals[x_idx] = p_up_func(ratio_array)# df_sub.y.apply(p_up_func)
                 # p_down_vals[x_idx] = p_down_func(ratio_array)#df_sub.y.apply(p_down_func)
@@ -242,19 +246,17 @@ def stacked_plot(x, groups, x_bins, ax, color_array=None):
 
     p_array = np.zeros((num_groups, len(x_bins)))
 
-    for x_idx, x_cent in enumerate(x_bins):
+    # sort the groups once by x, so that each bin is a contiguous slice
+    order, slices = bin_slices(x, x_bins, x_radius)
+    group_index = np.searchsorted(group_vals, np.asarray(groups))[order]
 
-        x_mask = (x >= x_cent - x_radius) \
-                    & (x < x_cent + x_radius)
+    for x_idx, x_slice in enumerate(slices):
 
-        # y_bin = y[x_mask]
-        g_bin = groups[x_mask]
+        g_bin = group_index[x_slice]
         num_points = len(g_bin)
 
         if num_points > 0:
-            for g_idx, g in enumerate(group_vals):
-                p_array[g_idx, x_idx] = np.sum(
-                    g_bin == g)  # / float(num_points)
+            p_array[:, x_idx] = np.bincount(g_bin, minlength=num_groups)
     p = list()
 
     if not color_array is None:
@@ -309,18 +311,17 @@ def stacked_percent_plot(x, groups, x_bins, ax, color_array=None):
 
     p_array = np.zeros((num_groups, len(x_bins)))
 
-    for x_idx, x_cent in enumerate(x_bins):
+    # sort the groups once by x, so that each bin is a contiguous slice
+    order, slices = bin_slices(x, x_bins, x_radius)
+    group_index = np.searchsorted(group_vals, np.asarray(groups))[order]
 
-        x_mask = (x >= x_cent - x_radius) \
-                    & (x < x_cent + x_radius)
+    for x_idx, x_slice in enumerate(slices):
 
-        # y_bin = y[x_mask]
-        g_bin = groups[x_mask]
+        g_bin = group_index[x_slice]
         num_points = len(g_bin)
 
         if num_points > 0:
-            for g_idx, g in enumerate(group_vals):
-                p_array[g_idx, x_idx] = np.sum(g_bin == g) / float(num_points)
+            p_array[:, x_idx] = np.bincount(g_bin, minlength=num_groups) / float(num_points)
     p = list()
 
     if not color_array is None:
@@ -0,0 +1,239 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from ..utilities import Vec3
+import numpy as np
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import time
+
+# the turbine type attributes that determine the turbine results
+_TURBINE_TYPE_ATTRIBUTES = [
+    "rotor_diameter", "hub_height", "blade_count", "pP", "pT",
+    "generator_efficiency", "power_thrust_table", "tsr", "rotor_grid",
+    "rotor_grid_resolution", "grid_point_count"
+]
+
+
+def _json_default(value):
+    # canonical forms of the non-json values in the model state
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Vec3):
+        return [value.x1, value.x2, value.x3]
+    raise TypeError("cannot hash a value of type %s" % type(value))
+
+
+def hash_state(state):
+    """
+    Hashes a json-like structure of model inputs. Dictionaries are
+    hashed independently of their key order and numpy values by their
+    contents.
+
+    Args:
+        state: A structure of dicts, lists, strings, numbers, numpy
+            arrays and :py:class:`floris.utilities.Vec3` objects.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    text = json.dumps(state, sort_keys=True, default=_json_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_input_file(input_file):
+    """
+    Hashes the contents of a FLORIS json input file, independently of
+    its formatting.
+
+    Args:
+        input_file (str): Path to the FLORIS json input file.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    with open(input_file) as json_file:
+        return hash_state(json.load(json_file))
+
+
+def model_state(floris):
+    """
+    Collects the in-memory model inputs that determine the turbine
+    results of a calculate_wake call: the wake model parameters, the
+    turbine types and the layout with its per-turbine settings, the
+    inflow conditions and the flow field grid, whose bounds and
+    resolution set the points the turbine velocities are taken from.
+    The per-turbine turbulence intensities are results of a solve and
+    are not included; a cached solve starts from the inflow turbulence
+    intensity.
+
+    Args:
+        floris (Floris): A :py:class:`floris.simulation.floris.Floris`
+            object.
+
+    Returns:
+        dict: The model inputs, to be hashed with :py:func:`hash_state`.
+    """
+    flow_field = floris.farm.flow_field
+    wake = flow_field.wake
+    layout = flow_field.turbine_map.layout
+    return {
+        "wake": {
+            "velocity": vars(wake.velocity_model),
+            "deflection": vars(wake.deflection_model),
+            "combination": wake.combination_model.model_string
+        },
+        "turbine_types": [
+            {name: getattr(turbine_type, name)
+             for name in _TURBINE_TYPE_ATTRIBUTES}
+            for turbine_type in layout.turbine_types
+        ],
+        "layout": {
+            "x": layout.x,
+            "y": layout.y,
+            "z": layout.z,
+            "type_index": layout.type_index,
+            "yaw_angles": layout.yaw_angles,
+            "tilt_angles": layout.tilt_angles,
+            "air_density": layout.air_density
+        },
+        "inflow": {
+            "wind_speed": flow_field.wind_speed,
+            "wind_direction": flow_field.wind_direction,
+            "wind_shear": flow_field.wind_shear,
+            "wind_veer": flow_field.wind_veer,
+            "turbulence_intensity": flow_field.turbulence_intensity,
+            "air_density": flow_field.air_density
+        },
+        "grid": {
+            "bounds": flow_field.domain_bounds,
+            "shape": np.shape(flow_field.x)
+        }
+    }
+
+
+class ResultCache():
+    """
+    ResultCache is a persistent, content-addressed store of turbine
+    results in an sqlite database file.
+
+    Each entry holds the turbine velocities and turbulence intensities
+    of one solve under the hash of its inputs. The
+    least recently used entries are removed once the stored results
+    exceed **max_size** bytes. The database may be shared by several
+    processes; sqlite serializes their writes. A cache object can be
+    passed to worker processes, which open their own connection.
+
+    Args:
+        path (str): Path to the database file, created if missing.
+        max_size (int, optional): Largest total size of the stored
+            results in bytes. Defaults to 256 MB.
+
+    Returns:
+        ResultCache: An instantiated ResultCache object.
+    """
+
+    def __init__(self, path, max_size=256 * 1024**2):
+        self.path = path
+        self.max_size = max_size
+        self._connection = None
+        self._pid = None
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB, size INTEGER, "
+                "accessed REAL)")
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed "
+                "ON results (accessed)")
+
+    def _connect(self):
+        # connections are not shared with forked processes
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=60.0)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def __getstate__(self):
+        return {"path": self.path, "max_size": self.max_size}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], max_size=state["max_size"])
+
+    def get(self, key):
+        """
+        Looks up the results stored under a key and marks them as
+        recently used.
+
+        Args:
+            key (str): The hash of the solve inputs.
+
+        Returns:
+            dict: The stored arrays by name, or None if the key is not
+            in the cache.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE results SET accessed = ? WHERE key = ?",
+                (time.time(), key))
+        with np.load(io.BytesIO(row[0])) as data:
+            return {name: data[name] for name in data.files}
+
+    def put(self, key, results):
+        """
+        Stores results under a key, then removes the least recently
+        used entries beyond the size bound.
+
+        Args:
+            key (str): The hash of the solve inputs.
+            results (dict): Arrays by name.
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, **results)
+        value = buffer.getvalue()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()))
+            total = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_size:
+                evicted = []
+                for old_key, size in connection.execute(
+                        "SELECT key, size FROM results ORDER BY accessed"):
+                    if total <= self.max_size:
+                        break
+                    evicted.append((old_key,))
+                    total -= size
+                connection.executemany(
+                    "DELETE FROM results WHERE key = ?", evicted)
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        with self._connect() as connection:
+            connection.execute("DELETE FROM results")
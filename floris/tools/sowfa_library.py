@@ -0,0 +1,220 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from .sowfa_utilities import SowfaInterface
+import numpy as np
+import pandas as pd
+import json
+import os
+
+# file name of the catalogue kept in the library directory
+INDEX_FILE = 'sowfa_index.json'
+
+# the case settings kept in the catalogue, in column order
+_ATTRIBUTES = [
+    'turbine_name', 'D', 'num_turbines', 'layout_x', 'layout_y',
+    'yaw_angles', 'pitch_angles', 'precursor_wind_speed',
+    'precursor_wind_dir', 'z0', 'settling_time'
+]
+
+
+def _to_json(value):
+    # plain python values of the case settings
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class SowfaLibrary():
+    """
+    SowfaLibrary is a catalogue of the SOWFA cases found under a
+    directory.
+
+    The directory is scanned once for case folders, i.e. folders holding
+    a turbine array file, and the settings of each case (layout, yaw and
+    pitch angles, precursor wind, available turbine channels and flow
+    frames) are stored in a json index file in the directory, along with
+    the case options they were read with. Later libraries of the same
+    directory with the same case options read the index instead, so the
+    cases can be filtered and compared through :py:attr:`catalogue`
+    without opening them. :py:meth:`case` returns the
+    :py:class:`floris.tools.sowfa_utilities.SowfaInterface` of a case,
+    which reads its turbine outputs and flow data on first access.
+
+    Args:
+        directory (str): Path to the folder containing the case folders,
+            at any depth.
+        refresh (bool, optional): Rescan the directory even if it has an
+            index. Cases whose settings files did not change since the
+            last scan keep their entry. Defaults to False.
+        **case_options: Sub paths and settling time passed to
+            :py:class:`floris.tools.sowfa_utilities.SowfaInterface`.
+
+    Returns:
+        SowfaLibrary: An instantiated SowfaLibrary object.
+    """
+
+    def __init__(self, directory, refresh=False, **case_options):
+        self.directory = directory
+        self.case_options = case_options
+        self.index_file = os.path.join(directory, INDEX_FILE)
+        self._cases = {}
+        entries = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file) as index_file:
+                index = json.load(index_file)
+            # entries read with other sub paths or settling time are stale
+            if index.get('case_options') == self._options_state():
+                entries = index['cases']
+        if refresh or not entries:
+            entries = self.scan(entries)
+        self._entries = entries
+        self.catalogue = pd.DataFrame.from_dict(
+            {name: entry['settings'] for name, entry in entries.items()},
+            orient='index',
+            columns=_ATTRIBUTES + ['channels', 'frames']).sort_index()
+        self.catalogue.index.name = 'case'
+
+    def _option(self, name, default):
+        return self.case_options.get(name, default)
+
+    def _options_state(self):
+        # the case options as stored in the index
+        return json.loads(json.dumps(self.case_options, sort_keys=True))
+
+    def _settings_files(self, case_folder):
+        # the files read when a case is opened: the settings files, the
+        # turbine properties giving the rotor diameter and the flow data
+        # whose header gives the layout origin
+        files = [
+            os.path.join(case_folder, path) for path in (
+                self._option('turbine_array_sub_path',
+                             'constant/turbineArrayProperties'),
+                self._option('setup_sub_path', 'setUp'),
+                self._option('controlDict_sub_path', 'system/controlDict'),
+                self._option('flow_data_sub_path',
+                             'array_mean/array.mean0D_UAvg.vtk'),
+                'SC_INPUT.txt')
+        ]
+        turbine_folder = os.path.join(
+            case_folder,
+            self._option('turbine_sub_path', 'constant/turbineProperties'))
+        if os.path.isdir(turbine_folder):
+            files.extend(
+                os.path.join(turbine_folder, f)
+                for f in sorted(os.listdir(turbine_folder)))
+        return files
+
+    def _modified(self, case_folder):
+        return max(
+            os.path.getmtime(path)
+            for path in self._settings_files(case_folder)
+            if os.path.exists(path))
+
+    def scan(self, entries=None):
+        """
+        Finds the case folders under the library directory, reads their
+        settings and writes the index file with the case options.
+
+        Args:
+            entries (dict, optional): Index entries of a previous scan by
+                case, read with the same case options, which are kept for
+                the cases whose settings files did not change. Defaults
+                to None.
+
+        Returns:
+            dict: The index entries by case, i.e. the path of the case
+            folder relative to the library directory.
+        """
+        entries = entries or {}
+        turbine_array_sub_path = self._option(
+            'turbine_array_sub_path', 'constant/turbineArrayProperties')
+        scanned = {}
+        for folder, sub_folders, _ in os.walk(self.directory):
+            if not os.path.isfile(
+                    os.path.join(folder, turbine_array_sub_path)):
+                continue
+            # cases are not nested
+            sub_folders[:] = []
+            name = os.path.relpath(folder, self.directory)
+            modified = self._modified(folder)
+            if name in entries and entries[name]['modified'] == modified:
+                scanned[name] = entries[name]
+                continue
+            case = SowfaInterface(folder, **self.case_options)
+            settings = {
+                attribute: _to_json(getattr(case, attribute))
+                for attribute in _ATTRIBUTES
+            }
+            settings['channels'] = self._channels(case)
+            settings['frames'] = self._frames(case)
+            scanned[name] = {'modified': modified, 'settings': settings}
+            self._cases[name] = case
+
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w') as index_file:
+            json.dump({
+                'case_options': self._options_state(),
+                'cases': scanned
+            }, index_file, sort_keys=True)
+        os.replace(tmp_file, self.index_file)
+        return scanned
+
+    @staticmethod
+    def _channels(case):
+        folder = os.path.join(case.case_folder, case.turbine_output_sub_path)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(
+            f for f in os.listdir(folder)
+            if os.path.isfile(os.path.join(folder, f))
+            and not f.endswith('.npy'))
+
+    @staticmethod
+    def _frames(case):
+        # the vtk files next to the flow data, relative to the case
+        folder = os.path.dirname(
+            os.path.join(case.case_folder, case.flow_data_sub_path))
+        if not os.path.isdir(folder):
+            return []
+        return sorted(
+            os.path.relpath(os.path.join(folder, f), case.case_folder)
+            for f in os.listdir(folder) if f.endswith('.vtk'))
+
+    def case(self, name):
+        """
+        Opens a case of the library. The case settings are read from its
+        folder, and its turbine outputs and flow data on first access.
+
+        Args:
+            name (str): The case, i.e. an index of :py:attr:`catalogue`.
+
+        Returns:
+            :py:class:`floris.tools.sowfa_utilities.SowfaInterface`: The
+            case, shared by later calls with the same name.
+        """
+        if name not in self._entries:
+            raise KeyError('no case %s in %s' % (name, self.directory))
+        if name not in self._cases:
+            self._cases[name] = SowfaInterface(
+                os.path.join(self.directory, name), **self.case_options)
+        return self._cases[name]
+
+    def __getitem__(self, name):
+        return self.case(name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.catalogue.index)
@@ -9,9 +9,9 @@
 # CONDITIONS OF ANY KIND, either express or implied. See the License for the
 # specific language governing permissions and limitations under the License.
 
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from .flow_data import FlowData
-from ..utilities import Vec3
+from .flow_data import FlowData, _write_cache
 import pandas as pd
 import os
 import re
@@ -21,6 +21,10 @@ class SowfaInterface():
     """
     Object to facilitate interaction with flow data output by SOWFA.
 
+    The case settings are read on construction, while the turbine
+    outputs and the flow data are read on first access of
+    **turbine_output** and **flow_data**.
+
     Returns:
         :py:class:`floris.tools.sowfa_utilities.SowfaInterface`: object
     """
@@ -58,6 +62,7 @@ class SowfaInterface():
 
         # Save the case_folder and sub_paths
         self.case_folder = case_folder
+        self.flow_data_sub_path = flow_data_sub_path
         self.setup_sub_path = setup_sub_path
         self.turbine_array_sub_path = turbine_array_sub_path
         self.turbine_sub_path = turbine_sub_path
@@ -126,29 +131,21 @@ class SowfaInterface():
         # Get the surface roughness
         self.z0 = setup_dict['z0']
 
-        # Read the outputs
-        self.turbine_output = read_sowfa_df(
-            os.path.join(self.case_folder, self.turbine_output_sub_path))
-
-        # Remove the settling time
-        self.turbine_output = self.turbine_output[
-            self.turbine_output.time > self.settling_time]
-
-        # Get the sim_time
-        self.sim_time_length = self.turbine_output.time.max()
-
-        # Read the flow data
-        try:
-            self.flow_data = self.read_flow_frame_SOWFA(
-                os.path.join(case_folder, flow_data_sub_path))
-
-            # Re-set turbine positions to flow_field origin
-            self.layout_x = self.layout_x - self.flow_data.origin.x1
-            self.layout_y = self.layout_y - self.flow_data.origin.x2
-
-        except FileNotFoundError:
+        # The turbine outputs and the flow data are read on first access
+        self.flow_data_path = os.path.join(self.case_folder,
+                                           flow_data_sub_path)
+        self._turbine_output = None
+        self._flow_data = None
+
+        # Re-set turbine positions to flow_field origin, which is read
+        # from the header of the flow data
+        if os.path.exists(self.flow_data_path):
+            _, _, origin = FlowData.read_vtk_geometry(self.flow_data_path)
+            self.layout_x = self.layout_x - origin.x1
+            self.layout_y = self.layout_y - origin.x2
+        else:
             print('No flow field found, setting NULL, origin at 0')
-            self.flow_data = None  #TODO might need a null flow-field
+            self.flow_data_path = None  #TODO might need a null flow-field
 
     def __str__(self):
 
@@ -170,6 +167,56 @@ class SowfaInterface():
         print('---------------------')
         return ' '
 
+    @property
+    def turbine_output(self):
+        """
+        The turbine channel data after the settling time, read from the
+        turbine output folder on first access.
+
+        Returns:
+            pd.DataFrame: One row per time and turbine.
+        """
+        if self._turbine_output is None:
+            turbine_output = read_sowfa_df(
+                os.path.join(self.case_folder, self.turbine_output_sub_path))
+
+            # Remove the settling time
+            self._turbine_output = turbine_output[
+                turbine_output.time > self.settling_time]
+        return self._turbine_output
+
+    @turbine_output.setter
+    def turbine_output(self, value):
+        self._turbine_output = value
+
+    @property
+    def sim_time_length(self):
+        """
+        The simulated time after the settling time.
+
+        Returns:
+            float: The last time of the turbine outputs.
+        """
+        return self.turbine_output.time.max()
+
+    @property
+    def flow_data(self):
+        """
+        The mean flow data, read on first access.
+
+        Returns:
+            FlowData (:py:class:`floris.tools.flow_data.FlowData`): the
+                flow data on its grid, or None if the case has no flow
+                data.
+        """
+        if self._flow_data is None and self.flow_data_path is not None:
+            self._flow_data = self.read_flow_frame_SOWFA(self.flow_data_path)
+        return self._flow_data
+
+    @flow_data.setter
+    def flow_data(self, value):
+        self._flow_data = value
+
     def get_average_powers(self):
         """
         Return the average power from the simulation per turbine
@@ -206,66 +253,22 @@ class SowfaInterface():
             thrust_list.append(df_sub.thrust.mean())
         return np.array(thrust_list)
 
-    def read_flow_frame_SOWFA(self, filename):
+    def read_flow_frame_SOWFA(self, filename, cache=True):
         """
         Read flow array output from SOWFA
 
         Args:
             filename (str): name of file containing flow data.
+            cache (bool, optional): Keep the parsed velocities in a
+                memory-mappable '.npy' file next to the flow data, so
+                that later reads skip the text parsing. Defaults to
+                True.
 
         Returns:
-            FlowData (pd.DataFrame): a pandas table with the columns,
-                of all relavent flow info (e.g. x, y, z, u, v, w).
+            FlowData (:py:class:`floris.tools.flow_data.FlowData`): the
+                flow data on its grid (e.g. x, y, z, u, v, w).
         """
-
-        # Read the dimension info from the file
-        with open(filename, 'r') as f:
-            for _ in range(10):
-                read_data = f.readline()
-                if 'SPACING' in read_data:
-                    splitstring = read_data.rstrip().split(' ')
-                    spacing = Vec3(float(splitstring[1]),
-                                   float(splitstring[2]),
-                                   float(splitstring[3]))
-                if 'DIMENSIONS' in read_data:
-                    splitstring = read_data.rstrip().split(' ')
-                    dimensions = Vec3(int(splitstring[1]), int(splitstring[2]),
-                                      int(splitstring[3]))
-                if 'ORIGIN' in read_data:
-                    splitstring = read_data.rstrip().split(' ')
-                    origin = Vec3(float(splitstring[1]), float(splitstring[2]),
-                                  float(splitstring[3]))
-
-        # Set up x, y, z as lists
-        if dimensions.x1 > 1.0:
-            xRange = np.arange(0, dimensions.x1 * spacing.x1, spacing.x1)
-        else:
-            xRange = np.array([0.0])
-
-        if dimensions.x2 > 1.0:
-            yRange = np.arange(0, dimensions.x2 * spacing.x2, spacing.x2)
-        else:
-            yRange = np.array([0.0])
-
-        if dimensions.x3 > 1.0:
-            zRange = np.arange(0, dimensions.x3 * spacing.x3, spacing.x3)
-        else:
-            zRange = np.array([0.0])
-
-        pts = np.array([(x, y, z) for z in zRange for y in yRange
-                        for x in xRange])
-
-        df = pd.read_csv(filename,
-                         skiprows=10,
-                         sep='\t',
-                         header=None,
-                         names=['u', 'v', 'w'])
-        x = pts[:, 0]
-        y = pts[:, 1]
-        z = pts[:, 2]
-
-        return FlowData(x, y, z, df.u.values, df.v.values, df.w.values,
-                        spacing, dimensions, origin)
+        return FlowData.read_vtk(filename, cache=cache)
 
 
 def read_sc_input(case_folder, wind_direction=270.):
@@ -284,7 +287,7 @@ def read_sc_input(case_folder, wind_direction=270.):
 
     sc_file = os.path.join(case_folder, 'SC_INPUT.txt')
 
-    df_SC = pd.read_csv(sc_file, delim_whitespace=True)
+    df_SC = pd.read_csv(sc_file, sep=r'\s+')
 
     df_SC.columns = ['time', 'turbine', 'yaw', 'pitch']
 
@@ -295,16 +298,29 @@ def read_sc_input(case_folder, wind_direction=270.):
     return df_SC
 
 
-def read_sowfa_df(folder_name, channels=[]):
+def read_sowfa_df(folder_name, channels=[], max_workers=None, cache=True):
     """
     New function to use pandas to read in files using pandas
 
+    Only the turbine, time and value columns of each channel file are
+    parsed, and the channels are read concurrently.
+
     Args:
         folder_name (str): where to find the outputs of ALL channels,
             not really used for now, but could be a list of desired
             channels to only read.
         channels (list, optional): list of specific channels to read.
             Defaults to [].
+        max_workers (int, optional): Number of threads reading channel
+            files. Defaults to None, which lets
+            :py:class:`concurrent.futures.ThreadPoolExecutor` choose.
+        cache (bool, optional): Keep the parsed columns of each channel
+            in a '.npy' file next to it and read that while it is newer
+            than the channel file. Defaults to True.
+
+    Returns:
+        df (pd.DataFrame): One row per time and turbine, with a column
+        per channel and the time starting at zero.
     """
 
     # Get the availble outputs
@@ -335,32 +351,34 @@ def read_sowfa_df(folder_name, channels=[]):
     if num_channels == 0:
         raise ValueError('Is %s a data folder?' % folder_name)
 
-    # Now loop through the files
-    for c_idx, chan in enumerate(outputNames):
-
-        filename = os.path.join(folder_name, chan)
-
-        # Load the file
-        df_inner = pd.read_csv(filename, sep=' ', header=None, skiprows=1)
-
-        # Rename the columns
-        df_inner.columns = ['turbine', 'time', 'dt', chan]
-
-        # Drop dt
-        df_inner = df_inner[['time', 'turbine',
-                             chan]].set_index(['time', 'turbine'])
-
-        # On first run declare the new frame
-        if c_idx == 0:
-            # Declare the main data frame to return as copy
-            df = df_inner.copy(deep=True)
-
-        # On other loops just add the new frame
-        else:
-            df[chan] = df_inner[chan]
-
-    # Reset the index
-    df = df.reset_index()
+    # Read the files concurrently
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        columns = list(
+            executor.map(
+                lambda chan: _read_channel(os.path.join(folder_name, chan),
+                                           cache), outputNames))
+
+    # Join the channels on (time, turbine) in one operation, keeping the
+    # rows of the first channel; channels written at the same steps are
+    # simply placed side by side
+    keys = columns[0][:, :2]
+    if all(np.array_equal(c[:, :2], keys) for c in columns[1:]):
+        df = pd.DataFrame({
+            'time': keys[:, 1],
+            'turbine': keys[:, 0].astype(int)
+        })
+        for chan, c in zip(outputNames, columns):
+            df[chan] = c[:, 2]
+    else:
+        frames = [
+            pd.DataFrame({
+                'time': c[:, 1],
+                'turbine': c[:, 0].astype(int),
+                chan: c[:, 2]
+            }).set_index(['time', 'turbine'])
+            for chan, c in zip(outputNames, columns)
+        ]
+        df = frames[0].join(frames[1:], how='left').reset_index()
 
     # Zero the time
     df['time'] = df.time - df.time.min()
@@ -368,6 +386,24 @@ def read_sowfa_df(folder_name, channels=[]):
     return df
 
 
+def _read_channel(filename, cache):
+    # Reads the turbine, time and value columns of a channel file, or
+    # its cache of them
+    cache_file = filename + '.npy'
+    if cache and os.path.exists(cache_file) and \
+            os.path.getmtime(cache_file) >= os.path.getmtime(filename):
+        return np.load(cache_file)
+    values = pd.read_csv(filename,
+                         sep=' ',
+                         header=None,
+                         skiprows=1,
+                         usecols=[0, 1, 3],
+                         dtype={0: float, 1: float, 3: float}).values
+    if cache:
+        _write_cache(cache_file, values)
+    return values
+
+
 def read_foam_file(filename):
     """
     Method to read scalar and boolean/string inputs from an OpenFOAM
@@ -405,7 +441,7 @@ def read_foam_file(filename):
             else:
                 tmp = raw[i].strip().rstrip().split()
                 try:
-                    data[tmp[0].replace('"', '')] = np.float(tmp[1][:-1])
+                    data[tmp[0].replace('"', '')] = float(tmp[1][:-1])
                 except:
                     try:
                         data[tmp[0].replace('"', '')] = tmp[1][:-1]
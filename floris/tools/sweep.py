@@ -0,0 +1,555 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import os
+
+# the worker of each process in a sweep pool and the shared arrays it
+# has attached to
+_worker = None
+_attached = {}
+
+
+class SharedArray():
+    """
+    SharedArray is a numpy array of floats stored in a
+    :py:class:`multiprocessing.shared_memory.SharedMemory` block, so that
+    worker processes can write results that the parent reads without
+    copying them through a pipe.
+
+    Args:
+        shape (tuple): Shape of the array.
+        name (str, optional): Name of an existing block to attach to.
+            Defaults to None, which creates a new zeroed block owned by
+            this object.
+    """
+
+    def __init__(self, shape, name=None):
+        self.shape = tuple(shape)
+        size = max(int(np.prod(self.shape)) * 8, 1)
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=float,
+                                buffer=self._memory.buf)
+        if name is None:
+            self.array[:] = 0.0
+
+    @property
+    def spec(self):
+        """
+        The name and shape with which another process attaches to the
+        array.
+
+        Returns:
+            (str, tuple): The block name and the array shape.
+        """
+        return self._memory.name, self.shape
+
+    def close(self, unlink=False):
+        """
+        Releases this process's view of the array.
+
+        Args:
+            unlink (bool, optional): Also free the shared block, which
+                the creating process does once every worker is done.
+                Defaults to False.
+        """
+        self.array = None
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+
+class SweepResults():
+    """
+    SweepResults holds the results of
+    :py:func:`sweep_shared` in shared memory.
+
+    **powers** is a (conditions x turbines) array and **planes**, if
+    requested, a (conditions x ny x nx) array of hub height streamwise
+    velocities, both in the row order of the conditions. They are views
+    on the shared blocks and are released by :py:meth:`close`, or on
+    leaving a ``with`` block.
+
+    Args:
+        index (pd.Index): Index of the conditions.
+        powers (SharedArray): The turbine powers.
+        planes (SharedArray): The hub height planes, or None.
+    """
+
+    def __init__(self, index, powers, planes=None):
+        self.index = index
+        self._powers = powers
+        self._planes = planes
+
+    @property
+    def powers(self):
+        """
+        The turbine powers, one row per condition.
+
+        Returns:
+            np.array: A view on the shared power matrix.
+        """
+        return self._powers.array
+
+    @property
+    def planes(self):
+        """
+        The hub height planes, one per condition.
+
+        Returns:
+            np.array: A view on the shared plane stack, or None.
+        """
+        return None if self._planes is None else self._planes.array
+
+    def close(self):
+        """
+        Frees the shared memory; the arrays must not be used afterwards.
+        """
+        for shared in (self._powers, self._planes):
+            if shared is not None:
+                shared.close(unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class SweepWorker():
+    """
+    SweepWorker solves rows of conditions with a FLORIS model that it
+    loads once from an input file.
+
+    The layout and yaw angles of the interface that started the sweep
+    are applied after loading, so that layout changes made with
+    :py:meth:`floris.tools.floris_utilities.FlorisInterface.reinitialize_flow_field`
+    are kept. Other changes made to the model in memory are not.
+
+    Args:
+        input_file (str): Path to the FLORIS json input file.
+        layout_x (np.array): Turbine x-coordinates.
+        layout_y (np.array): Turbine y-coordinates.
+        yaw_angles (np.array): Yaw angles used for the rows that do not
+            give their own.
+        solver (str): Solver passed to calculate_wake.
+        cache (ResultCache, optional): Result cache consulted by
+            calculate_wake. Defaults to None.
+    """
+
+    def __init__(self, input_file, layout_x, layout_y, yaw_angles, solver,
+                 cache=None):
+        # imported here as floris_utilities uses this module
+        from .floris_utilities import FlorisInterface
+        self.fi = FlorisInterface(input_file, cache=cache)
+        self.fi.reinitialize_flow_field(layout_array=(layout_x, layout_y))
+        self.yaw_angles = yaw_angles
+        self.solver = solver
+
+    def run(self, conditions, positions, powers, planes=None):
+        """
+        Solves each row of a block of conditions and writes its results
+        into the result arrays.
+
+        Args:
+            conditions (dict): Arrays of the conditions of the block, as
+                returned by :py:func:`condition_arrays`.
+            positions (np.array): Row of the result arrays for each
+                condition of the block.
+            powers (np.array): The (conditions x turbines) power array.
+            planes (np.array, optional): The (conditions x ny x nx) 
+                array of hub height planes. Defaults to None.
+        """
+        yaw = conditions["yaw"]
+        for i, position in enumerate(positions):
+            # every row sets the full inflow so that the results do not
+            # depend on the rows solved before it
+            self.fi.reinitialize_flow_field(
+                wind_speed=conditions["ws"][i],
+                wind_direction=conditions["wd"][i],
+                turbulence_intensity=conditions["ti"][i],
+                wind_shear=conditions["shear"][i],
+                wind_veer=conditions["veer"][i])
+            self.fi.calculate_wake(
+                yaw_angles=self.yaw_angles if yaw is None else yaw[i],
+                solver=self.solver)
+            powers[position] = self.fi.get_turbine_power()
+            if planes is not None:
+                planes[position] = self._hub_height_plane(
+                    planes.shape[2], planes.shape[1])
+
+    def _hub_height_plane(self, nx, ny):
+        flow_data = self.fi.get_hub_height_flow_data(
+            x_resolution=nx, y_resolution=ny)
+        # the flow data is ordered with x fastest, then y, then z; the
+        # middle of the three z levels is at hub height
+        return flow_data.u.reshape((3, ny, nx))[1]
+
+
+def _initialize_worker(*args):
+    global _worker, _attached
+    _worker = SweepWorker(*args)
+    _attached = {}
+
+
+def _attach(spec):
+    # shared arrays stay attached for the life of the worker process
+    if spec is None:
+        return None
+    name, shape = spec
+    if name not in _attached:
+        _attached[name] = SharedArray(shape, name=name)
+    return _attached[name].array
+
+
+def _run_chunk(conditions, positions, powers_spec, planes_spec):
+    _worker.run(conditions, positions, _attach(powers_spec),
+                _attach(planes_spec))
+    return positions
+
+
+def condition_arrays(fi, conditions):
+    """
+    Collects the conditions of a sweep into arrays.
+
+    Args:
+        fi (FlorisInterface): The interface whose current turbulence
+            intensity, shear and veer fill in missing columns.
+        conditions (pd.DataFrame): One row per condition, with columns
+            'ws' and 'wd' and optional columns 'ti', 'shear', 'veer'
+            and 'yaw_0' to 'yaw_<N-1>' for the turbine yaw angles.
+
+    Returns:
+        dict: Arrays of the conditions under 'ws', 'wd', 'ti', 'shear'
+        and 'veer', and the yaw angles under 'yaw' as a (conditions x
+        turbines) array, or None if the conditions give no yaw angles.
+    """
+    flow_field = fi.floris.farm.flow_field
+    n_conditions = len(conditions)
+    defaults = {
+        "ti": flow_field.turbulence_intensity,
+        "shear": flow_field.wind_shear,
+        "veer": flow_field.wind_veer
+    }
+    arrays = {
+        "ws": conditions["ws"].values.astype(float),
+        "wd": conditions["wd"].values.astype(float)
+    }
+    for name, default in defaults.items():
+        if name in conditions:
+            arrays[name] = conditions[name].values.astype(float)
+        else:
+            arrays[name] = np.full(n_conditions, float(default))
+
+    yaw_columns = ["yaw_%d" % i for i in range(len(fi.layout_x))]
+    if yaw_columns[0] in conditions:
+        arrays["yaw"] = conditions[yaw_columns].values.astype(float)
+    else:
+        arrays["yaw"] = None
+    return arrays
+
+
+def _take(arrays, index):
+    return {name: None if values is None else values[index]
+            for name, values in arrays.items()}
+
+
+def _solve_chunks(fi, arrays, powers, planes, max_workers, chunk_size,
+                  solver):
+    # solves the conditions in chunks ordered by wind direction, writing
+    # into the shared result arrays, and yields the row positions of each
+    # chunk as it completes
+    n_conditions = arrays["ws"].size
+    if n_conditions == 0:
+        return
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = int(np.ceil(n_conditions / (4.0 * max_workers)))
+    order = np.argsort(arrays["wd"], kind="stable")
+    chunks = [order[start:start + chunk_size]
+              for start in range(0, n_conditions, chunk_size)]
+
+    worker_args = (fi.input_file, fi.layout_x, fi.layout_y,
+                   np.array(fi.get_yaw_angles()), solver, fi.cache)
+    if max_workers == 1:
+        worker = SweepWorker(*worker_args)
+        for chunk in chunks:
+            worker.run(_take(arrays, chunk), chunk, powers.array,
+                       None if planes is None else planes.array)
+            yield chunk
+        return
+
+    planes_spec = None if planes is None else planes.spec
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_initialize_worker,
+                             initargs=worker_args) as executor:
+        futures = [executor.submit(_run_chunk, _take(arrays, chunk), chunk,
+                                   powers.spec, planes_spec)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sweep_chunks(fi, conditions, max_workers=None, chunk_size=None,
+                 solver="grid"):
+    """
+    Solves a set of conditions in chunks on a pool of worker processes,
+    yielding the turbine powers of each chunk as it completes.
+
+    The rows are ordered by wind direction before they are split into
+    chunks, so each worker solves neighboring directions in turn. Each
+    worker loads the model once, see :py:class:`SweepWorker`, and writes
+    its results into shared memory.
+
+    Args:
+        fi (FlorisInterface): The interface to sweep.
+        conditions (pd.DataFrame): The conditions, see
+            :py:func:`condition_arrays`.
+        max_workers (int, optional): Number of worker processes.
+            Defaults to None, which uses one per processor. With one
+            worker the chunks are solved in the current process.
+        chunk_size (int, optional): Number of rows sent to a worker at
+            once. Defaults to None, which makes about four chunks per
+            worker.
+        solver (str, optional): Solver passed to calculate_wake.
+            Defaults to "grid".
+
+    Yields:
+        (np.array, np.array): The row positions of a chunk within
+        **conditions** and the turbine powers of these rows.
+    """
+    arrays = condition_arrays(fi, conditions)
+    powers = SharedArray((len(conditions), len(fi.layout_x)))
+    try:
+        for chunk in _solve_chunks(fi, arrays, powers, None, max_workers,
+                                   chunk_size, solver):
+            yield chunk, powers.array[chunk]
+    finally:
+        powers.close(unlink=True)
+
+
+def sweep_shared(fi, conditions, max_workers=None, chunk_size=None,
+                 solver="grid", plane_resolution=None):
+    """
+    Solves a set of conditions on a pool of worker processes that write
+    the results into shared memory, see :py:func:`sweep_chunks`.
+
+    Args:
+        fi (FlorisInterface): The interface to sweep.
+        conditions (pd.DataFrame): The conditions, see
+            :py:func:`condition_arrays`.
+        max_workers (int, optional): Number of worker processes.
+            Defaults to None, which uses one per processor.
+        chunk_size (int, optional): Number of rows sent to a worker at
+            once. Defaults to None.
+        solver (str, optional): Solver passed to calculate_wake.
+            Defaults to "grid".
+        plane_resolution (tuple, optional): The (nx, ny) resolution of
+            a hub height plane of streamwise velocity to store for each
+            condition, see
+            :py:meth:`floris.tools.floris_utilities.FlorisInterface.get_hub_height_flow_data`.
+            Defaults to None, which stores no planes.
+
+    Returns:
+        SweepResults: The power matrix and plane stack, in the row order
+        of **conditions**.
+    """
+    arrays = condition_arrays(fi, conditions)
+    n_conditions = len(conditions)
+    powers = SharedArray((n_conditions, len(fi.layout_x)))
+    planes = None
+    if plane_resolution is not None:
+        nx, ny = plane_resolution
+        planes = SharedArray((n_conditions, ny, nx))
+    results = SweepResults(conditions.index, powers, planes)
+    try:
+        for _ in _solve_chunks(fi, arrays, powers, planes, max_workers,
+                               chunk_size, solver):
+            pass
+    except BaseException:
+        results.close()
+        raise
+    return results
+
+
+def sweep(fi, conditions, max_workers=None, chunk_size=None, solver="grid"):
+    """
+    Solves a set of conditions on a pool of worker processes.
+
+    Args:
+        fi (FlorisInterface): The interface to sweep.
+        conditions (pd.DataFrame): The conditions, see
+            :py:func:`condition_arrays`.
+        max_workers (int, optional): Number of worker processes.
+            Defaults to None, which uses one per processor.
+        chunk_size (int, optional): Number of rows sent to a worker at
+            once. Defaults to None.
+        solver (str, optional): Solver passed to calculate_wake.
+            Defaults to "grid".
+
+    Returns:
+        pd.DataFrame: The turbine powers with the index of
+        **conditions** and one column per turbine.
+    """
+    with sweep_shared(fi, conditions, max_workers=max_workers,
+                      chunk_size=chunk_size, solver=solver) as results:
+        return pd.DataFrame(results.powers.copy(), index=results.index)
+
+
+def _run_block(conditions):
+    positions = np.arange(conditions["ws"].size)
+    powers = np.empty((positions.size, len(_worker.fi.layout_x)))
+    _worker.run(conditions, positions, powers)
+    return powers
+
+
+def _condition_blocks(conditions, chunk_size):
+    # groups an iterable of data frames or single conditions into data
+    # frames of at most chunk_size rows, reading only as far as needed
+    rows = []
+    n_read = 0
+    for item in conditions:
+        if isinstance(item, pd.DataFrame):
+            if rows:
+                yield pd.DataFrame(rows, index=np.arange(n_read - len(rows),
+                                                         n_read))
+                rows = []
+            for start in range(0, len(item), chunk_size):
+                yield item.iloc[start:start + chunk_size]
+            n_read += len(item)
+            continue
+        rows.append(dict(item))
+        n_read += 1
+        if len(rows) == chunk_size:
+            yield pd.DataFrame(rows, index=np.arange(n_read - len(rows),
+                                                     n_read))
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, index=np.arange(n_read - len(rows), n_read))
+
+
+class _StreamWriter():
+    # appends the result chunks of a stream to a csv or parquet file
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.parquet = self.path.endswith(".parquet")
+        self._writer = None
+        self._started = False
+
+    def write(self, frame):
+        if not self.parquet:
+            frame.to_csv(self.path, mode="a" if self._started else "w",
+                         header=not self._started)
+            self._started = True
+            return
+        # parquet support is optional
+        import pyarrow
+        import pyarrow.parquet
+        table = pyarrow.Table.from_pandas(
+            frame.rename(columns=str), preserve_index=True)
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path,
+                                                         table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def sweep_stream(fi, conditions, chunk_size=1000, max_workers=None,
+                 max_pending=None, solver="grid", output=None):
+    """
+    Solves a stream of conditions of any length with bounded memory,
+    yielding the turbine powers chunk by chunk in the order of the
+    stream.
+
+    The conditions are read from the iterable only as the chunks are
+    handed to the workers, and at most **max_pending** chunks are in
+    flight at once, so a consumer that stops iterating also stops the
+    reading. Each worker loads the model once, see
+    :py:class:`SweepWorker`.
+
+    Args:
+        fi (FlorisInterface): The interface to sweep.
+        conditions (iterable): Data frames with the columns described
+            in :py:func:`condition_arrays`, e.g. from
+            ``pd.read_csv(..., chunksize=...)``, or single conditions as
+            dicts or series with these keys. Single conditions are
+            indexed by their position in the stream.
+        chunk_size (int, optional): Largest number of conditions solved
+            and yielded at once. Defaults to 1000.
+        max_workers (int, optional): Number of worker processes.
+            Defaults to None, which uses one per processor. With one
+            worker the chunks are solved in the current process.
+        max_pending (int, optional): Largest number of chunks submitted
+            to the workers and not yet yielded. Defaults to None, which
+            allows two per worker.
+        solver (str, optional): Solver passed to calculate_wake.
+            Defaults to "grid".
+        output (str, optional): Path of a '.csv' or '.parquet' file to
+            which each chunk is appended as it is yielded. Parquet
+            output requires pyarrow. Defaults to None.
+
+    Yields:
+        pd.DataFrame: The turbine powers of a chunk, with the index of
+        its conditions and one column per turbine.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = 2 * max_workers
+    worker_args = (fi.input_file, fi.layout_x, fi.layout_y,
+                   np.array(fi.get_yaw_angles()), solver, fi.cache)
+    blocks = _condition_blocks(conditions, chunk_size)
+    writer = None if output is None else _StreamWriter(output)
+
+    def result(block, powers):
+        frame = pd.DataFrame(powers, index=block.index)
+        if writer is not None:
+            writer.write(frame)
+        return frame
+
+    try:
+        if max_workers == 1:
+            worker = SweepWorker(*worker_args)
+            for block in blocks:
+                arrays = condition_arrays(fi, block)
+                powers = np.empty((len(block), len(fi.layout_x)))
+                worker.run(arrays, np.arange(len(block)), powers)
+                yield result(block, powers)
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_initialize_worker,
+                                 initargs=worker_args) as executor:
+            pending = deque()
+            for block in blocks:
+                pending.append((block, executor.submit(
+                    _run_block, condition_arrays(fi, block))))
+                if len(pending) >= max_pending:
+                    block, future = pending.popleft()
+                    yield result(block, future.result())
+            while pending:
+                block, future = pending.popleft()
+                yield result(block, future.result())
+    finally:
+        if writer is not None:
+            writer.close()
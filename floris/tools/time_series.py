@@ -0,0 +1,132 @@
+# Copyright 2019 NREL
+
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+# this file except in compliance with the License. You may obtain a copy of the
+# License at http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software distributed
+# under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, either express or implied. See the License for the
+# specific language governing permissions and limitations under the License.
+
+from . import sweep as floris_sweep
+import itertools
+import numpy as np
+import pandas as pd
+
+# default quantization step of each condition; 'yaw' applies to every
+# yaw column
+DEFAULT_RESOLUTION = {"wd": 1.0, "ws": 0.25, "ti": 0.01, "yaw": 1.0}
+
+
+def _condition_columns(conditions):
+    columns = [name for name in ("ws", "wd", "ti", "shear", "veer")
+               if name in conditions]
+    return columns + [name for name in conditions
+                      if str(name).startswith("yaw_")]
+
+
+def _step(resolution, column):
+    if column.startswith("yaw_"):
+        column = "yaw"
+    return resolution.get(column)
+
+
+def quantize(conditions, resolution=None, interpolate=()):
+    """
+    Maps a time series of conditions onto a grid of unique states.
+
+    Each quantized column is rounded to a multiple of its step, and the
+    columns listed in **interpolate** are instead bracketed by the two
+    neighboring multiples with linear weights, so that each condition
+    maps to 2**len(interpolate) states. Columns without a step are kept
+    exactly.
+
+    Args:
+        conditions (pd.DataFrame): One row per time step, with columns
+            'ws' and 'wd' and optional columns 'ti', 'shear', 'veer'
+            and 'yaw_0' to 'yaw_<N-1>'. Other columns are ignored.
+        resolution (dict, optional): Step of each column, with 'yaw'
+            applying to all yaw columns. A step of None or 0 keeps the
+            column exact. Defaults to None, which uses
+            :py:data:`DEFAULT_RESOLUTION`.
+        interpolate (iterable, optional): Names of the columns to
+            interpolate between grid states, e.g. ('ws', 'wd').
+            Defaults to (), which rounds every column to the nearest
+            state.
+
+    Returns:
+        (pd.DataFrame, np.array, np.array): The unique states, and for
+        each condition the (conditions x corners) positions of its
+        states and their weights.
+    """
+    if resolution is None:
+        resolution = DEFAULT_RESOLUTION
+    interpolate = list(interpolate)
+    columns = _condition_columns(conditions)
+    for column in interpolate:
+        if column not in columns or not _step(resolution, column):
+            raise ValueError(
+                "cannot interpolate column '%s' without a step" % column)
+
+    n_conditions = len(conditions)
+    n_corners = 2**len(interpolate)
+    values = np.empty((n_corners, n_conditions, len(columns)))
+    weights = np.ones((n_corners, n_conditions))
+    corners = list(itertools.product((0, 1), repeat=len(interpolate)))
+    for j, column in enumerate(columns):
+        value = conditions[column].values.astype(float)
+        step = _step(resolution, column)
+        if not step:
+            values[:, :, j] = value
+        elif column in interpolate:
+            lower = np.floor(value / step)
+            fraction = value / step - lower
+            k = interpolate.index(column)
+            for c, corner in enumerate(corners):
+                values[c, :, j] = (lower + corner[k]) * step
+                weights[c] *= fraction if corner[k] else 1.0 - fraction
+        else:
+            values[:, :, j] = np.round(value / step) * step
+        if column == "wd":
+            values[:, :, j] %= 360.0
+
+    states, inverse = np.unique(values.reshape(-1, len(columns)), axis=0,
+                                return_inverse=True)
+    index = inverse.reshape(n_corners, n_conditions).T
+    return (pd.DataFrame(states, columns=columns), index, weights.T)
+
+
+def simulate_time_series(fi, conditions, resolution=None, interpolate=(),
+                         max_workers=1, chunk_size=None, solver="grid"):
+    """
+    Calculates the turbine powers of a long time series of conditions
+    by solving each quantized state once, see :py:func:`quantize`, and
+    mapping the results back to the time steps.
+
+    Args:
+        fi (FlorisInterface): The interface to simulate.
+        conditions (pd.DataFrame): One row per time step, see
+            :py:func:`quantize`.
+        resolution (dict, optional): Step of each column. Defaults to
+            None, which uses :py:data:`DEFAULT_RESOLUTION`.
+        interpolate (iterable, optional): Names of the columns to
+            interpolate between grid states. Defaults to ().
+        max_workers (int, optional): Number of worker processes solving
+            the unique states, see :py:func:`floris.tools.sweep.sweep`.
+            Defaults to 1, which solves them in the current process.
+        chunk_size (int, optional): Number of states sent to a worker
+            at once. Defaults to None.
+        solver (str, optional): Solver passed to calculate_wake.
+            Defaults to "grid".
+
+    Returns:
+        pd.DataFrame: The turbine powers with the index of
+        **conditions** and one column per turbine.
+    """
+    states, index, weights = quantize(conditions, resolution=resolution,
+                                      interpolate=interpolate)
+    powers = floris_sweep.sweep(fi, states, max_workers=max_workers,
+                                chunk_size=chunk_size, solver=solver).values
+    return pd.DataFrame(np.einsum("nc,nct->nt", weights, powers[index]),
+                        index=conditions.index)
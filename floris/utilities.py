@@ -188,3 +188,36 @@ def wrap_360(x):
     x = np.where(x < 0., x + 360., x)
     x = np.where(x >= 360., x - 360., x)
     return (x)
+
+
+def bin_slices(x, bin_centers, bin_radius, include_upper=False):
+    """
+    Sort data once into bins that may overlap, so that the points of
+    each bin are a contiguous slice of the sorted data.
+
+    A point belongs to the bin of center c if it lies in
+    [c - bin_radius, c + bin_radius), or in the closed interval if
+    **include_upper** is True. NaN values belong to no bin.
+
+    Args:
+        x (np.array): values to bin.
+        bin_centers (np.array): centers of the bins.
+        bin_radius (float): half width of the bins, larger than half the
+            bin spacing for overlapping bins.
+        include_upper (bool, optional): include the upper limit of each
+            bin. Defaults to False.
+
+    Returns:
+        order (np.array): indices sorting **x**; any array aligned with
+            **x** is sorted with array[order].
+        slices (list): slice of the sorted arrays for each bin.
+    """
+    x = np.asarray(x)
+    order = np.argsort(x, kind='stable')
+    x_sorted = x[order]
+    bin_centers = np.asarray(bin_centers)
+    starts = np.searchsorted(x_sorted, bin_centers - bin_radius, side='left')
+    ends = np.searchsorted(x_sorted,
+                           bin_centers + bin_radius,
+                           side='right' if include_upper else 'left')
+    return order, [slice(start, end) for start, end in zip(starts, ends)]
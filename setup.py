@@ -30,21 +30,21 @@ DESCRIPTION = 'A controls-oriented engineering wake model.'
 URL = 'https://github.com/NREL/FLORIS'
 EMAIL = 'rafael.mudafort@nrel.gov'
 AUTHOR = 'NREL National Wind Technology Center'
-REQUIRES_PYTHON = '>=3.3.0'
+REQUIRES_PYTHON = '>=3.8.0'
 VERSION = '1.0.0'
 
 # What packages are required for this module to be executed?
 REQUIRED = [
     # simulation
     'matplotlib>=3',
-    'numpy==1.16.3',
+    'numpy==1.17.3',
     'pytest>=4',
-    'scipy==1.1.0',
+    'scipy==1.3.2',
 
     # tools
     'h5pyd==0.3.3',
-    'pandas==0.24.2',
-    'pyproj==2.1.3',
+    'pandas==0.25.3',
+    'pyproj==2.4.1',
     'seaborn==0.9.0'
 ]
 
@@ -147,7 +147,7 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: Implementation :: CPython',
         'Programming Language :: Python :: Implementation :: PyPy'
     ],
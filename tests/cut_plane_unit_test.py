@@ -0,0 +1,145 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import os
+import pytest
+from floris.tools import cut_plane
+from floris.tools.flow_data import FlowData
+
+
+class CutPlaneTest():
+    def __init__(self):
+        axes = (np.linspace(0.0, 900.0, 19), np.linspace(-200.0, 200.0, 9),
+                np.linspace(0.0, 150.0, 6))
+        x, y, z = np.meshgrid(*axes, indexing="ij")
+        u = 8.0 + 0.001 * x - 0.002 * y + 0.01 * z
+        self.structured = FlowData.from_grid(x, y, z, u, 0.1 * u, -0.1 * u)
+        self.scattered = FlowData(self.structured.x, self.structured.y,
+                                  self.structured.z, self.structured.u,
+                                  self.structured.v, self.structured.w)
+
+    def u(self, x, y, z):
+        return 8.0 + 0.001 * x - 0.002 * y + 0.01 * z
+
+
+@pytest.mark.parametrize("plane,value", [(cut_plane.HorPlane, 60.0),
+                                         (cut_plane.CrossPlane, 400.0),
+                                         (cut_plane.VertPlane, 0.0)])
+def test_structured_plane_matches_scattered(plane, value):
+    """
+    A plane indexed out of a grid should match the plane interpolated
+    from the same data as scattered points
+    """
+    test_class = CutPlaneTest()
+    structured = plane(test_class.structured, value)
+    scattered = plane(test_class.scattered, value)
+    assert structured.resolution == scattered.resolution
+    assert np.array_equal(structured.x1_mesh, scattered.x1_mesh)
+    assert np.array_equal(structured.x2_mesh, scattered.x2_mesh)
+    for name in ("u_mesh", "v_mesh", "w_mesh"):
+        assert getattr(structured, name) == \
+            pytest.approx(getattr(scattered, name))
+
+
+@pytest.mark.parametrize("plane,value", [(cut_plane.HorPlane, 90.0),
+                                         (cut_plane.CrossPlane, 1000.0),
+                                         (cut_plane.VertPlane, 1000.0)])
+def test_vtk_plane_matches_scattered(plane, value):
+    """
+    Planes of SOWFA data read from a vtk file take the structured path;
+    remeshed, they should match the interpolation of the same points as
+    scattered data within tolerance, undefined at the same points
+    """
+    flow_data = FlowData.read_vtk(os.path.join(
+        os.path.dirname(__file__), os.pardir, "examples", "sowfa_example",
+        "array_mean", "array.mean0D_UAvg.vtk"))
+    assert flow_data.axes is not None
+    scattered = FlowData(flow_data.x, flow_data.y, flow_data.z, flow_data.u,
+                         flow_data.v, flow_data.w)
+
+    structured_plane = plane(flow_data, value)
+    scattered_plane = plane(scattered, value)
+    assert structured_plane.u_mesh == pytest.approx(scattered_plane.u_mesh)
+
+    structured_plane = cut_plane.change_resolution(structured_plane,
+                                                   (137, 61))
+    scattered_plane = cut_plane.change_resolution(scattered_plane, (137, 61))
+    undefined = np.isnan(scattered_plane.u_mesh)
+    assert np.array_equal(np.isnan(structured_plane.u_mesh), undefined)
+    difference = np.abs(structured_plane.u_mesh - scattered_plane.u_mesh)
+    assert np.max(difference[~undefined]) < 0.15
+    assert np.mean(difference[~undefined]) < 0.01
+
+
+def test_structured_change_resolution():
+    """
+    Remeshing a plane of a grid should interpolate between the grid
+    points and leave the points outside of it undefined
+    """
+    test_class = CutPlaneTest()
+    plane = cut_plane.HorPlane(test_class.structured, 60.0)
+    cut_plane.change_resolution(plane, (37, 21))
+    assert plane.u_mesh == pytest.approx(
+        test_class.u(plane.x1_flat, plane.x2_flat, 60.0))
+
+    cut_plane.interpolate_onto_array(plane, np.array([100.0, 1000.0]),
+                                     np.array([0.0]))
+    assert plane.u_mesh[0] == pytest.approx(test_class.u(100.0, 0.0, 60.0))
+    assert np.isnan(plane.u_mesh[1])
+
+
+def test_scattered_triangulation_is_reused():
+    """
+    Remeshing a plane of scattered points should reuse its interpolator
+    until the input points change
+    """
+    test_class = CutPlaneTest()
+    plane = cut_plane.HorPlane(test_class.scattered, 60.0)
+    interpolator = plane._interpolator()
+    cut_plane.change_resolution(plane, (37, 21))
+    assert plane._interpolator() is interpolator
+    assert plane.u_mesh == pytest.approx(
+        test_class.u(plane.x1_flat, plane.x2_flat, 60.0))
+
+    cut_plane.set_origin(plane, center_x1=100.0)
+    assert plane._interpolator() is not interpolator
+    assert plane.u_mesh == pytest.approx(
+        test_class.u(plane.x1_flat + 100.0, plane.x2_flat, 60.0))
+
+
+def test_power_map_matches_single_rotors():
+    """
+    The power map should give the power of each rotor center computed
+    on its own
+    """
+    test_class = CutPlaneTest()
+    plane = cut_plane.CrossPlane(test_class.structured, 400.0)
+    cut_plane.change_resolution(plane, (81, 31))
+    ws_array = np.array([3.0, 8.0, 12.0])
+    cp_array = np.array([0.0, 0.45, 0.4])
+    x1_locs, x2_locs = np.meshgrid(np.linspace(-150.0, 150.0, 7),
+                                   np.array([50.0, 90.0]))
+    powers = cut_plane.calculate_power_map(plane, x1_locs, x2_locs, 40.0,
+                                           ws_array, cp_array)
+    assert powers.shape == (2, 7)
+    for power, x1_loc, x2_loc in zip(powers.flat, x1_locs.flat,
+                                     x2_locs.flat):
+        assert power == pytest.approx(
+            cut_plane.calculate_power(plane, x1_loc, x2_loc, 40.0, ws_array,
+                                      cp_array))
+
+    with np.errstate(invalid='ignore'):
+        outside = cut_plane.calculate_wind_speed_map(plane, [1000.0], [90.0],
+                                                     40.0)
+    assert np.isnan(outside[0])
@@ -0,0 +1,107 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import pytest
+from floris.tools import energy_ratio as energy_ratio_module
+from floris.tools.energy_ratio import bootstrap_energy_ratio, \
+    calculate_balanced_energy_ratio, energy_ratio
+
+
+class EnergyRatioTest():
+    def __init__(self, n_base=300, n_con=200):
+        rng = np.random.default_rng(0)
+        self.base = (rng.random(n_base) * 1000., rng.random(n_base) * 900.,
+                     rng.integers(3, 12, n_base))
+        self.con = (rng.random(n_con) * 1000., rng.random(n_con) * 950.,
+                    rng.integers(4, 14, n_con))
+        self.wd_base = rng.random(n_base) * 20. + 260.
+        self.wd_con = rng.random(n_con) * 20. + 260.
+
+    def balanced_energy_ratio(self, n_boostrap=200, **kwargs):
+        return calculate_balanced_energy_ratio(
+            self.base[0], self.base[1], self.base[2], self.wd_base,
+            self.con[0], self.con[1], self.con[2], self.wd_con,
+            np.arange(260., 285., 5.), n_boostrap=n_boostrap, **kwargs)
+
+
+def test_bootstrap_energy_ratio():
+    """
+    Each bootstrap sample should be the energy ratio of a resample with
+    replacement
+    """
+    test_class = EnergyRatioTest()
+    n_boostrap = 50
+    bootstrap = bootstrap_energy_ratio(*test_class.base, *test_class.con,
+                                       n_boostrap, seed=3)
+
+    # the resamples are drawn as two index matrices
+    rng = np.random.default_rng(3)
+    ind_base = rng.integers(len(test_class.base[0]),
+                            size=(n_boostrap, len(test_class.base[0])))
+    ind_con = rng.integers(len(test_class.con[0]),
+                           size=(n_boostrap, len(test_class.con[0])))
+    for k in range(n_boostrap):
+        baseline = energy_ratio(
+            *[a[ind_base[k]] for a in test_class.base],
+            *[a[ind_con[k]] for a in test_class.con])
+        assert [b[k] for b in bootstrap] == pytest.approx(baseline[:4])
+
+
+def test_balanced_energy_ratio_seed():
+    """
+    The results should depend on the seed only, and not on the number of
+    worker processes
+    """
+    test_class = EnergyRatioTest()
+    results = test_class.balanced_energy_ratio(seed=1)
+    for other in (test_class.balanced_energy_ratio(seed=1),
+                  test_class.balanced_energy_ratio(seed=1, max_workers=2)):
+        for result, expected in zip(other, results):
+            np.testing.assert_array_equal(result, expected)
+
+    # the estimate of a bin is the energy ratio of its points
+    mask_base = (test_class.wd_base >= 267.5) & (test_class.wd_base < 272.5)
+    mask_con = (test_class.wd_con >= 267.5) & (test_class.wd_con < 272.5)
+    estimates = energy_ratio(*[a[mask_base] for a in test_class.base],
+                             *[a[mask_con] for a in test_class.con])
+    assert results[0][2] == pytest.approx(estimates[0])
+    assert results[8][2] == pytest.approx(estimates[2])
+    bounds = sorted([results[1][2], results[2][2]])
+    assert bounds[0] <= results[0][2] <= bounds[1]
+
+
+
+def test_balanced_energy_ratio_bootstrap_iterations(monkeypatch):
+    """
+    Without n_boostrap the number of bootstrap iterations should be
+    derived from the first wind direction bin with data and used for
+    every bin
+    """
+    test_class = EnergyRatioTest()
+    sizes = []
+
+    def iterations(n):
+        sizes.append(n)
+        return 100 + n
+
+    monkeypatch.setattr(energy_ratio_module,
+                        "_calculate_bootstrap_iterations", iterations)
+    results = test_class.balanced_energy_ratio(n_boostrap=None, seed=1)
+    first_bin = (test_class.wd_base >= 257.5) & (test_class.wd_base < 262.5)
+    assert sizes == [np.count_nonzero(first_bin)]
+
+    expected = test_class.balanced_energy_ratio(n_boostrap=100 + sizes[0],
+                                                seed=1)
+    for result, value in zip(results, expected):
+        np.testing.assert_array_equal(result, value)
@@ -0,0 +1,78 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from floris.simulation import Floris
+from floris.simulation import evaluate
+from .sample_inputs import SampleInputs
+
+
+class EvaluationTest():
+    def __init__(self):
+        self.sample_inputs = SampleInputs()
+        self.floris = Floris(input_dict=self.sample_inputs.floris)
+        self.flow_field = self.floris.farm.flow_field
+
+    def evaluate(self, yaw_angles=None):
+        flow_field = self.flow_field
+        return evaluate(
+            flow_field.wake,
+            flow_field.turbine_map.layout,
+            flow_field.wind_speed,
+            flow_field.wind_direction + 270,
+            flow_field.turbulence_intensity,
+            flow_field.wind_shear,
+            flow_field.wind_veer,
+            flow_field.air_density,
+            yaw_angles=yaw_angles
+        )
+
+
+def test_matches_calculate_wake():
+    """
+    evaluate should give the results of calculate_wake without changing
+    the farm it reads
+    """
+    test_class = EvaluationTest()
+    layout = test_class.flow_field.turbine_map.layout
+    velocities = layout.velocities.copy()
+    result = test_class.evaluate(yaw_angles=[20.0, 0.0])
+
+    assert np.all(layout.velocities == velocities)
+    assert np.all(layout.yaw_angles == 0.0)
+
+    test_class.floris.farm.set_yaw_angles([20.0, 0.0])
+    test_class.flow_field.calculate_wake()
+    turbines = test_class.floris.farm.turbines
+    assert result.power == pytest.approx(
+        [turbine.power for turbine in turbines])
+    assert result.turbulence_intensity == pytest.approx(
+        [turbine.turbulence_intensity for turbine in turbines])
+    assert result.farm_power == pytest.approx(np.sum(result.power))
+
+
+def test_concurrent_evaluations():
+    """
+    Evaluations running on threads with one shared model should match the
+    same evaluations run one at a time
+    """
+    test_class = EvaluationTest()
+    yaw_settings = [[yaw, 0.0] for yaw in np.linspace(-25.0, 25.0, 8)]
+    serial = [test_class.evaluate(yaw_angles).power
+              for yaw_angles in yaw_settings]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(test_class.evaluate, yaw_settings))
+    for expected, result in zip(serial, results):
+        assert np.all(result.power == expected)
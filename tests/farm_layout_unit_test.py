@@ -0,0 +1,150 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import copy
+import pytest
+from .sample_inputs import SampleInputs
+from floris.utilities import Vec3
+from floris.simulation import FarmLayout, Turbine, TurbineMap
+
+
+class FarmLayoutTest():
+    def __init__(self):
+        self.sample_inputs = SampleInputs()
+        self.coordinates = [
+            [0.0, 100.0],  # layout x
+            [10.0, 0.0]    # layout y
+        ]
+        self.turbines = [
+            copy.deepcopy(Turbine(self.sample_inputs.turbine)),
+            copy.deepcopy(Turbine(self.sample_inputs.turbine))
+        ]
+        self.instance = self._build_instance()
+
+    def _build_instance(self):
+        return TurbineMap(self.coordinates[0], self.coordinates[1],
+                          self.turbines).layout
+
+
+def test_instantiation():
+    """
+    The class should initialize with contiguous position arrays
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.instance
+    assert layout.n_turbines == 2
+    assert np.all(layout.x == test_class.coordinates[0])
+    assert np.all(layout.y == test_class.coordinates[1])
+    assert np.all(layout.z == test_class.turbines[0].hub_height)
+
+
+def test_rotated():
+    """
+    The rotated layout should match Vec3 rotation and leave the original
+    layout and its coordinates unchanged
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.instance
+    rotated = layout.rotated(90.0, Vec3(0.0, 0.0, 0.0))
+    for i in range(layout.n_turbines):
+        vec3 = Vec3(layout.x[i], layout.y[i], layout.z[i])
+        vec3.rotate_on_x3(90.0, Vec3(0.0, 0.0, 0.0))
+        assert rotated.x[i] == pytest.approx(vec3.x1prime)
+        assert rotated.y[i] == pytest.approx(vec3.x2prime)
+    assert np.all(layout.x == test_class.coordinates[0])
+    assert np.all(layout.y == test_class.coordinates[1])
+
+
+def test_sorted_in_x():
+    """
+    The sorted indices should order the turbines by x coordinate
+    """
+    test_class = FarmLayoutTest()
+    rotated = test_class.instance.rotated(180.0, Vec3(0.0, 0.0, 0.0))
+    assert list(rotated.sorted_in_x()) == [1, 0]
+
+
+def test_yaw_angles_are_shared_with_turbines():
+    """
+    Setting the yaw angles array should update the bound Turbine objects
+    and the rotated layout
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.instance
+    rotated = layout.rotated(45.0, Vec3(0.0, 0.0, 0.0))
+    layout.yaw_angles[:] = [10.0, 20.0]
+    assert test_class.turbines[0].yaw_angle == 10.0
+    assert test_class.turbines[1].yaw_angle == 20.0
+    assert np.all(rotated.yaw_angles == [10.0, 20.0])
+    test_class.turbines[0].yaw_angle = 5.0
+    assert layout.yaw_angles[0] == 5.0
+
+
+def test_turbine_type_is_shared():
+    """
+    Turbines built from one turbine should share a single TurbineType and
+    setting a type attribute on one turbine should not affect the others
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.turbines[0].layout.relocated(
+        [0.0, 500.0, 1000.0], [0.0, 0.0, 0.0])
+    turbines = TurbineMap.from_layout(layout).turbines
+    assert np.all(layout.type_index == layout.type_index[0])
+    assert turbines[0].turbine_type is turbines[2].turbine_type
+
+    turbines[1].rotor_diameter = 100.0
+    assert turbines[1].rotor_diameter == 100.0
+    assert turbines[0].rotor_diameter == test_class.turbines[0].rotor_diameter
+    assert turbines[1].turbine_type is not turbines[0].turbine_type
+    assert np.all(layout.type_attribute("rotor_diameter") == [
+        turbines[0].rotor_diameter, 100.0, turbines[2].rotor_diameter])
+
+
+def test_turbine_types_do_not_grow():
+    """
+    Repeatedly setting a type attribute should replace the turbine's own
+    type rather than add types to the layout
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.turbines[0].layout.relocated(
+        [0.0, 500.0, 1000.0], [0.0, 0.0, 0.0])
+    turbines = TurbineMap.from_layout(layout).turbines
+
+    # the first assignment splits the shared type
+    turbines[1].rotor_diameter = 100.0
+    assert len(layout.turbine_types) == 2
+    for rotor_diameter in np.linspace(50.0, 150.0, 50):
+        turbines[1].rotor_diameter = rotor_diameter
+    assert len(layout.turbine_types) == 2
+    assert turbines[1].turbine_type is \
+        layout.turbine_types[layout.type_index[1]]
+
+    # types no position refers to are removed
+    subset = layout.subset([0, 2])
+    assert len(subset.turbine_types) == 2
+    subset.set_turbine_type(0, turbines[1].turbine_type)
+    assert len(subset.turbine_types) == 2
+    assert list(subset.type_attribute("rotor_diameter")) == [
+        turbines[1].rotor_diameter, turbines[2].rotor_diameter]
+
+
+def test_velocities_are_stored_in_layout():
+    """
+    The rotor velocities of a turbine should be a row of the layout array
+    """
+    test_class = FarmLayoutTest()
+    layout = test_class.instance
+    test_class.turbines[1].velocities = 8.0
+    assert np.all(layout.velocities[1, :len(test_class.turbines[1].grid)] == 8.0)
+    assert np.all(layout.velocities[0] == 0.0)
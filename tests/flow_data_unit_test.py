@@ -0,0 +1,192 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import numpy as np
+import pytest
+from floris.tools.flow_data import FlowData
+from floris.utilities import Vec3
+
+
+class FlowDataTest():
+    def __init__(self):
+        self.axes = (np.linspace(0.0, 900.0, 10), np.linspace(-200.0, 200.0, 5),
+                     np.linspace(0.0, 150.0, 4))
+        self.x, self.y, self.z = np.meshgrid(*self.axes, indexing="ij")
+        self.u = 8.0 + 0.001 * self.x - 0.002 * self.y + 0.01 * self.z
+        self.v = 0.1 * self.u
+        self.w = -0.1 * self.u
+
+    def structured(self):
+        return FlowData.from_grid(self.x, self.y, self.z, self.u, self.v,
+                                  self.w)
+
+    def scattered(self):
+        flow_data = self.structured()
+        return FlowData(flow_data.x, flow_data.y, flow_data.z, flow_data.u,
+                        flow_data.v, flow_data.w, spacing=flow_data.spacing,
+                        dimensions=flow_data.dimensions,
+                        origin=flow_data.origin)
+
+
+def test_from_grid():
+    """
+    A rectilinear grid should keep its axes, with x varying fastest in
+    the flat arrays
+    """
+    test_class = FlowDataTest()
+    flow_data = test_class.structured()
+    assert flow_data.shape == (10, 5, 4)
+    assert flow_data.spacing.x1 == pytest.approx(100.0)
+    assert flow_data.x[:3] == pytest.approx([0.0, 100.0, 200.0])
+    assert np.array_equal(flow_data.grid_values("u"), test_class.u)
+
+    x = test_class.x + 0.1 * test_class.y
+    rotated = FlowData.from_grid(x, test_class.y, test_class.z, test_class.u,
+                                 test_class.v, test_class.w)
+    assert rotated.axes is None
+    with pytest.raises(ValueError):
+        rotated.grid_values("u")
+
+
+def test_crop_matches_scattered():
+    """
+    Cropping a grid should give the points of cropping the same data as
+    scattered points
+    """
+    test_class = FlowDataTest()
+    bounds = ([50.0, 650.0], [-150.0, 150.0], [10.0, 160.0])
+    structured = FlowData.crop(test_class.structured(), *bounds)
+    scattered = FlowData.crop(test_class.scattered(), *bounds)
+    assert structured.shape == (6, 3, 3)
+    for name in ("x", "y", "z", "u", "v", "w"):
+        assert np.array_equal(getattr(structured, name),
+                              getattr(scattered, name))
+    assert structured.origin.x1 == pytest.approx(scattered.origin.x1)
+    assert structured.axes[0][0] == 0.0
+
+
+@pytest.mark.parametrize("flow_data", ["structured", "scattered"])
+def test_crop_without_points(flow_data):
+    """
+    Cropping to bounds without a grid point strictly inside should raise
+    a ValueError on both paths
+    """
+    test_class = FlowDataTest()
+    flow_data = getattr(test_class, flow_data)()
+    with pytest.raises(ValueError, match="crop bounds"):
+        FlowData.crop(flow_data, [110.0, 190.0], [-150.0, 150.0],
+                      [10.0, 160.0])
+    with pytest.raises(ValueError, match="crop bounds"):
+        FlowData.crop(flow_data, [0.0, 900.0], [-200.0, -100.0],
+                      [10.0, 160.0])
+
+
+@pytest.mark.parametrize("flow_data", ["structured", "scattered"])
+def test_crop_export(tmp_path, flow_data):
+    """
+    A crop should keep Vec3 dimensions and origin on both paths, also
+    without an origin, so that it can be exported
+    """
+    test_class = FlowDataTest()
+    flow_data = getattr(test_class, flow_data)()
+    flow_data.origin = None
+    cropped = FlowData.crop(flow_data, [50.0, 650.0], [-150.0, 150.0],
+                            [10.0, 160.0])
+    assert cropped.dimensions == Vec3(6, 3, 3)
+    assert cropped.origin == Vec3(100.0, -100.0, 50.0)
+    cropped.save_as_vtk(str(tmp_path / "crop.vtk"))
+    cropped.save_as_vti(str(tmp_path / "crop.vti"))
+    for read in (FlowData.read_vtk(str(tmp_path / "crop.vtk")),
+                 FlowData.read_vti(str(tmp_path / "crop.vti"))):
+        assert read.x + read.origin.x1 == pytest.approx(
+            cropped.x + cropped.origin.x1)
+        assert read.u == pytest.approx(cropped.u, abs=5e-4)
+
+
+@pytest.mark.parametrize("save,read,name,tolerance", [
+    (lambda fd, f: fd.save_as_vtk(f), FlowData.read_vtk, "a.vtk", 5e-4),
+    (lambda fd, f: fd.save_as_vtk(f, binary=True), FlowData.read_vtk,
+     "b.vtk", 1e-6),
+    (FlowData.save_as_vti, FlowData.read_vti, "c.vti", 1e-6),
+    (FlowData.save_as_npz, FlowData.read_npz, "d.npz", 0.0),
+    (FlowData.save_as_npy, FlowData.read_npy, "e", 0.0),
+])
+def test_export_round_trip(tmp_path, save, read, name, tolerance):
+    """
+    Each exporter should write a file that its reader turns back into
+    the same grid, with the vtk formats storing the first point as the
+    origin
+    """
+    flow_data = FlowDataTest().structured()
+    flow_data.x = flow_data.x + 50.0
+    filename = str(tmp_path / name)
+    save(flow_data, filename)
+    result = read(filename)
+    assert result.shape == flow_data.shape
+    for name, offset in zip(("x", "y", "z"), (result.origin.x1,
+                                              result.origin.x2,
+                                              result.origin.x3)):
+        assert getattr(result, name) + offset == \
+            pytest.approx(getattr(flow_data, name))
+    for name in ("u", "v", "w"):
+        assert np.max(np.abs(getattr(result, name) -
+                             getattr(flow_data, name))) <= tolerance
+
+
+def test_read_sowfa_vtk(tmp_path):
+    """
+    The legacy reader should read tab separated text with its origin
+    """
+    filename = str(tmp_path / "sowfa.vtk")
+    with open(filename, "w") as f:
+        f.write("# vtk DataFile Version 3.0\narray.mean0D\nASCII\n"
+                "DATASET STRUCTURED_POINTS\nDIMENSIONS 2 1 2\n"
+                "ORIGIN 758.000 660.001 10.001 \nSPACING 10 10 10\n"
+                "POINT_DATA 4\nFIELD attributes 1\nUAvg 3 4 float\n")
+        for i in range(4):
+            f.write("%f\t%f\t%f\n" % (i, 0.1 * i, 0.0))
+    flow_data = FlowData.read_vtk(filename)
+    assert flow_data.shape == (2, 1, 2)
+    assert flow_data.origin.x2 == pytest.approx(660.001)
+    assert flow_data.x == pytest.approx([0.0, 10.0, 0.0, 10.0])
+    assert flow_data.z == pytest.approx([0.0, 0.0, 10.0, 10.0])
+    assert flow_data.u == pytest.approx([0.0, 1.0, 2.0, 3.0])
+
+
+def test_read_vtk_cache(tmp_path):
+    """
+    Reading with the cache should write the velocities next to the file
+    and map them on later reads until the file changes
+    """
+    flow_data = FlowDataTest().structured()
+    filename = str(tmp_path / "frame.vtk")
+    flow_data.save_as_vtk(filename)
+    first = FlowData.read_vtk(filename, cache=True)
+    assert (tmp_path / "frame.vtk.npy").exists()
+    second = FlowData.read_vtk(filename, cache=True)
+    assert isinstance(second.u.base, np.memmap)
+    for name in ("x", "y", "z", "u", "v", "w"):
+        assert np.array_equal(getattr(first, name), getattr(second, name))
+
+    # cached velocities are writable without changing the cache
+    second.u[0] = -1.0
+    assert FlowData.read_vtk(filename, cache=True).u[0] == first.u[0]
+    read_only = FlowData.read_vtk(filename, cache=True, mmap_mode='r')
+    assert not read_only.u.flags.writeable
+
+    flow_data.u = flow_data.u + 1.0
+    flow_data.save_as_vtk(filename)
+    os.utime(filename, (1e10, 1e10))
+    third = FlowData.read_vtk(filename, cache=True)
+    assert third.u == pytest.approx(first.u + 1.0, abs=1e-3)
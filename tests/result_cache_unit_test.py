@@ -0,0 +1,141 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from floris.tools.floris_utilities import FlorisInterface
+from floris.tools.result_cache import ResultCache
+from floris.utilities import Vec3
+from .sample_inputs import SampleInputs
+
+
+class ResultCacheTest():
+    def __init__(self, tmp_path):
+        sample_inputs = SampleInputs()
+        farm = sample_inputs.floris["farm"]["properties"]
+        farm["layout_x"] = [0.0, 630.0, 1260.0]
+        farm["layout_y"] = [0.0, 30.0, -30.0]
+        self.input_file = str(tmp_path / "input.json")
+        with open(self.input_file, "w") as input_file:
+            json.dump(sample_inputs.floris, input_file)
+        self.cache_file = str(tmp_path / "results.sqlite")
+
+    def turbine_results(self, fi, yaw_angles):
+        fi.reinitialize_flow_field(wind_speed=8.0, wind_direction=275.0,
+                                   turbulence_intensity=0.06)
+        fi.calculate_wake(yaw_angles=yaw_angles)
+        turbines = fi.floris.farm.turbines
+        return (np.array(fi.get_turbine_power()),
+                np.array([turbine.turbulence_intensity for turbine in turbines]))
+
+
+def test_cached_results_match_solved(tmp_path):
+    """
+    A second interface on the same cache should restore the turbine
+    results of the first instead of solving again
+    """
+    test_class = ResultCacheTest(tmp_path)
+    expected = test_class.turbine_results(
+        FlorisInterface(test_class.input_file), [20.0, 0.0, 0.0])
+
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    first = test_class.turbine_results(fi, [20.0, 0.0, 0.0])
+    assert len(fi.cache) == 1
+
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    fi.floris.farm.flow_field.calculate_wake = None
+    cached = test_class.turbine_results(fi, [20.0, 0.0, 0.0])
+    assert len(fi.cache) == 1
+    for results in (first, cached):
+        for value, baseline in zip(results, expected):
+            assert np.array_equal(value, baseline)
+
+
+def test_key_depends_on_inputs(tmp_path):
+    """
+    Changing the yaw angles or a wake model parameter should solve again
+    """
+    test_class = ResultCacheTest(tmp_path)
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    test_class.turbine_results(fi, [0.0, 0.0, 0.0])
+    test_class.turbine_results(fi, [10.0, 0.0, 0.0])
+    assert len(fi.cache) == 2
+    fi.floris.farm.wake.velocity_model.ka = 0.4
+    test_class.turbine_results(fi, [10.0, 0.0, 0.0])
+    assert len(fi.cache) == 3
+
+
+def test_key_depends_on_grid(tmp_path):
+    """
+    Changing the flow field resolution or bounds should solve again
+    """
+    test_class = ResultCacheTest(tmp_path)
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    fi.calculate_wake()
+    fi.reinitialize_flow_field(with_resolution=Vec3(100, 50, 20))
+    fi.calculate_wake()
+    assert len(fi.cache) == 2
+    flow_field = fi.floris.farm.flow_field
+    flow_field.set_bounds([-200.0, 2500.0, -300.0, 300.0, 0.1, 180.0])
+    flow_field._compute_initialized_domain(
+        with_resolution=Vec3(100, 50, 20))
+    fi.calculate_wake()
+    assert len(fi.cache) == 3
+    fi.calculate_wake()
+    assert len(fi.cache) == 3
+
+
+def test_repeated_solve_hits_cache(tmp_path):
+    """
+    Solving the same inputs twice in a row should hit the cache, although
+    the first solve changes the turbine turbulence intensities
+    """
+    test_class = ResultCacheTest(tmp_path)
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    first = test_class.turbine_results(fi, [20.0, 0.0, 0.0])
+    fi.calculate_wake(yaw_angles=[20.0, 0.0, 0.0])
+    assert len(fi.cache) == 1
+
+    fi.floris.farm.flow_field.calculate_wake = None
+    fi.calculate_wake(yaw_angles=[20.0, 0.0, 0.0])
+    assert np.array_equal(fi.get_turbine_power(), first[0])
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    """
+    Once the stored results exceed the size bound the least recently
+    used entries should be removed first
+    """
+    cache = ResultCache(str(tmp_path / "results.sqlite"), max_size=2500)
+    results = {"power": np.zeros(100)}
+    cache.put("a", results)
+    cache.put("b", results)
+    assert cache.get("a") is not None
+    cache.put("c", results)
+    assert cache.get("b") is None
+    assert np.array_equal(cache.get("a")["power"], results["power"])
+    assert cache.get("c") is not None
+
+
+def test_sweep_uses_cache(tmp_path):
+    """
+    The sweep workers should store their results in the cache of the
+    interface
+    """
+    test_class = ResultCacheTest(tmp_path)
+    fi = FlorisInterface(test_class.input_file, cache=test_class.cache_file)
+    conditions = pd.DataFrame({"ws": [8.0, 9.0, 8.0], "wd": 270.0})
+    powers = fi.sweep(conditions, max_workers=2, chunk_size=1)
+    assert len(fi.cache) == 2
+    assert np.array_equal(powers.values[0], powers.values[2])
@@ -0,0 +1,113 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import os
+import shutil
+import pytest
+from floris.tools.sowfa_library import SowfaLibrary, INDEX_FILE
+
+EXAMPLE_CASE = os.path.join(os.path.dirname(__file__), os.pardir, "examples",
+                            "sowfa_example")
+
+
+class SowfaLibraryTest():
+    def __init__(self, tmp_path):
+        self.directory = str(tmp_path)
+        self.cases = ["case_a", os.path.join("group", "case_b")]
+        for case in self.cases:
+            shutil.copytree(EXAMPLE_CASE, os.path.join(self.directory, case))
+
+
+def test_catalogue(tmp_path):
+    """
+    The catalogue should hold the settings of every case found under the
+    directory, without reading the turbine outputs or the flow data
+    """
+    test_class = SowfaLibraryTest(tmp_path)
+    library = SowfaLibrary(test_class.directory)
+    assert len(library) == 2
+    assert sorted(library) == sorted(test_class.cases)
+    entry = library.catalogue.loc["case_a"]
+    assert entry.D == pytest.approx(126.0)
+    assert entry.num_turbines == len(entry.layout_x)
+    assert "powerGenerator" in entry.channels
+    assert entry.frames == [os.path.join("array_mean",
+                                         "array.mean0D_UAvg.vtk")]
+
+    case = library["case_a"]
+    assert case._turbine_output is None and case._flow_data is None
+    assert list(case.layout_x) == pytest.approx(entry.layout_x)
+
+
+def test_index(tmp_path):
+    """
+    A second library of the directory should read its index, and a
+    refresh should find new cases
+    """
+    test_class = SowfaLibraryTest(tmp_path)
+    first = SowfaLibrary(test_class.directory)
+    assert os.path.exists(os.path.join(test_class.directory, INDEX_FILE))
+
+    shutil.copytree(EXAMPLE_CASE, os.path.join(test_class.directory, "new"))
+    second = SowfaLibrary(test_class.directory)
+    assert second.catalogue.equals(first.catalogue)
+    assert len(SowfaLibrary(test_class.directory, refresh=True)) == 3
+
+
+def test_index_invalidation(tmp_path):
+    """
+    A refresh should read a case again once its turbine properties
+    change, and a library with other case options should not reuse the
+    index entries
+    """
+    test_class = SowfaLibraryTest(tmp_path)
+    first = SowfaLibrary(test_class.directory)
+    assert first.catalogue.loc["case_a"].D == pytest.approx(126.0)
+
+    turbine_file = os.path.join(test_class.directory, "case_a", "constant",
+                                "turbineProperties", "NREL5MWRef")
+    with open(turbine_file) as properties:
+        text = properties.read()
+    with open(turbine_file, "w") as properties:
+        properties.write(text.replace("63.0;", "60.0;"))
+    modified = os.path.getmtime(turbine_file) + 10.0
+    os.utime(turbine_file, (modified, modified))
+    library = SowfaLibrary(test_class.directory, refresh=True)
+    assert library.catalogue.loc["case_a"].D == pytest.approx(120.0)
+    assert library.catalogue.loc[test_class.cases[1]].D \
+        == pytest.approx(126.0)
+
+    # without flow data the layout is not shifted to its origin
+    library = SowfaLibrary(test_class.directory,
+                           flow_data_sub_path="missing.vtk")
+    assert library.catalogue.loc["case_a"].layout_x \
+        != pytest.approx(first.catalogue.loc["case_a"].layout_x)
+    with open(os.path.join(test_class.directory, INDEX_FILE)) as index_file:
+        assert json.load(index_file)["case_options"] == \
+            {"flow_data_sub_path": "missing.vtk"}
+
+
+def test_lazy_case(tmp_path):
+    """
+    The turbine outputs and flow data of a case should be read on first
+    access
+    """
+    test_class = SowfaLibraryTest(tmp_path)
+    case = SowfaLibrary(test_class.directory).case("case_a")
+    assert case.turbine_output.time.min() > case.settling_time
+    assert case.sim_time_length == case.turbine_output.time.max()
+    dimensions = case.flow_data.dimensions
+    assert case.flow_data.u.size == dimensions.x1 * dimensions.x2 * \
+        dimensions.x3
+    assert case.flow_data is case.flow_data
@@ -0,0 +1,67 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import pytest
+from floris.tools.sowfa_utilities import read_sowfa_df
+
+
+class SowfaUtilitiesTest():
+    def __init__(self, tmp_path):
+        self.folder = tmp_path / "20000"
+        self.folder.mkdir()
+        self.times = [20000.4, 20000.8, 20001.2]
+
+    def write_channel(self, name, scale, skip=None):
+        lines = ["#Turbine    Time(s)    dt(s)    %s" % name]
+        for time in self.times:
+            for turbine in range(2):
+                if (time, turbine) != skip:
+                    lines.append("%d %r 0.4 %r" %
+                                 (turbine, time, scale * (turbine + time)))
+        (self.folder / name).write_text("\n".join(lines) + "\n")
+
+
+def test_read_sowfa_df(tmp_path):
+    """
+    The channels should be joined on time and turbine, with the rows of
+    the first channel and the time starting at zero
+    """
+    test_class = SowfaUtilitiesTest(tmp_path)
+    test_class.write_channel("powerGenerator", 1.0)
+    test_class.write_channel("thrust", 2.0)
+    df = read_sowfa_df(str(test_class.folder), cache=False)
+    assert list(df.columns) == ["time", "turbine", "powerGenerator", "thrust"]
+    assert df.time.values == pytest.approx([0.0, 0.0, 0.4, 0.4, 0.8, 0.8])
+    assert list(df.turbine) == [0, 1, 0, 1, 0, 1]
+    assert df.thrust.values == pytest.approx(2.0 * df.powerGenerator.values)
+
+    test_class.write_channel("pitch", 1.0, skip=(test_class.times[1], 1))
+    df = read_sowfa_df(str(test_class.folder),
+                       channels=["powerGenerator", "pitch"],
+                       cache=False)
+    assert len(df) == 6
+    assert np.isnan(df.pitch.values[3])
+    assert df.pitch.values[2] == pytest.approx(df.powerGenerator.values[2])
+
+
+def test_read_sowfa_df_cache(tmp_path):
+    """
+    A second read should use the cached columns of each channel
+    """
+    test_class = SowfaUtilitiesTest(tmp_path)
+    test_class.write_channel("powerGenerator", 1.0)
+    first = read_sowfa_df(str(test_class.folder))
+    assert (test_class.folder / "powerGenerator.npy").exists()
+    second = read_sowfa_df(str(test_class.folder))
+    assert first.equals(second)
@@ -0,0 +1,118 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from floris.tools.floris_utilities import FlorisInterface
+from floris.tools.sweep import sweep_shared
+from .sample_inputs import SampleInputs
+
+
+class SweepTest():
+    def __init__(self, tmp_path):
+        sample_inputs = SampleInputs()
+        farm = sample_inputs.floris["farm"]["properties"]
+        farm["layout_x"] = [0.0, 630.0, 1260.0]
+        farm["layout_y"] = [0.0, 30.0, -30.0]
+        self.input_file = str(tmp_path / "input.json")
+        with open(self.input_file, "w") as input_file:
+            json.dump(sample_inputs.floris, input_file)
+        self.fi = FlorisInterface(self.input_file)
+        self.conditions = pd.DataFrame({
+            "ws": [8.0, 9.0, 7.0, 8.0, 10.0],
+            "wd": [280.0, 250.0, 270.0, 265.0, 270.0],
+            "ti": [0.06, 0.08, 0.1, 0.06, 0.06],
+            "yaw_0": [0.0, 10.0, 20.0, 0.0, -10.0],
+            "yaw_1": [0.0, 0.0, 10.0, 0.0, 0.0],
+            "yaw_2": 0.0
+        }, index=[10, 11, 12, 13, 14])
+
+    def expected_powers(self):
+        fi = FlorisInterface(self.input_file)
+        powers = []
+        for _, row in self.conditions.iterrows():
+            fi.reinitialize_flow_field(wind_speed=row.ws,
+                                       wind_direction=row.wd,
+                                       turbulence_intensity=row.ti)
+            fi.calculate_wake(yaw_angles=[row.yaw_0, row.yaw_1, row.yaw_2])
+            powers.append(fi.get_turbine_power())
+        return np.array(powers)
+
+
+@pytest.mark.parametrize("max_workers,chunk_size", [(1, None), (2, 2)])
+def test_sweep(tmp_path, max_workers, chunk_size):
+    """
+    The sweep should give the powers of solving each row in turn, in the
+    order and with the index of the conditions
+    """
+    test_class = SweepTest(tmp_path)
+    powers = test_class.fi.sweep(test_class.conditions,
+                                 max_workers=max_workers,
+                                 chunk_size=chunk_size)
+    assert list(powers.index) == list(test_class.conditions.index)
+    assert list(powers.columns) == [0, 1, 2]
+    assert powers.values == pytest.approx(test_class.expected_powers())
+
+
+def test_shared_results(tmp_path):
+    """
+    The workers should write the powers and hub height planes of each
+    condition into the shared result arrays
+    """
+    test_class = SweepTest(tmp_path)
+    expected_powers = test_class.expected_powers()
+    with sweep_shared(test_class.fi, test_class.conditions, max_workers=2,
+                      plane_resolution=(20, 10)) as results:
+        assert results.powers == pytest.approx(expected_powers)
+        assert results.planes.shape == (5, 10, 20)
+
+        fi = FlorisInterface(test_class.input_file)
+        row = test_class.conditions.iloc[2]
+        fi.reinitialize_flow_field(wind_speed=row.ws, wind_direction=row.wd,
+                                   turbulence_intensity=row.ti)
+        fi.calculate_wake(yaw_angles=[row.yaw_0, row.yaw_1, row.yaw_2])
+        flow_data = fi.get_hub_height_flow_data(x_resolution=20,
+                                                y_resolution=10)
+        assert results.planes[2] == pytest.approx(
+            flow_data.u.reshape((3, 10, 20))[1])
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_sweep_stream(tmp_path, max_workers):
+    """
+    The stream should yield the powers of single conditions and data
+    frames in bounded chunks, in order, and append them to the output
+    file
+    """
+    test_class = SweepTest(tmp_path)
+    expected_powers = test_class.expected_powers()
+    rows = (row for _, row in test_class.conditions.iterrows())
+    output = str(tmp_path / "powers.csv")
+    chunks = list(test_class.fi.sweep_stream(rows, chunk_size=2,
+                                             max_workers=max_workers,
+                                             max_pending=1, output=output))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    powers = pd.concat(chunks)
+    assert list(powers.index) == [0, 1, 2, 3, 4]
+    assert powers.values == pytest.approx(expected_powers)
+    written = pd.read_csv(output, index_col=0)
+    assert written.values == pytest.approx(expected_powers)
+
+    frames = (test_class.conditions.iloc[start:start + 3]
+              for start in (0, 3))
+    powers = pd.concat(test_class.fi.sweep_stream(
+        frames, chunk_size=2, max_workers=max_workers))
+    assert list(powers.index) == list(test_class.conditions.index)
+    assert powers.values == pytest.approx(expected_powers)
@@ -0,0 +1,83 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from floris.tools.floris_utilities import FlorisInterface
+from floris.tools.time_series import quantize
+from .sample_inputs import SampleInputs
+
+
+class TimeSeriesTest():
+    def __init__(self, tmp_path):
+        sample_inputs = SampleInputs()
+        farm = sample_inputs.floris["farm"]["properties"]
+        farm["layout_x"] = [0.0, 630.0]
+        farm["layout_y"] = [0.0, 30.0]
+        self.input_file = str(tmp_path / "input.json")
+        with open(self.input_file, "w") as input_file:
+            json.dump(sample_inputs.floris, input_file)
+        self.fi = FlorisInterface(self.input_file)
+        self.conditions = pd.DataFrame({
+            "ws": [8.04, 7.96, 9.1, 8.0],
+            "wd": [269.8, 270.2, 359.7, 270.0],
+            "ti": 0.06,
+            "yaw_0": [0.2, -0.1, 5.0, 0.0],
+            "yaw_1": 0.0
+        }, index=pd.date_range("2019-01-01", periods=4, freq="10min"))
+
+    def powers(self, ws, wd, yaw_0):
+        self.fi.reinitialize_flow_field(wind_speed=ws, wind_direction=wd,
+                                        turbulence_intensity=0.06)
+        self.fi.calculate_wake(yaw_angles=[yaw_0, 0.0])
+        return np.array(self.fi.get_turbine_power())
+
+
+def test_quantize():
+    """
+    Conditions within a step of each other should share a state, and
+    interpolated columns should be bracketed with linear weights
+    """
+    conditions = pd.DataFrame({"ws": [8.04, 7.96, 8.1],
+                               "wd": [359.8, 0.1, 90.0]})
+    states, index, weights = quantize(conditions)
+    assert len(states) == 2
+    assert index[0, 0] == index[1, 0]
+    assert np.all(weights == 1.0)
+
+    states, index, weights = quantize(conditions, interpolate=["ws"])
+    assert index.shape == (3, 2)
+    assert weights[2] == pytest.approx([0.6, 0.4])
+    assert states.ws.values[index[2]] == pytest.approx([8.0, 8.25])
+
+
+def test_simulate_time_series(tmp_path):
+    """
+    Each time step should get the powers of its nearest state, solved
+    once, or the weighted powers of the bracketing states
+    """
+    test_class = TimeSeriesTest(tmp_path)
+    powers = test_class.fi.simulate_time_series(test_class.conditions)
+    assert list(powers.index) == list(test_class.conditions.index)
+    nearest = test_class.powers(8.0, 270.0, 0.0)
+    for row in (0, 1, 3):
+        assert powers.values[row] == pytest.approx(nearest)
+    assert powers.values[2] == pytest.approx(test_class.powers(9.0, 0.0, 5.0))
+
+    powers = test_class.fi.simulate_time_series(
+        test_class.conditions, interpolate=["ws"], max_workers=2)
+    expected = (0.6 * test_class.powers(9.0, 0.0, 5.0)
+                + 0.4 * test_class.powers(9.25, 0.0, 5.0))
+    assert powers.values[2] == pytest.approx(expected)
@@ -55,6 +55,20 @@ def test_turbines():
         assert test == baseline
 
 
+def test_turbine_count_mismatch():
+    """
+    The class should reject a list of turbines whose length does not
+    match the layout
+    """
+    test_class = TurbineMapTest()
+    with pytest.raises(ValueError):
+        TurbineMap(test_class.coordinates[0], test_class.coordinates[1],
+                   test_class.turbines[:1])
+    with pytest.raises(ValueError):
+        TurbineMap(test_class.coordinates[0], test_class.coordinates[1],
+                   test_class.turbines + [copy.deepcopy(test_class.turbines[0])])
+
+
 def test_coordinates():
     """
     The class should return a dict_items containing all items
@@ -0,0 +1,87 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import pytest
+from floris.simulation import Floris
+from floris.simulation import Turbine
+from .sample_inputs import SampleInputs
+
+
+class TurbineTest():
+    def __init__(self, rotor_grid="square", rotor_grid_resolution=None):
+        self.sample_inputs = SampleInputs()
+        properties = self.sample_inputs.turbine["properties"]
+        properties["rotor_grid"] = rotor_grid
+        if rotor_grid_resolution is not None:
+            properties["rotor_grid_resolution"] = rotor_grid_resolution
+        self.instance = Turbine(self.sample_inputs.turbine)
+
+    def waked_power(self):
+        input_dict = self.sample_inputs.floris
+        input_dict["turbine"] = self.sample_inputs.turbine
+        input_dict["farm"]["properties"]["layout_y"] = [0.0, 60.0]
+        floris = Floris(input_dict=input_dict)
+        floris.farm.flow_field.calculate_wake()
+        return floris.farm.turbines[1].power
+
+
+def test_square_grid():
+    """
+    The square grid should keep the points of a 5 x 5 grid inside the disk
+    """
+    turbine = TurbineTest().instance
+    assert len(turbine.grid) == 9
+    assert turbine.turbine_type.sample_point_count == 25
+    assert np.all(np.hypot(turbine.turbine_type.grid_y,
+                           turbine.turbine_type.grid_z) < turbine.rotor_radius)
+
+
+@pytest.mark.parametrize("rotor_grid,rotor_grid_resolution,n_points", [
+    ("polar", None, 8),
+    ("polar", [3, 6], 18),
+    ("rews", [4], 4)
+])
+def test_weighted_grids(rotor_grid, rotor_grid_resolution, n_points):
+    """
+    The polar and REWS grids should have normalized weights and points
+    inside the disk
+    """
+    turbine = TurbineTest(rotor_grid, rotor_grid_resolution).instance
+    turbine_type = turbine.turbine_type
+    assert len(turbine.grid) == n_points
+    assert np.sum(turbine_type.grid_weights) == pytest.approx(1.0)
+    assert np.all(np.hypot(turbine_type.grid_y, turbine_type.grid_z)
+                  < turbine.rotor_radius)
+    turbine.velocities = 8.0
+    assert turbine.average_velocity == pytest.approx(8.0)
+
+
+def test_polar_grid_accuracy():
+    """
+    A waked power from the default polar grid should be closer to a
+    converged polar grid than the power from the square grid
+    """
+    reference = TurbineTest("polar", [16, 32]).waked_power()
+    polar = TurbineTest("polar").waked_power()
+    square = TurbineTest("square").waked_power()
+    assert abs(polar - reference) < 0.01 * reference
+    assert abs(polar - reference) < abs(square - reference)
+
+
+def test_invalid_rotor_grid():
+    """
+    An unknown rotor grid should raise a ValueError
+    """
+    with pytest.raises(ValueError):
+        TurbineTest("hexagonal")
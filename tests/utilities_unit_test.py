@@ -0,0 +1,42 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import pytest
+from floris.utilities import bin_slices
+
+
+class BinSlicesTest():
+    def __init__(self):
+        self.x = np.array([3.0, np.nan, 0.5, 2.0, 1.0, 2.5, 1.5, 0.0])
+        self.bin_centers = np.array([0.5, 1.5, 2.5])
+
+
+@pytest.mark.parametrize("bin_radius", [0.5, 1.0])
+@pytest.mark.parametrize("include_upper", [False, True])
+def test_bin_slices(bin_radius, include_upper):
+    """
+    The slices of the sorted data should hold the points of each bin,
+    including overlapping bins, and no NaN values
+    """
+    test_class = BinSlicesTest()
+    order, slices = bin_slices(test_class.x, test_class.bin_centers,
+                               bin_radius, include_upper=include_upper)
+    for center, x_slice in zip(test_class.bin_centers, slices):
+        lower = test_class.x >= center - bin_radius
+        if include_upper:
+            upper = test_class.x <= center + bin_radius
+        else:
+            upper = test_class.x < center + bin_radius
+        expected = np.nonzero(lower & upper)[0]
+        assert sorted(order[x_slice]) == list(expected)
@@ -0,0 +1,186 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pytest
+import threading
+from floris.simulation import Floris
+from floris.simulation import WakeClusters
+from .sample_inputs import SampleInputs
+
+
+class WakeClustersTest():
+    def __init__(self, velocity_model, deflection_model):
+        sample_inputs = SampleInputs()
+        properties = sample_inputs.floris["wake"]["properties"]
+        properties["velocity_model"] = velocity_model
+        properties["deflection_model"] = deflection_model
+        farm = sample_inputs.floris["farm"]["properties"]
+        # two rows aligned with the wind and a separate sub-farm
+        farm["layout_x"] = [0.0, 630.0, 1260.0, 0.0, 630.0, 1260.0,
+                            5000.0, 5630.0]
+        farm["layout_y"] = [0.0, 0.0, 0.0, 800.0, 800.0, 800.0,
+                            3000.0, 3000.0]
+        farm["wind_direction"] = 270.0
+        self.input_dict = sample_inputs.floris
+
+
+def test_find_clusters():
+    """
+    The clusters should be the groups of turbines whose wakes interact,
+    and a wind direction across the rows should join them
+    """
+    test_class = WakeClustersTest("gauss", "gauss")
+    floris = Floris(input_dict=test_class.input_dict)
+    wake_clusters = WakeClusters(floris.farm.flow_field)
+    clusters = [list(cluster) for cluster in wake_clusters.find_clusters()]
+    assert clusters == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+    floris.farm.flow_field.reinitialize_flow_field(wind_direction=0.0)
+    clusters = [list(cluster) for cluster in wake_clusters.find_clusters()]
+    assert clusters == [[0, 3], [1, 4], [2, 5], [6], [7]]
+
+
+@pytest.mark.parametrize("velocity_model,deflection_model,max_workers", [
+    ("jensen", "jimenez", 1),
+    ("multizone", "jimenez", 1),
+    ("gauss", "gauss", 2)
+])
+def test_matches_grid_solver(velocity_model, deflection_model, max_workers):
+    """
+    Solving the clusters separately should give the same turbine
+    quantities as solving the whole farm
+    """
+    test_class = WakeClustersTest(velocity_model, deflection_model)
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.flow_field.calculate_wake()
+    grid_turbines = floris.farm.turbines
+
+    floris = Floris(input_dict=test_class.input_dict)
+    WakeClusters(floris.farm.flow_field).calculate_wake(
+        max_workers=max_workers)
+    for grid_turbine, turbine in zip(grid_turbines, floris.farm.turbines):
+        assert turbine.power == pytest.approx(grid_turbine.power)
+        assert turbine.turbulence_intensity \
+            == pytest.approx(grid_turbine.turbulence_intensity)
+
+
+def test_mixed_hub_heights():
+    """
+    Clusters whose first turbines have other hub heights than the farm
+    should keep the shear profile of the whole farm
+    """
+    test_class = WakeClustersTest("gauss", "gauss")
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.flow_field.calculate_wake()
+    for turbine in floris.farm.turbines[6:]:
+        turbine.hub_height = 120.0
+    floris.farm.flow_field.reinitialize_flow_field()
+    floris.farm.flow_field.calculate_wake()
+    grid_power = [turbine.power for turbine in floris.farm.turbines]
+
+    floris.farm.flow_field.reinitialize_flow_field()
+    floris.farm.flow_field.calculate_wake(solver="clusters", max_workers=1)
+    for turbine, power in zip(floris.farm.turbines, grid_power):
+        assert turbine.power == pytest.approx(power)
+
+
+def test_curl_is_not_supported():
+    """
+    The cluster solver should reject the curl model
+    """
+    test_class = WakeClustersTest("curl", "curl")
+    test_class.input_dict["wake"]["properties"]["parameters"]["curl"][
+        "model_grid_resolution"] = [30, 20, 10]
+    floris = Floris(input_dict=test_class.input_dict)
+    with pytest.raises(ValueError):
+        WakeClusters(floris.farm.flow_field)
+
+
+def test_dependency_levels():
+    """
+    Each turbine should be one level after the last upstream turbine
+    whose wake reaches it
+    """
+    test_class = WakeClustersTest("gauss", "gauss")
+    floris = Floris(input_dict=test_class.input_dict)
+    levels = WakeClusters(floris.farm.flow_field).dependency_levels()
+    assert [list(level) for level in levels] == \
+        [[0, 3, 6], [1, 4, 7], [2, 5]]
+
+
+@pytest.mark.parametrize("velocity_model,deflection_model", [
+    ("jensen", "jimenez"),
+    ("gauss", "gauss")
+])
+def test_parallel_grid_solver(velocity_model, deflection_model):
+    """
+    Evaluating the wakes of each dependency level on a thread pool should
+    give the same flow field and turbine quantities as the sequential
+    solve
+    """
+    test_class = WakeClustersTest(velocity_model, deflection_model)
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.set_yaw_angles([20.0, 0.0, 0.0, 0.0, 10.0, 0.0, 0.0, 0.0])
+    floris.farm.flow_field.calculate_wake()
+    serial_u = floris.farm.flow_field.u
+    serial_turbines = floris.farm.turbines
+
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.set_yaw_angles([20.0, 0.0, 0.0, 0.0, 10.0, 0.0, 0.0, 0.0])
+    floris.farm.flow_field.calculate_wake(max_workers=3)
+    assert floris.farm.flow_field.u == pytest.approx(serial_u)
+    for serial_turbine, turbine in zip(serial_turbines, floris.farm.turbines):
+        assert turbine.power == pytest.approx(serial_turbine.power)
+        assert turbine.turbulence_intensity \
+            == pytest.approx(serial_turbine.turbulence_intensity)
+
+
+def test_parallel_grid_solver_releases_threads(monkeypatch):
+    """
+    A wake that fails on the thread pool should not leave worker threads
+    running
+    """
+    test_class = WakeClustersTest("jensen", "jimenez")
+    floris = Floris(input_dict=test_class.input_dict)
+    flow_field = floris.farm.flow_field
+
+    def failing_wake(*args):
+        raise RuntimeError("wake failed")
+
+    monkeypatch.setattr(flow_field, "_compute_turbine_wake", failing_wake)
+    n_threads = threading.active_count()
+    with pytest.raises(RuntimeError):
+        flow_field.calculate_wake(max_workers=3)
+    assert threading.active_count() == n_threads
+
+
+def test_parallel_grid_solver_staggered():
+    """
+    The turbulence intensity of a turbine should come from the same
+    upstream wake as in the sequential solve when the dependency levels
+    are not in downstream order
+    """
+    test_class = WakeClustersTest("gauss", "gauss")
+    farm = test_class.input_dict["farm"]["properties"]
+    farm["layout_x"] = [0.0, 300.0, 500.0, 1000.0]
+    farm["layout_y"] = [0.0, 0.0, 400.0, 200.0]
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.flow_field.calculate_wake()
+    serial_turbines = floris.farm.turbines
+
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.flow_field.calculate_wake(max_workers=2)
+    for serial_turbine, turbine in zip(serial_turbines, floris.farm.turbines):
+        assert turbine.turbulence_intensity \
+            == pytest.approx(serial_turbine.turbulence_intensity)
+        assert turbine.power == pytest.approx(serial_turbine.power)
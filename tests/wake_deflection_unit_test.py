@@ -0,0 +1,48 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+from floris.simulation.wake_deflection import _grouped_max
+
+
+class GroupedMaxTest():
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        # few distinct keys give many ties, and the appended unique keys
+        # give single-element groups
+        keys = rng.integers(0, 12, size=(20, 10, 5)).astype(float)
+        keys[0, 0, :] = np.arange(100.0, 105.0)
+        self.keys = keys
+        values = rng.normal(size=keys.shape)
+        # ties of the values themselves within a group
+        values[keys == 3.0] = 1.5
+        self.values = values
+
+    def loop_max(self):
+        # the per-group loop the grouped reduction replaced
+        result = self.values.copy()
+        for key in np.unique(self.keys):
+            result[self.keys == key] = np.max(self.values[self.keys == key])
+        return result
+
+
+def test_grouped_max():
+    """
+    The grouped max should equal the max over each group of equal keys
+    """
+    test_class = GroupedMaxTest()
+    grouped = _grouped_max(test_class.keys, test_class.values)
+    assert grouped.shape == test_class.values.shape
+    np.testing.assert_array_equal(grouped, test_class.loop_max())
+    np.testing.assert_array_equal(grouped[0, 0, :],
+                                  test_class.values[0, 0, :])
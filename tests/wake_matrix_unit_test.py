@@ -0,0 +1,137 @@
+"""
+Copyright 2017 NREL
+
+Licensed under the Apache License, Version 2.0 (the "License"); you may not use
+this file except in compliance with the License. You may obtain a copy of the
+License at http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software distributed
+under the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR
+CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import numpy as np
+import pytest
+from floris.simulation import Floris
+from floris.simulation import WakeMatrix
+from floris.simulation.turbine import polar_rotor_quadrature
+from .sample_inputs import SampleInputs
+
+
+class WakeMatrixTest():
+    def __init__(self, velocity_model, deflection_model):
+        sample_inputs = SampleInputs()
+        properties = sample_inputs.floris["wake"]["properties"]
+        properties["velocity_model"] = velocity_model
+        properties["deflection_model"] = deflection_model
+        farm = sample_inputs.floris["farm"]["properties"]
+        farm["layout_x"] = [0.0, 630.0, 1260.0, 20.0, 650.0]
+        farm["layout_y"] = [0.0, 0.0, 0.0, 378.0, 300.0]
+        farm["wind_direction"] = 260.0
+        self.input_dict = sample_inputs.floris
+
+    def solve(self, solver):
+        floris = Floris(input_dict=self.input_dict)
+        floris.farm.set_yaw_angles([20.0, 10.0, 0.0, 0.0, 0.0])
+        floris.farm.flow_field.calculate_wake(solver=solver)
+        return floris.farm.turbines
+
+
+@pytest.mark.parametrize("velocity_model,deflection_model", [
+    ("jensen", "jimenez"),
+    ("multizone", "jimenez"),
+    ("gauss", "gauss")
+])
+def test_matches_grid_solver(velocity_model, deflection_model):
+    """
+    The matrix solver should give the same turbine quantities as the grid
+    solver
+    """
+    test_class = WakeMatrixTest(velocity_model, deflection_model)
+    grid_turbines = test_class.solve("grid")
+    matrix_turbines = test_class.solve("matrix")
+    for grid_turbine, matrix_turbine in zip(grid_turbines, matrix_turbines):
+        assert matrix_turbine.power == pytest.approx(grid_turbine.power)
+        assert matrix_turbine.turbulence_intensity \
+            == pytest.approx(grid_turbine.turbulence_intensity)
+
+
+def test_deficit_matrix():
+    """
+    The deficit matrix should have a row per turbine and a column per rotor
+    point, with no deficit from the most downstream turbine
+    """
+    test_class = WakeMatrixTest("gauss", "gauss")
+    floris = Floris(input_dict=test_class.input_dict)
+    floris.farm.flow_field.calculate_wake(solver="matrix")
+    wake_matrix = floris.farm.flow_field.wake_matrix
+    n_turbines = len(floris.farm.turbines)
+    n_points = len(floris.farm.turbines[0].grid)
+    assert wake_matrix.deficits.shape == (n_turbines, n_turbines * n_points)
+    assert wake_matrix.deficits[wake_matrix.order[-1]].nnz == 0
+    assert wake_matrix.deficits[wake_matrix.order[0]].nnz > 0
+
+
+def test_curl_is_not_supported():
+    """
+    The matrix solver should reject the curl model
+    """
+    test_class = WakeMatrixTest("curl", "curl")
+    test_class.input_dict["wake"]["properties"]["parameters"]["curl"][
+        "model_grid_resolution"] = [30, 20, 10]
+    floris = Floris(input_dict=test_class.input_dict)
+    with pytest.raises(ValueError):
+        WakeMatrix(floris.farm.flow_field)
+
+
+def test_polar_rotor_quadrature():
+    """
+    The quadrature weights should average polynomials over the unit disk
+    exactly
+    """
+    y, z, weights = polar_rotor_quadrature(3, 8)
+    assert np.sum(weights) == pytest.approx(1.0)
+    assert np.all(np.hypot(y, z) < 1.0)
+    assert np.sum(weights * (y**2 + z**2)) == pytest.approx(0.5)
+    assert np.sum(weights * y**2 * z**2) == pytest.approx(1.0 / 24.0)
+
+
+def test_rotor_average_converges():
+    """
+    The rotor-averaged turbine powers should be converged at the default
+    quadrature order
+    """
+    test_class = WakeMatrixTest("gauss", "gauss")
+    powers = []
+    for n_radial, n_azimuthal in [(4, 8), (16, 32)]:
+        floris = Floris(input_dict=test_class.input_dict)
+        wake_matrix = WakeMatrix(floris.farm.flow_field, rotor_average=True,
+                                 n_radial=n_radial, n_azimuthal=n_azimuthal)
+        wake_matrix.calculate_wake()
+        n_turbines = len(floris.farm.turbines)
+        assert wake_matrix.deficits.shape == (n_turbines, n_turbines)
+        powers.append([turbine.power for turbine in floris.farm.turbines])
+    assert powers[0] == pytest.approx(powers[1], rel=1e-4)
+
+
+def test_aggregated_wakes_are_close_to_exact():
+    """
+    Aggregating the wakes of distant turbine groups should stay close to
+    the exact turbine powers, and a zero tolerance should not aggregate
+    """
+    test_class = WakeMatrixTest("gauss", "gauss")
+    properties = test_class.input_dict["wake"]["properties"]
+    properties["combination_model"] = "sosfs"
+    farm = test_class.input_dict["farm"]["properties"]
+    rows, columns = np.meshgrid(np.arange(8), np.arange(8))
+    farm["layout_x"] = list(630.0 * columns.flatten() + 50.0 * rows.flatten())
+    farm["layout_y"] = list(630.0 * rows.flatten())
+    powers = []
+    for tolerance in [0.0, 0.25]:
+        floris = Floris(input_dict=test_class.input_dict)
+        wake_matrix = WakeMatrix(floris.farm.flow_field, tolerance=tolerance)
+        wake_matrix.calculate_wake()
+        assert (wake_matrix.aggregated > 0) == (tolerance > 0.0)
+        powers.append([turbine.power for turbine in floris.farm.turbines])
+    assert powers[1] == pytest.approx(powers[0], rel=1e-2)